@@ -6,16 +6,18 @@ setup(
     packages=find_packages(),
     install_requires=[
         'python-dotenv',
-        'torch',
         'numpy',
         'tqdm',
         'scikit-learn',
         'wget',
         'num2words',
-        'word2number',
         'flask',
         'pytest',
         'requests',
         'flask-cors'
-    ]
+    ],
+    extras_require={
+        # torch is only needed to train the HMM and for the torch inference backend
+        'training': ['torch']
+    }
 )
\ No newline at end of file
@@ -23,6 +23,59 @@ MODEL_DIR = os.path.join(BASE_DIR, "data", "model")
 
 INDEXES_DIR = os.path.join(BASE_DIR, "data", "indexes")
 
+# Backend used to run the HMM at inference time, "numpy" or "torch" (torch is only installed with the training extra)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "numpy")
+
+# Load the model and run a dummy decode in the background when the server starts instead of on the first /infer request
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+
+WARM_UP_SENTENCE = "I want to play hockey for 2 hours in the morning"
+
+# Seconds between two checks of MODEL_DIR for a newly trained run, 0 disables hot-swapping
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
+
+# Number of preprocessed sentences whose Viterbi result is cached, 0 disables the cache
+INFERENCE_CACHE_SIZE = int(os.getenv("INFERENCE_CACHE_SIZE", "1024"))
+
+# Seconds a cached result stays valid, 0 keeps results until they are evicted
+INFERENCE_CACHE_TTL = float(os.getenv("INFERENCE_CACHE_TTL", "3600"))
+
+# Maximum number of texts accepted by a single /infer/batch request
+INFER_BATCH_MAX_SIZE = int(os.getenv("INFER_BATCH_MAX_SIZE", "100"))
+
+# Number of processes solving /schedule/batch requests, 0 uses one per CPU
+SCHEDULE_BATCH_WORKERS = int(os.getenv("SCHEDULE_BATCH_WORKERS", "0"))
+
+# Number of processes running the solvers of /schedule/<algo> requests
+SOLVER_WORKERS = int(os.getenv("SOLVER_WORKERS", "2"))
+
+# Seconds a solver may run for one /schedule/<algo> request before the interval scheduler is used instead, 0 runs it in the request thread without a limit
+SOLVER_TIME_BUDGET = float(os.getenv("SOLVER_TIME_BUDGET", "5"))
+
+# Search nodes a CSP solver may explore for one request before it returns its largest partial schedule, 0 for no limit
+SOLVER_NODE_BUDGET = int(os.getenv("SOLVER_NODE_BUDGET", "200000"))
+
+# Seconds a CSP solver may search for one request before it returns its largest partial schedule, 0 for no limit, keep it below SOLVER_TIME_BUDGET
+SOLVER_SEARCH_TIME = float(os.getenv("SOLVER_SEARCH_TIME", "2"))
+
+# Domains of the forward checking solver, "bitset" (minute masks) or "numpy" (arrays pruned with vectorized comparisons)
+CSP_DOMAIN_REPRESENTATION = os.getenv("CSP_DOMAIN_REPRESENTATION", "bitset")
+
+# Order in which the CSP solvers try the values of a task, "preference" (preferred period first, then by start) or "lcv" (least constraining value first within the preferred and other values)
+CSP_VALUE_ORDERING = os.getenv("CSP_VALUE_ORDERING", "preference")
+
+# Minutes between two possible start times of a task in the CSP domains
+CSP_DOMAIN_STEP = int(os.getenv("CSP_DOMAIN_STEP", "30"))
+
+# Placement of the greedy scheduler, "first_fit" (earliest free slot), "best_fit" (shortest free slot the task fits in) or "preference" (earliest start in the preferred period, best fit otherwise)
+GREEDY_MODE = os.getenv("GREEDY_MODE", "first_fit")
+
+# Maximum number of tasks the subset dynamic program schedules, its time doubles with every task, larger requests are packed by the binpack scheduler
+SUBSET_DP_MAX_TASKS = int(os.getenv("SUBSET_DP_MAX_TASKS", "12"))
+
+# Maximum number of payloads accepted by a single /schedule/batch request
+SCHEDULE_BATCH_MAX_SIZE = int(os.getenv("SCHEDULE_BATCH_MAX_SIZE", "1000"))
+
 TRAINING_FILES = ["data.json", "actions.json", "durations.json", "preferences.json", "sentences.json"]
 
 
@@ -0,0 +1,39 @@
+"""
+Bitset and array representations of task placements for the CSP solvers.
+
+A placement (start, end) in minutes is the int mask with the bits start to end - 1 set, the
+occupancy of the day is the OR of the assigned placements, so a consistency check is one AND.
+The numpy representation keeps a domain as an (n, 2) array of starts and ends, pruning the values
+overlapping an assignment is a single vectorized comparison.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+BITSET = "bitset"
+NUMPY = "numpy"
+
+DOMAIN_REPRESENTATIONS = [BITSET, NUMPY]
+
+def placement_mask(start: int, end: int) -> int:
+    """Mask of the minutes [start, end)."""
+    return ((1 << (end - start)) - 1) << start
+
+def get_placement_masks(domains: Dict[str, List[Tuple[int, int]]]) -> Dict[Tuple[int, int], int]:
+    """Mask of every placement of the domains, placements shared by several tasks are computed once."""
+    masks = {}
+    for domain in domains.values():
+        for value in domain:
+            if value not in masks:
+                masks[value] = placement_mask(*value)
+    return masks
+
+def to_array(domain: List[Tuple[int, int]]) -> np.ndarray:
+    return np.array(domain, dtype=np.int32).reshape(-1, 2)
+
+def to_values(domain: np.ndarray) -> List[Tuple[int, int]]:
+    return [(start, end) for start, end in domain.tolist()]
+
+def prune_array(domain: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Keep the rows of the domain that do not overlap [start, end), in the same order."""
+    return domain[(domain[:, 1] <= start) | (domain[:, 0] >= end)]
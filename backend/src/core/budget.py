@@ -0,0 +1,57 @@
+"""
+Node and wall-clock limits of a scheduling search.
+
+One SearchBudget covers a whole solver call, the pass with the preference domains and the pass
+with the regular domains draw from the same budget. A search spends one node per recursive call,
+when the budget is exhausted spend raises BudgetExhausted. A pass that ends without a schedule hands
+the budget the largest partial assignment it reached, so a stopped search returns it instead of nothing.
+"""
+import time
+from typing import Dict, List, Optional
+
+# The clock is read once every TIME_CHECK_INTERVAL nodes
+TIME_CHECK_INTERVAL = 32
+
+class BudgetExhausted(Exception):
+    """The search used all the nodes or the time of its budget."""
+
+
+class SearchBudget:
+    __slots__ = ("max_nodes", "time_limit", "nodes", "deadline", "exhausted", "best")
+
+    def __init__(self, max_nodes: Optional[int] = None, time_limit: Optional[float] = None):
+        """
+        Args:
+            max_nodes: Maximum number of search nodes, None for no limit
+            time_limit: Seconds the search may run from its first node, None for no limit
+        """
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.nodes = 0
+        # Set on the first node, the budget can be created in another process than the search
+        self.deadline = None
+        self.exhausted = False
+        # Largest partial schedule reached by an exhausted search
+        self.best: List[Dict] = []
+
+    def spend(self):
+        """Count one search node, raise BudgetExhausted if the budget is used up."""
+        if self.exhausted:
+            raise BudgetExhausted()
+
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.exhausted = True
+            raise BudgetExhausted()
+
+        if self.time_limit is not None:
+            if self.deadline is None:
+                self.deadline = time.monotonic() + self.time_limit
+            elif self.nodes % TIME_CHECK_INTERVAL == 0 and time.monotonic() > self.deadline:
+                self.exhausted = True
+                raise BudgetExhausted()
+
+    def keep_best(self, tasks: List[Dict]):
+        """Keep the partial schedule if it has more tasks than the best one so far."""
+        if len(tasks) > len(self.best):
+            self.best = tasks
@@ -0,0 +1,76 @@
+"""
+Reversible domain store shared by the CSP solvers.
+
+Removing values from the domain of a task replaces it with a new domain and pushes the old one
+on the trail. The search takes a checkpoint before an assignment and restores it when it
+backtracks, so only the domains that changed are rebuilt and no domain dict is copied per
+search node. The domains handed out by the store must not be modified in place.
+
+Domains hold (start, end) placements in minutes sorted by start, all the placements of a task
+have the same duration. The placements overlapping a time range are then a contiguous run of
+the domain found by bisection.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.minutes import MINUTES_PER_DAY
+
+class DomainStore:
+    __slots__ = ("domains", "trail", "listener")
+
+    def __init__(self, domains: Dict[str, List[Tuple[int, int]]]):
+        self.domains = {task: sorted(domain) for task, domain in domains.items()}
+        # (task, domain) of every replaced domain, in replacement order
+        self.trail = []
+        # Called with the task whenever the size of its domain may have changed
+        self.listener: Optional[Callable[[str], None]] = None
+
+    def size(self, task: str) -> int:
+        return len(self.domains[task])
+
+    def get_values(self, task: str) -> List[Tuple[int, int]]:
+        """Values left in the domain of the task, sorted by start."""
+        return self.domains[task]
+
+    def replace(self, task: str, domain):
+        """Replace the domain of the task, the old one is put back by restore."""
+        self.trail.append((task, self.domains[task]))
+        self.domains[task] = domain
+        if self.listener is not None:
+            self.listener(task)
+
+    def remove_range(self, task: str, low: int, high: int) -> bool:
+        """Remove the values low to high - 1, True if any was removed."""
+        if low >= high:
+            return False
+        domain = self.domains[task]
+        self.replace(task, domain[:low] + domain[high:])
+        return True
+
+    def remove_overlapping(self, task: str, start: int, end: int) -> bool:
+        """Remove the values overlapping [start, end), True if any was removed."""
+        domain = self.domains[task]
+        if not domain:
+            return False
+        first_start, first_end = domain[0]
+        return self.remove_range(
+            task,
+            bisect_right(domain, (start - (first_end - first_start), MINUTES_PER_DAY)),
+            bisect_left(domain, (end, -1))
+        )
+
+    def assign(self, task: str, value: Tuple[int, int]):
+        """Reduce the domain of the task to the value."""
+        self.replace(task, [value])
+
+    def checkpoint(self) -> int:
+        return len(self.trail)
+
+    def restore(self, checkpoint: int):
+        """Put back every domain replaced since the checkpoint."""
+        trail, domains, listener = self.trail, self.domains, self.listener
+        while len(trail) > checkpoint:
+            task, domain = trail.pop()
+            domains[task] = domain
+            if listener is not None:
+                listener(task)
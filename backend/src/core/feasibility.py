@@ -0,0 +1,63 @@
+"""
+Necessary conditions for a set of tasks to fit in the free slots of a day, checked before any search.
+
+A task that is not split sits inside one free slot, so:
+- it cannot be longer than the longest free slot,
+- the tasks lasting at least d minutes only fit in the slots of at least d minutes, a slot of
+  L minutes holds at most L // d of them and at most L of their minutes.
+Tasks that can be split only need the total free time to cover their total duration.
+
+These bounds never reject a schedule that exists, a request passing them can still be infeasible
+and is left to the solvers.
+"""
+from typing import Dict, List
+
+from src.core.minutes import Slot
+
+def bounds_hold(lengths: List[int], durations: List[int], allow_split: bool = False) -> bool:
+    """Check the bounds for tasks of the given durations in free slots of the given lengths, durations sorted longest first."""
+    if sum(durations) > sum(lengths):
+        return False
+
+    if allow_split:
+        return True
+
+    # Durations are sorted, the tasks lasting at least durations[i] are the first i + 1 ones
+    total = 0
+    for count, duration in enumerate(durations, start=1):
+        total += duration
+        if duration <= 0:
+            break
+        if count < len(durations) and durations[count] == duration:
+            continue
+
+        if count > sum(length // duration for length in lengths):
+            return False
+        if total > sum(length for length in lengths if length >= duration):
+            return False
+
+    return True
+
+def get_infeasible_tasks(slots: List[Slot], tasks: List[Dict], allow_split: bool = False) -> List[str]:
+    """
+    Tasks that cannot all be scheduled in the free slots.
+
+    The longest remaining task is dropped while the bounds do not hold, the dropped tasks are
+    returned in the order of the request. An empty list means the bounds hold for every task.
+    """
+    lengths = [slot.end - slot.start for slot in slots]
+    longest = max(lengths, default=0)
+
+    remaining = sorted(tasks, key=lambda task: -task["duration"])
+    dropped = []
+
+    # A task longer than every slot can never be placed in one piece
+    if not allow_split:
+        dropped = [task for task in remaining if task["duration"] > longest]
+        remaining = [task for task in remaining if task["duration"] <= longest]
+
+    while remaining and not bounds_hold(lengths, [task["duration"] for task in remaining], allow_split):
+        dropped.append(remaining.pop(0))
+
+    dropped_ids = {id(task) for task in dropped}
+    return [task["task"] for task in tasks if id(task) in dropped_ids]
@@ -0,0 +1,223 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.core.minutes import MINUTES_PER_DAY, Slot, to_minutes, get_sleep_periods, get_awake_slots, get_obligation_intervals
+
+# Leaves of the segment tree of GapIndex, one per minute of the day rounded up to a power of two
+GAP_TREE_LEAVES = 1 << (MINUTES_PER_DAY - 1).bit_length()
+
+class FreeSlotIndex:
+    """
+    Free slots of a day in minutes, kept as two sorted lists of slot starts and ends.
+
+    Slots never overlap or touch, so both lists are sorted and a busy interval is carved out
+    with two bisections instead of rebuilding the whole timeline.
+    """
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, slots: List[Tuple[int, int]] = ()):
+        """
+        Args:
+            slots: Disjoint (start, end) free slots in minutes
+        """
+        slots = sorted(slots)
+        self.starts = [start for start, _ in slots]
+        self.ends = [end for _, end in slots]
+
+    @classmethod
+    def from_day(cls, wake_up: int, sleep: int) -> "FreeSlotIndex":
+        """Index of the awake part of the day, wake_up and sleep are in minutes."""
+        return cls([(slot.start, slot.end) for slot in get_awake_slots(get_sleep_periods(wake_up, sleep))])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def slots(self) -> List[Slot]:
+        return [Slot(start, end) for start, end in zip(self.starts, self.ends)]
+
+    def carve(self, start: int, end: int) -> None:
+        """Remove the busy interval [start, end) from the free slots."""
+        if start >= end:
+            return
+
+        starts, ends = self.starts, self.ends
+
+        # Slots ending at or before start and slots starting at or after end are not touched
+        first = bisect_right(ends, start)
+        last = bisect_left(starts, end)
+
+        if first >= last:
+            return
+
+        new_starts = []
+        new_ends = []
+
+        # Keep what is left of the first and last overlapping slots
+        if starts[first] < start:
+            new_starts.append(starts[first])
+            new_ends.append(start)
+
+        if ends[last - 1] > end:
+            new_starts.append(end)
+            new_ends.append(ends[last - 1])
+
+        starts[first:last] = new_starts
+        ends[first:last] = new_ends
+
+    def first_fit(self, duration: int, after: int = 0) -> Optional[int]:
+        """
+        Find the first gap of at least duration minutes starting at or after a given minute.
+
+        Returns:
+            The start of the gap in minutes, None if no gap is long enough
+        """
+        starts, ends = self.starts, self.ends
+
+        for index in range(bisect_right(ends, after), len(starts)):
+            start = max(starts[index], after)
+            if ends[index] - start >= duration:
+                return start
+
+        return None
+
+    def largest_gap(self) -> Optional[Tuple[int, int]]:
+        """The longest free slot, None if the day has no free time."""
+        if not self.starts:
+            return None
+
+        index = max(range(len(self.starts)), key=lambda index: self.ends[index] - self.starts[index])
+        return self.starts[index], self.ends[index]
+
+    def free_minutes(self) -> int:
+        return sum(self.ends) - sum(self.starts)
+
+class GapIndex(FreeSlotIndex):
+    """
+    Free slots of a day also indexed by length, for placing tasks one at a time.
+
+    sizes is a max segment tree over the minutes of the day where the leaf of a minute holds the
+    length of the free slot starting at it, the first slot of at least d minutes from a given minute
+    is found by walking down the tree. by_size holds the (length, start) of the slots sorted, the
+    shortest slot of at least d minutes is found by bisection. Both are updated when carving.
+    """
+    __slots__ = ("sizes", "by_size")
+
+    def __init__(self, slots: List[Tuple[int, int]] = ()):
+        super().__init__(slots)
+        self.sizes = [0] * (2 * GAP_TREE_LEAVES)
+        self.by_size = []
+
+        for start, end in zip(self.starts, self.ends):
+            self.add_gap(start, end)
+
+    def set_size(self, start: int, size: int) -> None:
+        sizes = self.sizes
+        node = start + GAP_TREE_LEAVES
+        sizes[node] = size
+        node //= 2
+
+        # The ancestors above a node whose maximum did not change are up to date
+        while node:
+            left, right = sizes[2 * node], sizes[2 * node + 1]
+            maximum = left if left > right else right
+            if sizes[node] == maximum:
+                break
+            sizes[node] = maximum
+            node //= 2
+
+    def add_gap(self, start: int, end: int) -> None:
+        self.set_size(start, end - start)
+        insort(self.by_size, (end - start, start))
+
+    def remove_gap(self, start: int, end: int) -> None:
+        self.set_size(start, 0)
+        del self.by_size[bisect_left(self.by_size, (end - start, start))]
+
+    def carve(self, start: int, end: int) -> None:
+        """Remove the busy interval [start, end) from the free slots."""
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        if start >= end or first >= last:
+            return
+
+        removed = list(zip(self.starts[first:last], self.ends[first:last]))
+        kept = len(self.starts) - len(removed)
+        super().carve(start, end)
+
+        for gap in removed:
+            self.remove_gap(*gap)
+        for index in range(first, first + len(self.starts) - kept):
+            self.add_gap(self.starts[index], self.ends[index])
+
+    def first_fit(self, duration: int, after: int = 0) -> Optional[int]:
+        """
+        Find the first slot of at least duration minutes starting at or after a given minute.
+
+        Returns:
+            The start of the slot in minutes, None if no slot is long enough
+        """
+        # A leaf of length 0 is a minute where no slot starts
+        duration = max(duration, 1)
+        sizes = self.sizes
+        if sizes[1] < duration:
+            return None
+
+        # The slot containing the minute can be used from the minute on
+        slot = self.slot_at(after)
+        if slot is not None and slot[1] - after >= duration:
+            return after
+
+        # Move right from the leaf of the minute, going up while on a right child, until a node
+        # holds a long enough slot, then go down to its first long enough leaf
+        node = after + GAP_TREE_LEAVES
+        while sizes[node] < duration:
+            while node & 1:
+                node >>= 1
+            if node == 0:
+                return None
+            node += 1
+
+        while node < GAP_TREE_LEAVES:
+            node *= 2
+            if sizes[node] < duration:
+                node += 1
+        return node - GAP_TREE_LEAVES
+
+    def best_fit(self, duration: int) -> Optional[int]:
+        """Start of the shortest slot of at least duration minutes, the earliest one on ties, None if there is none."""
+        index = bisect_left(self.by_size, (duration, -1))
+        if index == len(self.by_size):
+            return None
+        return self.by_size[index][1]
+
+    def largest_gap(self) -> Optional[Tuple[int, int]]:
+        """The longest free slot, the earliest one on ties, None if the day has no free time."""
+        if not self.by_size:
+            return None
+
+        size, start = self.by_size[bisect_left(self.by_size, (self.by_size[-1][0], -1))]
+        return start, start + size
+
+    def slot_at(self, minute: int) -> Optional[Tuple[int, int]]:
+        """The free slot containing a minute, None if the minute is busy."""
+        index = bisect_right(self.starts, minute) - 1
+        if index >= 0 and minute < self.ends[index]:
+            return self.starts[index], self.ends[index]
+        return None
+
+def get_free_slot_index(wake_up: time, sleep: time, obligations: List[Dict]) -> FreeSlotIndex:
+    """Index of the free time of the day between waking up and going to sleep without the obligations."""
+    index = FreeSlotIndex.from_day(to_minutes(wake_up), to_minutes(sleep))
+
+    for start, end in get_obligation_intervals(obligations):
+        index.carve(start, end)
+
+    return index
+
+def get_free_slots(wake_up: time, sleep: time, obligations: List[Dict]) -> List[Slot]:
+    """Free slots of the day between waking up and going to sleep that are not taken by an obligation."""
+    return get_free_slot_index(wake_up, sleep, obligations).slots()
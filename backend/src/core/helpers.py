@@ -1,11 +1,11 @@
 from typing import List, Union, Tuple, Dict, Optional
 
-import json
 import os
+import shutil
+import tempfile
 
 from src.hmms.model import Model
 from num2words import num2words
-from datetime import datetime, timedelta
 
 import random
 
@@ -14,16 +14,35 @@ from src.config import (
     MODEL_DIR, 
     INDEXES_DIR, 
     UNKNOWN_WORD, 
-    DEFAULT_STATE_PRIORS, 
-    TIME_WORD_MAPPING,
-    TIME_PERIOD_MAPPING
+    DEFAULT_STATE_PRIORS
 )
 
 from src.hmms.training.templates import TrainingInstance
 
-import torch
+# The inference preprocessing, timeline and artifact loading helpers live in torch free modules
+# so that the serving path does not need torch, they are re-exported here for the training code
+from src.core.preprocessing import (
+    find_and_replace_time,
+    remove_special_characters,
+    preprocess_inference_sentence,
+    get_indexes_list,
+    replace_time_with_number
+)
+
+from src.core.timeline import (
+    is_between_time_period,
+    get_time_to_preference,
+    split_cross_midnight_obligations,
+    combine_split_obligations,
+    adjust_wakeup_and_sleep,
+    get_available_slots
+)
 
-from word2number import w2n
+from src.hmms.artifacts import get_latest_run, get_latest_run_number, get_next_run_number, load_matrix_arrays, save_matrix_arrays, load_indexes, save_index_dicts
+
+import numpy as np
+
+import torch
 
 def handle_hours(num_or_value: int) -> Union[str, int]:
     value = random.randint(1, 23)
@@ -125,88 +144,6 @@ def get_time_converted_sentence(sentence: str, time: str) -> str:
     
     return " ".join(converted_words)
 
-def find_and_replace_time(sentence: str, get_placeholder: bool = True) -> str:
-    words = sentence.split()
-    result = []
-    i = 0
-    
-    while i < len(words):
-        # Try to identify compound numbers by checking if both words are valid numbers
-        if i < len(words) - 1:
-            try:
-                # Check if both words can be converted to numbers individually
-                first_num = w2n.word_to_num(words[i].lower())
-                second_num = w2n.word_to_num(words[i+1].lower())
-                
-                # If both are valid numbers, try combining them
-                compound_number = "-".join(words[i:i+2])
-                number = w2n.word_to_num(compound_number.lower())
-                
-                if get_placeholder:
-                    result.append("<time>")
-                else:
-                    result.append(str(number))
-                i += 2  # Skip next word since we used it
-                continue
-            except:
-                pass
-        
-        # If compound number failed, process single word
-        if words[i].isdigit():
-            if get_placeholder:
-                result.append("<time>")
-            else:
-                result.append(words[i])
-        else:
-            try:
-                number = w2n.word_to_num(words[i].lower())
-                if get_placeholder:
-                    result.append("<time>")
-                else:
-                    result.append(str(number))
-            except:
-                result.append(words[i])
-        i += 1
-
-    return " ".join(result)
-
-def is_between_time_period(time, time_period):
-    return time_period[0] <= time.hour < time_period[1]
-
-def get_time_to_preference(time):
-    if is_between_time_period(time, TIME_PERIOD_MAPPING["M"]):
-        return TIME_WORD_MAPPING["M"]
-    elif is_between_time_period(time, TIME_PERIOD_MAPPING["A"]):
-        return TIME_WORD_MAPPING["A"]
-    elif is_between_time_period(time, TIME_PERIOD_MAPPING["E"]):
-        return TIME_WORD_MAPPING["E"]
-    else:
-        return TIME_WORD_MAPPING["N"]
-
-def remove_special_characters(sentence: str, omitted_characters: List[str] = []) -> str:
-    stripped_sentence = ''
-    for char in sentence:
-        if char.isalpha() or char.isdigit() or char == " ":
-            stripped_sentence += char
-        if char in omitted_characters:
-            stripped_sentence += char
-    return stripped_sentence
-
-def preprocess_inference_sentence(sentence: str) -> str:
-    # Convert the whole sentence to lowercase
-    sentence = sentence.lower()
-
-    sentence = remove_special_characters(sentence, omitted_characters=["-"])
-
-    # Remove all dots and commas from the sentence
-    sentence = sentence.replace(".", "").replace(",", "")
-
-    sentence = find_and_replace_time(sentence, get_placeholder=True)
-
-    sentence = remove_special_characters(sentence, omitted_characters=["<", ">"])
-
-    return sentence
-
 def preprocess_sentence(sentence: str, action: str, duration: str, preference: str, time: str) -> str:
     sentence = sentence.format(action=action, digit = time, duration=duration, preference=preference)
 
@@ -260,20 +197,6 @@ def get_index_dict_from_corpus(corpus: List[TrainingInstance]) -> dict:
 
     return index_dict
 
-def get_indexes_list(sequence: str, index_dict: dict) -> List[int]:
-    # Convert into a list of words
-    words = sequence.split()
-
-    indexes = []
-
-    for word in words:
-        if word in index_dict:
-            indexes.append(index_dict[word])
-        else:
-            indexes.append(index_dict[UNKNOWN_WORD])
-
-    return indexes
-
 def add_indexes_to_training_instance(instance: TrainingInstance, word_index_dict: dict, state_index_dict: dict) -> TrainingInstance:
     """
     Add indexes to the sentence and state sequence of a TrainingInstance based on the provided index dictionaries.
@@ -322,48 +245,60 @@ def normalize_matrices(transition_matrix: torch.Tensor, emission_matrix: torch.T
     
     return transition_matrix, emission_matrix
 
-def save_matrices(transition_matrix: torch.Tensor, emission_matrix: torch.Tensor) -> str:
+def save_matrices(
+    transition_matrix: torch.Tensor,
+    emission_matrix: torch.Tensor,
+    export_json: bool = False,
+    word_index_dict: Optional[dict] = None,
+    state_index_dict: Optional[dict] = None
+) -> str:
     """
-    Save transition and emission matrices to JSON files.
-    Creates a new run folder if there are already 3 runs.
+    Save transition and emission matrices in the binary artifact format.
+    Creates a new run folder for every call.
     
     Args:
         transition_matrix: The transition matrix to save
         emission_matrix: The emission matrix to save
+        export_json: Also save the matrices as indented JSON files for debugging
+        word_index_dict: Optional word indexes of the matrices, saved in the run folder
+        state_index_dict: Optional state indexes of the matrices, saved in the run folder
         
     Returns:
         str: The path where matrices were saved
     """
-    
-    # Convert tensors to lists for JSON serialization
-    transition_data = transition_matrix.tolist()
-    emission_data = emission_matrix.tolist()
-    
-    # Check existing runs
-    existing_runs = [d for d in os.listdir(MODEL_DIR) if d.startswith('run') and os.path.isdir(os.path.join(MODEL_DIR, d))]
-    
-    # Create new run folder
-    run_number = len(existing_runs) + 1
-    run_dir = os.path.join(MODEL_DIR, f'run{run_number}')
-    os.makedirs(run_dir, exist_ok=True)
-    save_dir = run_dir
-
-    # Save transition matrix
-    transition_path = os.path.join(save_dir, 'transition.json')
-    with open(transition_path, 'w') as f:
-        json.dump(transition_data, f, indent=2)
-    
-    # Save emission matrix
-    emission_path = os.path.join(save_dir, 'emission.json')
-    with open(emission_path, 'w') as f:
-        json.dump(emission_data, f, indent=2)
-
-    # Save state priors
-    state_priors_path = os.path.join(save_dir, 'state_priors.json')
-    with open(state_priors_path, 'w') as f:
-        json.dump(DEFAULT_STATE_PRIORS, f, indent=2)
-    
-    return save_dir
+
+    # Write into a fresh hidden temporary folder and rename it once every file is written,
+    # so a server watching MODEL_DIR never picks up a partially written run
+    save_dir = tempfile.mkdtemp(prefix='.run', suffix='.tmp', dir=MODEL_DIR)
+    # mkdtemp only lets the owner read the folder, the server may run as another user
+    os.chmod(save_dir, 0o755)
+
+    try:
+        # Save the transition matrix, emission matrix and state priors
+        save_matrix_arrays(
+            save_dir,
+            transition_matrix.numpy(),
+            emission_matrix.numpy(),
+            np.asarray(DEFAULT_STATE_PRIORS, dtype=np.float32),
+            export_json=export_json
+        )
+
+        # The run keeps the indexes it was trained with, they appear with the matrices in one rename
+        if word_index_dict is not None and state_index_dict is not None:
+            save_index_dicts(save_dir, word_index_dict, state_index_dict)
+
+        # Numbered after the highest existing run, the next number is tried if another save took it
+        while True:
+            run_dir = os.path.join(MODEL_DIR, f'run{get_next_run_number()}')
+            try:
+                os.rename(save_dir, run_dir)
+                return run_dir
+            except OSError:
+                if not os.path.exists(run_dir):
+                    raise
+    except BaseException:
+        shutil.rmtree(save_dir, ignore_errors=True)
+        raise
 
 def save_indexes(word_index_dict: dict, state_index_dict: dict) -> str:
     """
@@ -377,27 +312,10 @@ def save_indexes(word_index_dict: dict, state_index_dict: dict) -> str:
     Returns:
         str: The path where indexes were saved
     """
-    # Save word index dictionary
-    word_index_path = os.path.join(INDEXES_DIR, 'word_index.json')
-    with open(word_index_path, 'w') as f:
-        json.dump(word_index_dict, f, indent=2)
-    
-    # Save state index dictionary
-    state_index_path = os.path.join(INDEXES_DIR, 'state_index.json')
-    with open(state_index_path, 'w') as f:
-        json.dump(state_index_dict, f, indent=2)
+    save_index_dicts(INDEXES_DIR, word_index_dict, state_index_dict)
     
     return INDEXES_DIR
 
-def get_latest_run() -> str:
-    """Get the path of the latest run directory."""
-    runs = [d for d in os.listdir(MODEL_DIR) if d.startswith('run') and os.path.isdir(os.path.join(MODEL_DIR, d))]
-    if not runs:
-        raise ValueError("No model runs found")
-    
-    latest_run = max(runs, key=lambda x: int(x[3:]))  # Extract number from 'runX'
-    return os.path.join(MODEL_DIR, latest_run)
-
 def load_matrices(run_number: Optional[int] = None) -> Tuple[torch.Tensor, torch.Tensor]:
     """
     Load transition and emission matrices from a specific run or the latest run.
@@ -408,52 +326,16 @@ def load_matrices(run_number: Optional[int] = None) -> Tuple[torch.Tensor, torch
     Returns:
         Tuple of (transition_matrix, emission_matrix) as PyTorch tensors
     """
-    # Determine which run to load from
-    if run_number is not None:
-        run_dir = os.path.join(MODEL_DIR, f'run{run_number}')
-        if not os.path.exists(run_dir):
-            raise ValueError(f"Run {run_number} does not exist")
-    else:
-        run_dir = get_latest_run()
-    
-    # Load matrices
-    with open(os.path.join(run_dir, 'transition.json'), 'r') as f:
-        transition_data = json.load(f)
-    
-    with open(os.path.join(run_dir, 'emission.json'), 'r') as f:
-        emission_data = json.load(f)
-
-    with open(os.path.join(run_dir, 'state_priors.json'), 'r') as f:    
-        state_priors_data = json.load(f)
+    # Copy-on-write mapping, torch needs writable arrays but the pages stay shared until written
+    transition_data, emission_data, state_priors_data = load_matrix_arrays(run_number, mmap_mode="c")
     
     # Convert to PyTorch tensors
-    transition_matrix = torch.tensor(transition_data, dtype=torch.float32)
-    emission_matrix = torch.tensor(emission_data, dtype=torch.float32)
-    state_priors = torch.tensor(state_priors_data, dtype=torch.float32)
+    transition_matrix = torch.from_numpy(transition_data)
+    emission_matrix = torch.from_numpy(emission_data)
+    state_priors = torch.from_numpy(state_priors_data)
     
     return transition_matrix, emission_matrix, state_priors
 
-def load_indexes() -> Tuple[Dict[str, int], Dict[str, int], Dict[int, str], Dict[int, str]]:
-    """
-    Load index dictionaries and create their reverse mappings.
-    
-    Returns:
-        Tuple of (word_index_dict, state_index_dict, reverse_word_index, reverse_state_index)
-    """
-    # Load word index dictionary
-    with open(os.path.join(INDEXES_DIR, 'word_index.json'), 'r') as f:
-        word_index_dict = json.load(f)
-    
-    # Load state index dictionary
-    with open(os.path.join(INDEXES_DIR, 'state_index.json'), 'r') as f:
-        state_index_dict = json.load(f)
-    
-    # Create reverse mappings
-    reverse_word_index = {v: k for k, v in word_index_dict.items()}
-    reverse_state_index = {v: k for k, v in state_index_dict.items()}
-    
-    return word_index_dict, state_index_dict, reverse_word_index, reverse_state_index
-
 def get_model(run_number: Optional[int] = None) -> Model:
     """
     Load the HMM model matrices and index mappings.
@@ -471,172 +353,19 @@ def get_model(run_number: Optional[int] = None) -> Model:
             reverse_state_index
         )
     """
+    # Resolve the latest run once so the matrices and indexes come from the same run
+    if run_number is None:
+        run_number = get_latest_run_number()
+
     # Load matrices from specified run or latest run
     transition_matrix, emission_matrix, state_priors = load_matrices(run_number)
     
-    # Load index mappings
-    word_index_dict, state_index_dict, reverse_word_index, reverse_state_index = load_indexes()
+    # Load index mappings of the same run
+    word_index_dict, state_index_dict, reverse_word_index, reverse_state_index = load_indexes(run_number)
 
 
     return Model(transition_matrix, emission_matrix, word_index_dict, state_index_dict, reverse_word_index, reverse_state_index, state_priors)
 
 
-def replace_time_with_number(result: Dict[str, List[str]], sentence: str, get_placeholder=False) -> Dict[str, List[str]]:
-    # Convert any number words to their corresponding number
-    sentence = find_and_replace_time(sentence, get_placeholder=get_placeholder)
-
-    # Replace the special characters in the original sentence
-    sentence = remove_special_characters(sentence)
-
-    # Get the words
-    words = sentence.split()
-
-    for index, word in enumerate(words):
-        if word.isdigit():
-            # If the word is a digit
-            result['state_sequence_with_words'][index][1] = word
-
-    return result
-
-def split_cross_midnight_obligations(obligations):
-    split_obligations = []
-    
-    for obligation in obligations:
-        if obligation['end'] == datetime.strptime("00:00", "%H:%M").time():
-            obligation['end'] = datetime.strptime("23:59", "%H:%M").time()
-
-        start_minutes = obligation['start'].hour * 60 + obligation['start'].minute
-        end_minutes = obligation['end'].hour * 60 + obligation['end'].minute
-        
-        if start_minutes > end_minutes:  # Crosses midnight
-            # Create first part (from start to midnight)
-            midnight = datetime.strptime("23:59", "%H:%M").time()
-            split_obligations.append({
-                'task': obligation['task'] + " (Part 1)",
-                'start': obligation['start'],
-                'end': midnight
-            })
-            
-            # Create second part (from midnight to end)
-            next_day_start = datetime.strptime("00:00", "%H:%M").time()
-            split_obligations.append({
-                'task': obligation['task'] + " (Part 2)",
-                'start': next_day_start,
-                'end': obligation['end']
-            })
-        else:
-            split_obligations.append(obligation)
-    
-    return split_obligations
-
-def combine_split_obligations(schedule):
-    # Group tasks by their base name (removing " (Part 1)" and " (Part 2)")
-    task_groups = {}
-    for task in schedule:
-        base_name = task['task'].replace(" (Part 1)", "").replace(" (Part 2)", "")
-        if base_name not in task_groups:
-            task_groups[base_name] = []
-        task_groups[base_name].append(task)
-    
-    # Combine split tasks
-    combined_schedule = []
-    for base_name, tasks in task_groups.items():
-        if len(tasks) == 2 and "(Part 1)" in tasks[0]['task'] and "(Part 2)" in tasks[1]['task']:
-            # This was a split task, combine it
-            combined_schedule.append({
-                'task': base_name,
-                'start': tasks[0]['start'],
-                'end': tasks[1]['end']
-            })
-        else:
-            # This was not a split task, add it as is
-            combined_schedule.extend(tasks)
-    
-    return combined_schedule
-
-def adjust_wakeup_and_sleep(wake_up, sleep):
-    # Handle edge case where wake_up and sleep are the same time
-    if wake_up == sleep:
-        return []
-    
-    # Check if the sleep time is 00:00
-    if sleep == datetime.strptime("00:00", "%H:%M").time():
-        sleep = datetime.strptime("23:59", "%H:%M").time()
-        
-    # Handle normal case where wake up is before sleep time
-    if wake_up > sleep:
-        return [{"start": sleep, "end": wake_up}]
-        
-    # Handle case where sleep time is before wake up (crosses midnight)
-    elif wake_up < sleep:
-        midnight_end = datetime.strptime("23:59", "%H:%M").time()
-        midnight_start = datetime.strptime("00:00", "%H:%M").time()
-
-        # If either of the sleep, midnight end or the midnight start or the wake up overlap then they should not be scheduled
-        if sleep == midnight_end:
-            return [{"start": midnight_start, "end": wake_up}]
-        
-        if wake_up == midnight_start:
-            return [{"start": sleep, "end": midnight_end}]
-
-        # Return two time periods:
-        # 1. From sleep time to midnight
-        # 2. From midnight to wake up time
-        return [
-            {"start": sleep, "end": midnight_end},
-            {"start": midnight_start, "end": wake_up}
-        ]
-
-
-def get_available_slots(timeline):
-    """
-    Returns time slots that are not covered in the timeline.
-    
-    Args:
-        timeline: List of dicts with 'start' and 'end' times
-        
-    Returns:
-        List of dicts with 'start' and 'end' times representing available slots
-    """
-    if not timeline:
-        return []
-        
-    # Sort timeline by start time
-    sorted_timeline = sorted(timeline, key=lambda x: x['start'])
-    
-    # Initialize result list
-    available_slots = []
-    
-    # Get the full day boundaries
-    day_start = datetime.strptime("00:00", "%H:%M").time()
-    day_end = datetime.strptime("23:59", "%H:%M").time()
-    
-    # Check if there's a gap at the start of the day
-    if sorted_timeline[0]['start'] != day_start:
-        available_slots.append({
-            'start': day_start,
-            'end': sorted_timeline[0]['start']
-        })
-    
-    # Check for gaps between timeline slots
-    for i in range(len(sorted_timeline) - 1):
-        current_end = sorted_timeline[i]['end']
-        next_start = sorted_timeline[i + 1]['start']
-        
-        if current_end != next_start:
-            available_slots.append({
-                'start': current_end,
-                'end': next_start
-            })
-    
-    # Check if there's a gap at the end of the day
-    if sorted_timeline[-1]['end'] != day_end:
-        available_slots.append({
-            'start': sorted_timeline[-1]['end'],
-            'end': day_end
-        })
-    
-    return available_slots
-
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Variable and value ordering heuristics shared by the CSP solvers.
+
+The next task to assign is the unassigned task with a preference and the fewest values left, or
+the unassigned task with the fewest values left if every task with a preference is assigned,
+ties going to the task listed first. VariableOrder keeps the tasks in a heap keyed on
+(no preference, domain size, position) and is told by the DomainStore which domains changed,
+instead of scanning every task at every node.
+
+Values are tried in the preferred period of the task first. With the "lcv" ordering, the values
+of each group are tried least constraining first, the values that cover the fewest minutes also
+covered by the values of the other unassigned tasks.
+"""
+from heapq import heapify, heappop, heappush
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.core.domain_store import DomainStore
+from src.core.minutes import MINUTES_PER_DAY
+from src.core.periods import DEFAULT_PERIODS, PeriodTable
+
+PREFERENCE = "preference"
+LCV = "lcv"
+
+VALUE_ORDERINGS = [PREFERENCE, LCV]
+
+class VariableOrder:
+    """Lazy heap of the tasks, entries whose size is out of date are dropped when they reach the top."""
+
+    def __init__(self, tasks: List[Dict], store: DomainStore):
+        self.store = store
+        self.preferences = {task["task"]: task.get("preference") for task in tasks}
+        self.priorities = {
+            task["task"]: (0 if task.get("preference") else 1, position)
+            for position, task in enumerate(tasks)
+        }
+        # Tasks whose domain changed since the last selection, they get a new entry when selecting
+        self.changed = set()
+        store.listener = self.changed.add
+        self.rebuild()
+
+    def rebuild(self):
+        self.changed.clear()
+        self.heap = [self.entry(task) for task in self.priorities]
+        heapify(self.heap)
+
+    def entry(self, task: str) -> Tuple[int, int, int, str]:
+        no_preference, position = self.priorities[task]
+        return (no_preference, self.store.size(task), position, task)
+
+    def select(self, assigned) -> Optional[str]:
+        """Most constrained unassigned task, None if every task is assigned."""
+        heap, store = self.heap, self.store
+
+        # Out of date entries pile up in long searches
+        if len(heap) + len(self.changed) > 8 * len(self.priorities) + 64:
+            self.rebuild()
+            heap = self.heap
+        elif self.changed:
+            for task in self.changed:
+                if task in self.priorities:
+                    heappush(heap, self.entry(task))
+            self.changed.clear()
+
+        while heap:
+            _, size, _, task = heap[0]
+            if task not in assigned and size == store.size(task):
+                # The entry is dropped by the next selection once the task is assigned
+                return task
+            heappop(heap)
+        return None
+
+    def get_demand(self, task: str, assigned) -> List[int]:
+        """Demand of the values of the unassigned tasks other than the task."""
+        store = self.store
+        return get_demand(
+            store.get_values(other) for other in self.priorities if other != task and other not in assigned
+        )
+
+def get_demand(domains: Iterable[List[Tuple[int, int]]]) -> List[int]:
+    """
+    Prefix sums of the number of values covering each minute of the day.
+
+    The demand on [start, end) is demand[end] - demand[start].
+    """
+    changes = [0] * (MINUTES_PER_DAY + 1)
+    for domain in domains:
+        for start, end in domain:
+            changes[start] += 1
+            changes[end] -= 1
+    return [0] + list(accumulate(accumulate(changes)))[:MINUTES_PER_DAY]
+
+def order_values(values: List[Tuple[int, int]], preference: Optional[str], demand: Optional[List[int]] = None,
+                 periods: PeriodTable = DEFAULT_PERIODS) -> List[Tuple[int, int]]:
+    """Values of the preferred period first, then the others, least constraining first if the demand is given."""
+    if preference:
+        preference = preference.lower()
+        by_minute = periods.by_minute
+        preferred = [value for value in values if by_minute[value[0]] == preference]
+        others = [value for value in values if by_minute[value[0]] != preference]
+    else:
+        preferred, others = [], list(values)
+
+    if demand is not None:
+        preferred.sort(key=lambda value: demand[value[1]] - demand[value[0]])
+        others.sort(key=lambda value: demand[value[1]] - demand[value[0]])
+
+    return preferred + others
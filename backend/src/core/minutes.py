@@ -0,0 +1,175 @@
+"""
+Integer-minute representation of a day shared by the schedulers.
+
+Times are minutes since midnight (0 - 1439), a time slot is a (start, end) tuple of minutes.
+The schedulers work on minutes only, datetime.time objects are converted at the API boundary.
+"""
+from bisect import bisect_left
+from datetime import time
+from typing import Dict, List, Optional, Tuple
+
+from src.config import CSP_DOMAIN_STEP
+from src.core.periods import DEFAULT_PERIODS, MINUTES_PER_DAY, PeriodTable
+
+# The day ends at 23:59 for the schedulers
+DAY_END = MINUTES_PER_DAY - 1
+
+# Step between two possible start times of a task
+DOMAIN_STEP = CSP_DOMAIN_STEP
+
+# time objects of every minute of the day, converting back is a list lookup
+TIMES = [time(minute // 60, minute % 60) for minute in range(MINUTES_PER_DAY)]
+
+class Slot:
+    """A free time slot of the day."""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Slot) and self.start == other.start and self.end == other.end
+
+    def __repr__(self) -> str:
+        return f"Slot({self.start}, {self.end})"
+
+def to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+def from_minutes(minutes: int) -> time:
+    return TIMES[minutes % MINUTES_PER_DAY]
+
+def get_minute_preference(minutes: int, periods: PeriodTable = DEFAULT_PERIODS) -> str:
+    return periods.by_minute[minutes % MINUTES_PER_DAY]
+
+def get_preference_ranges(preference: str, periods: PeriodTable = DEFAULT_PERIODS) -> List[Tuple[int, int]]:
+    """(start, end) minutes of the parts of the day in the preferred period, in the order of the day."""
+    return periods.get_ranges(preference)
+
+def get_sleep_periods(wake_up: int, sleep: int) -> List[Tuple[int, int]]:
+    """Minute version of adjust_wakeup_and_sleep."""
+    if wake_up == sleep:
+        return []
+
+    # A sleep time of 00:00 means the end of the day
+    if sleep == 0:
+        sleep = DAY_END
+
+    if wake_up > sleep:
+        return [(sleep, wake_up)]
+
+    if sleep == DAY_END:
+        return [(0, wake_up)]
+
+    if wake_up == 0:
+        return [(sleep, DAY_END)]
+
+    return [(sleep, DAY_END), (0, wake_up)]
+
+def get_awake_slots(sleep_periods: List[Tuple[int, int]]) -> List[Slot]:
+    """Minute version of get_available_slots, the gaps of the day between the sleep periods."""
+    if not sleep_periods:
+        return []
+
+    sleep_periods = sorted(sleep_periods)
+    slots = []
+
+    if sleep_periods[0][0] != 0:
+        slots.append(Slot(0, sleep_periods[0][0]))
+
+    for (_, current_end), (next_start, _) in zip(sleep_periods, sleep_periods[1:]):
+        if current_end != next_start:
+            slots.append(Slot(current_end, next_start))
+
+    if sleep_periods[-1][1] != DAY_END:
+        slots.append(Slot(sleep_periods[-1][1], DAY_END))
+
+    return slots
+
+def get_obligation_intervals(obligations: List[Dict]) -> List[Tuple[int, int]]:
+    """
+    Convert obligations to (start, end) minutes sorted by start.
+
+    Obligations crossing midnight are split in two like split_cross_midnight_obligations does.
+    """
+    intervals = []
+
+    for obligation in obligations:
+        start = to_minutes(obligation["start"])
+        end = to_minutes(obligation["end"])
+
+        if end == 0 and start > 0:
+            end = DAY_END
+
+        if start > end:
+            intervals.append((start, DAY_END))
+            intervals.append((0, end))
+        else:
+            intervals.append((start, end))
+
+    intervals.sort()
+    return intervals
+
+def slots_from_timeline(timeline: List[Dict]) -> List[Slot]:
+    return [Slot(to_minutes(slot["start"]), to_minutes(slot["end"])) for slot in timeline]
+
+def get_slot_domain(slots: List[Slot], duration: int, step: int = DOMAIN_STEP) -> List[Tuple[int, int]]:
+    """Every (start, end) placement of a task of the given duration, starting every step minutes from each slot start."""
+    domain = []
+    for slot in slots:
+        for start in range(slot.start, slot.end - duration + 1, step):
+            domain.append((start, start + duration))
+    return domain
+
+def generate_domains(slots: List[Slot], tasks: List[Dict], step: int = DOMAIN_STEP) -> Dict[str, List[Tuple[int, int]]]:
+    """Domain of every task, tasks with the same duration share the same list."""
+    domains_by_duration = {}
+    domains = {}
+
+    for task in tasks:
+        duration = task["duration"]
+        if duration not in domains_by_duration:
+            domains_by_duration[duration] = get_slot_domain(slots, duration, step)
+        domains[task["task"]] = domains_by_duration[duration]
+
+    return domains
+
+def filter_by_preference(domain: List[Tuple[int, int]], preference: Optional[str],
+                         periods: PeriodTable = DEFAULT_PERIODS) -> List[Tuple[int, int]]:
+    """
+    Keep the placements of the domain starting in the preferred period of the day.
+
+    The domain is sorted by start like generate_domains builds it, so every run of the period is a slice of it.
+    """
+    if not preference:
+        return domain
+
+    filtered_domain = []
+    for start, end in get_preference_ranges(preference, periods):
+        # (minute,) sorts before every placement starting at that minute
+        filtered_domain.extend(domain[bisect_left(domain, (start,)):bisect_left(domain, (end,))])
+    return filtered_domain
+
+def get_preference_domains(domains: Dict[str, List[Tuple[int, int]]], tasks: List[Dict],
+                           periods: PeriodTable = DEFAULT_PERIODS) -> Dict[str, List[Tuple[int, int]]]:
+    """Domains restricted to the preferred period of each task, a task keeps its full domain if no value is left."""
+    preference_domains = {}
+
+    for task in tasks:
+        domain = domains[task["task"]]
+        filtered_domain = filter_by_preference(domain, task.get("preference"), periods)
+        preference_domains[task["task"]] = filtered_domain if filtered_domain else domain
+
+    return preference_domains
+
+def overlaps(slot1: Tuple[int, int], slot2: Tuple[int, int]) -> bool:
+    return slot1[0] < slot2[1] and slot1[1] > slot2[0]
+
+def to_task_dict(task: str, start: int, end: int) -> Dict:
+    """Scheduled task in the format returned by the schedulers."""
+    return {"task": task, "start": from_minutes(start), "end": from_minutes(end)}
@@ -0,0 +1,196 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Word classes of the number lexicon
+ZERO = "zero"
+UNIT = "unit"
+TEEN = "teen"
+TENS = "tens"
+HUNDRED = "hundred"
+SCALE = "scale"
+AND = "and"
+ARTICLE = "article"
+
+UNITS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+
+TEENS = [
+    "ten", "eleven", "twelve", "thirteen", "fourteen",
+    "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"
+]
+
+TENS_WORDS = ["twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+
+SCALES = {"thousand": 1000, "million": 1000000, "billion": 1000000000}
+
+def build_lexicon() -> Dict[str, Tuple[str, int]]:
+    lexicon = {"zero": (ZERO, 0), "hundred": (HUNDRED, 100), "and": (AND, 0), "a": (ARTICLE, 0)}
+
+    lexicon.update({word: (UNIT, value) for value, word in enumerate(UNITS, start=1)})
+    lexicon.update({word: (TEEN, value) for value, word in enumerate(TEENS, start=10)})
+    lexicon.update({word: (TENS, value) for value, word in zip(range(20, 100, 10), TENS_WORDS)})
+    lexicon.update({word: (SCALE, value) for word, value in SCALES.items()})
+
+    return lexicon
+
+NUMBER_LEXICON = build_lexicon()
+
+# States of the recognizer, named after the last word class read
+START = "start"
+AFTER_ZERO = "after_zero"
+AFTER_UNIT = "after_unit"
+AFTER_TEEN = "after_teen"
+AFTER_TENS = "after_tens"
+AFTER_TENS_UNIT = "after_tens_unit"
+AFTER_HUNDRED = "after_hundred"
+AFTER_HUNDRED_UNIT = "after_hundred_unit"
+AFTER_HUNDRED_TENS = "after_hundred_tens"
+AFTER_SCALE = "after_scale"
+AFTER_AND = "after_and"
+AFTER_ARTICLE = "after_article"
+
+# (state, word class) -> next state, any pair that is missing ends the number
+TRANSITIONS = {
+    (START, ZERO): AFTER_ZERO,
+    (START, UNIT): AFTER_UNIT,
+    (START, TEEN): AFTER_TEEN,
+    (START, TENS): AFTER_TENS,
+
+    # "hundred", "a hundred" and "a thousand" count one hundred or one thousand
+    (START, HUNDRED): AFTER_HUNDRED,
+    (START, ARTICLE): AFTER_ARTICLE,
+    (AFTER_ARTICLE, HUNDRED): AFTER_HUNDRED,
+    (AFTER_ARTICLE, SCALE): AFTER_SCALE,
+
+    (AFTER_UNIT, HUNDRED): AFTER_HUNDRED,
+    (AFTER_UNIT, SCALE): AFTER_SCALE,
+    (AFTER_TEEN, HUNDRED): AFTER_HUNDRED,
+    (AFTER_TEEN, SCALE): AFTER_SCALE,
+    (AFTER_TENS, UNIT): AFTER_TENS_UNIT,
+    (AFTER_TENS, SCALE): AFTER_SCALE,
+    (AFTER_TENS_UNIT, SCALE): AFTER_SCALE,
+
+    (AFTER_HUNDRED, AND): AFTER_AND,
+    (AFTER_HUNDRED, UNIT): AFTER_HUNDRED_UNIT,
+    (AFTER_HUNDRED, TEEN): AFTER_HUNDRED_UNIT,
+    (AFTER_HUNDRED, TENS): AFTER_HUNDRED_TENS,
+    (AFTER_HUNDRED, SCALE): AFTER_SCALE,
+    (AFTER_HUNDRED_TENS, UNIT): AFTER_HUNDRED_UNIT,
+    (AFTER_HUNDRED_TENS, SCALE): AFTER_SCALE,
+    (AFTER_HUNDRED_UNIT, SCALE): AFTER_SCALE,
+
+    (AFTER_SCALE, AND): AFTER_AND,
+    (AFTER_SCALE, UNIT): AFTER_UNIT,
+    (AFTER_SCALE, TEEN): AFTER_TEEN,
+    (AFTER_SCALE, TENS): AFTER_TENS,
+
+    (AFTER_AND, UNIT): AFTER_HUNDRED_UNIT,
+    (AFTER_AND, TEEN): AFTER_HUNDRED_UNIT,
+    (AFTER_AND, TENS): AFTER_HUNDRED_TENS
+}
+
+# A number cannot end on "and" or "a"
+ACCEPTING_STATES = {
+    AFTER_ZERO, AFTER_UNIT, AFTER_TEEN, AFTER_TENS, AFTER_TENS_UNIT,
+    AFTER_HUNDRED, AFTER_HUNDRED_UNIT, AFTER_HUNDRED_TENS, AFTER_SCALE
+}
+
+def split_number_word(word: str) -> Optional[List[Tuple[str, int]]]:
+    """
+    Look up a word in the number lexicon, hyphenated words like "twenty-nine" are split into their parts.
+
+    Returns:
+        The (word class, value) of every part, or None if the word is not a number word
+    """
+    entry = NUMBER_LEXICON.get(word)
+    if entry is not None:
+        return [entry]
+
+    if "-" not in word:
+        return None
+
+    parts = [NUMBER_LEXICON.get(part) for part in word.split("-") if part]
+    if not parts or None in parts:
+        return None
+
+    return parts
+
+def match_number(words: List[str], start: int) -> Tuple[int, int]:
+    """
+    Match the longest number phrase starting at words[start].
+
+    Args:
+        words: Lowercase words of the sentence
+        start: Index of the first word of the phrase
+
+    Returns:
+        (end, value): end is the index after the last word of the phrase, end == start if no number starts there
+    """
+    state = START
+    # Value of the completed groups ("two thousand") and of the group being read ("three hundred five")
+    total = 0
+    group = 0
+    # Scales must decrease within a number, "two thousand million" is two numbers
+    last_scale = None
+
+    end, value = start, 0
+
+    for index in range(start, len(words)):
+        parts = split_number_word(words[index])
+        if parts is None:
+            break
+
+        next_state, next_total, next_group, next_last_scale = state, total, group, last_scale
+
+        for word_class, word_value in parts:
+            next_state = TRANSITIONS.get((next_state, word_class))
+            if next_state is None:
+                break
+
+            # A hundred or a scale without a number before it counts one of them
+            if word_class == HUNDRED:
+                next_group = (next_group or 1) * 100
+            elif word_class == SCALE:
+                if next_last_scale is not None and word_value >= next_last_scale:
+                    next_state = None
+                    break
+                next_total += (next_group or 1) * word_value
+                next_group = 0
+                next_last_scale = word_value
+            else:
+                next_group += word_value
+
+        if next_state is None:
+            break
+
+        state, total, group, last_scale = next_state, next_total, next_group, next_last_scale
+
+        if state in ACCEPTING_STATES:
+            end, value = index + 1, total + group
+
+    return end, value
+
+def iter_numbers(words: List[str]) -> Iterator[Tuple[int, int, Optional[int]]]:
+    """
+    Split a list of words into number phrases and other words in one pass.
+
+    Digits are kept as their own phrase, number words are grouped into the longest phrase they form.
+
+    Yields:
+        (start, end, value) for every phrase, value is None for words that are not numbers
+    """
+    lowercase_words = [word.lower() for word in words]
+    index = 0
+
+    while index < len(words):
+        if words[index].isdecimal():
+            yield index, index + 1, int(words[index])
+            index += 1
+            continue
+
+        end, value = match_number(lowercase_words, index)
+
+        if end > index:
+            yield index, end, value
+            index = end
+        else:
+            yield index, index + 1, None
+            index += 1
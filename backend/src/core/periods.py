@@ -0,0 +1,68 @@
+"""
+Preference periods of the day compiled into a lookup table of the period of every minute.
+
+The periods of TIME_PERIOD_MAPPING are hour-granular and make the default table. A request can lay its
+own periods over it at minute granularity, such as an "early morning" from 05:30 to 08:00, and its
+table is compiled once before scheduling. The period of a start is then a list lookup, and the runs
+of minutes of each period let the schedulers cut a domain sorted by start into slices.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+from src.config import TIME_PERIOD_MAPPING, TIME_WORD_MAPPING
+
+MINUTES_PER_DAY = 24 * 60
+
+class PeriodTable:
+    """Period of every minute of the day, and the (start, end) runs of minutes of every period."""
+    __slots__ = ("by_minute", "ranges")
+
+    def __init__(self, by_minute: List[str]):
+        self.by_minute = by_minute
+        self.ranges: Dict[str, List[Tuple[int, int]]] = {}
+
+        start = 0
+        for minute in range(1, MINUTES_PER_DAY + 1):
+            if minute == MINUTES_PER_DAY or by_minute[minute] != by_minute[start]:
+                self.ranges.setdefault(by_minute[start], []).append((start, minute))
+                start = minute
+
+    def get_ranges(self, preference: str) -> List[Tuple[int, int]]:
+        """Runs of minutes of the preferred period in the order of the day, empty for an unknown period."""
+        return self.ranges.get(preference.lower(), [])
+
+def fill_period(by_minute: List[str], name: str, start: int, end: int) -> None:
+    """Set the period of the minutes from start to end, a period ending before it starts wraps around midnight."""
+    if start < end:
+        by_minute[start:end] = [name] * (end - start)
+    else:
+        by_minute[start:] = [name] * (MINUTES_PER_DAY - start)
+        by_minute[:end] = [name] * end
+
+def get_default_periods() -> PeriodTable:
+    """Table of TIME_PERIOD_MAPPING, the first period of the mapping wins and unmapped minutes are night."""
+    by_minute = [TIME_WORD_MAPPING["N"]] * MINUTES_PER_DAY
+    for key, (start_hour, end_hour) in reversed(list(TIME_PERIOD_MAPPING.items())):
+        fill_period(by_minute, TIME_WORD_MAPPING[key], start_hour * 60, end_hour * 60)
+    return PeriodTable(by_minute)
+
+DEFAULT_PERIODS = get_default_periods()
+
+def compile_periods(periods: Sequence[Tuple[str, int, int]] = ()) -> PeriodTable:
+    """
+    Table of the default periods with the given (name, start, end) periods laid over them in order.
+
+    Raises:
+        ValueError: A period has no name or no minute
+    """
+    if not periods:
+        return DEFAULT_PERIODS
+
+    by_minute = list(DEFAULT_PERIODS.by_minute)
+    for name, start, end in periods:
+        if not name:
+            raise ValueError("Preference period without a name")
+        if start == end:
+            raise ValueError(f"Empty preference period: {name}")
+        fill_period(by_minute, name.lower(), start % MINUTES_PER_DAY, end % MINUTES_PER_DAY)
+
+    return PeriodTable(by_minute)
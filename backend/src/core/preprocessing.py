@@ -0,0 +1,71 @@
+from typing import Dict, List
+
+from src.config import UNKNOWN_WORD
+
+from src.core.numbers import iter_numbers
+from src.core.tokenizer import Token, tokenize, join_tokens
+
+def find_and_replace_time(sentence: str, get_placeholder: bool = True) -> str:
+    words = sentence.split()
+    result = []
+
+    # Every number phrase, e.g. "5", "twenty-nine" or "one hundred twenty five", becomes a single word
+    for start, end, value in iter_numbers(words):
+        if value is None:
+            result.append(words[start])
+        elif get_placeholder:
+            result.append("<time>")
+        elif words[start].isdecimal():
+            result.append(words[start])
+        else:
+            result.append(str(value))
+
+    return " ".join(result)
+
+def remove_special_characters(sentence: str, omitted_characters: List[str] = []) -> str:
+    return "".join(
+        char for char in sentence
+        if char.isalpha() or char.isdigit() or char == " " or char in omitted_characters
+    )
+
+def preprocess_inference_sentence(sentence: str) -> str:
+    # Lowercase words without special characters, number phrases replaced by <time>
+    return join_tokens(tokenize(sentence))
+
+def get_indexes_list(sequence: str, index_dict: dict) -> List[int]:
+    # Convert into a list of words
+    words = sequence.split()
+
+    indexes = []
+
+    for word in words:
+        if word in index_dict:
+            indexes.append(index_dict[word])
+        else:
+            indexes.append(index_dict[UNKNOWN_WORD])
+
+    return indexes
+
+def fill_in_numbers(result: Dict[str, List], tokens: List[Token]) -> Dict[str, List]:
+    """
+    Put the numbers of the sentence back in place of the <time> placeholders and add the original words.
+
+    Args:
+        result: Decoding result of the sentence built from the tokens
+        tokens: Tokens of the original sentence
+    """
+    for index, token in enumerate(tokens):
+        if token.value is not None:
+            result['state_sequence_with_words'][index][1] = token.number
+
+    result['original_words'] = [token.text for token in tokens]
+    result['word_spans'] = [[token.start, token.end] for token in tokens]
+
+    return result
+
+def replace_time_with_number(result: Dict[str, List[str]], sentence: str, get_placeholder=False) -> Dict[str, List[str]]:
+    # With placeholders the numbers stay <time>, nothing to replace
+    if get_placeholder:
+        return result
+
+    return fill_in_numbers(result, tokenize(sentence))
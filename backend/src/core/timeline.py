@@ -0,0 +1,149 @@
+from datetime import datetime
+
+from src.core.periods import DEFAULT_PERIODS
+
+def is_between_time_period(time, time_period):
+    return time_period[0] <= time.hour < time_period[1]
+
+def get_time_to_preference(time):
+    return DEFAULT_PERIODS.by_minute[time.hour * 60 + time.minute]
+
+def split_cross_midnight_obligations(obligations):
+    split_obligations = []
+    
+    for obligation in obligations:
+        if obligation['end'] == datetime.strptime("00:00", "%H:%M").time():
+            obligation['end'] = datetime.strptime("23:59", "%H:%M").time()
+
+        start_minutes = obligation['start'].hour * 60 + obligation['start'].minute
+        end_minutes = obligation['end'].hour * 60 + obligation['end'].minute
+        
+        if start_minutes > end_minutes:  # Crosses midnight
+            # Create first part (from start to midnight)
+            midnight = datetime.strptime("23:59", "%H:%M").time()
+            split_obligations.append({
+                'task': obligation['task'] + " (Part 1)",
+                'start': obligation['start'],
+                'end': midnight
+            })
+            
+            # Create second part (from midnight to end)
+            next_day_start = datetime.strptime("00:00", "%H:%M").time()
+            split_obligations.append({
+                'task': obligation['task'] + " (Part 2)",
+                'start': next_day_start,
+                'end': obligation['end']
+            })
+        else:
+            split_obligations.append(obligation)
+    
+    return split_obligations
+
+def combine_split_obligations(schedule):
+    # Group tasks by their base name (removing " (Part 1)" and " (Part 2)")
+    task_groups = {}
+    for task in schedule:
+        base_name = task['task'].replace(" (Part 1)", "").replace(" (Part 2)", "")
+        if base_name not in task_groups:
+            task_groups[base_name] = []
+        task_groups[base_name].append(task)
+    
+    # Combine split tasks
+    combined_schedule = []
+    for base_name, tasks in task_groups.items():
+        if len(tasks) == 2 and "(Part 1)" in tasks[0]['task'] and "(Part 2)" in tasks[1]['task']:
+            # This was a split task, combine it
+            combined_schedule.append({
+                'task': base_name,
+                'start': tasks[0]['start'],
+                'end': tasks[1]['end']
+            })
+        else:
+            # This was not a split task, add it as is
+            combined_schedule.extend(tasks)
+    
+    return combined_schedule
+
+def adjust_wakeup_and_sleep(wake_up, sleep):
+    # Handle edge case where wake_up and sleep are the same time
+    if wake_up == sleep:
+        return []
+    
+    # Check if the sleep time is 00:00
+    if sleep == datetime.strptime("00:00", "%H:%M").time():
+        sleep = datetime.strptime("23:59", "%H:%M").time()
+        
+    # Handle normal case where wake up is before sleep time
+    if wake_up > sleep:
+        return [{"start": sleep, "end": wake_up}]
+        
+    # Handle case where sleep time is before wake up (crosses midnight)
+    elif wake_up < sleep:
+        midnight_end = datetime.strptime("23:59", "%H:%M").time()
+        midnight_start = datetime.strptime("00:00", "%H:%M").time()
+
+        # If either of the sleep, midnight end or the midnight start or the wake up overlap then they should not be scheduled
+        if sleep == midnight_end:
+            return [{"start": midnight_start, "end": wake_up}]
+        
+        if wake_up == midnight_start:
+            return [{"start": sleep, "end": midnight_end}]
+
+        # Return two time periods:
+        # 1. From sleep time to midnight
+        # 2. From midnight to wake up time
+        return [
+            {"start": sleep, "end": midnight_end},
+            {"start": midnight_start, "end": wake_up}
+        ]
+
+
+def get_available_slots(timeline):
+    """
+    Returns time slots that are not covered in the timeline.
+    
+    Args:
+        timeline: List of dicts with 'start' and 'end' times
+        
+    Returns:
+        List of dicts with 'start' and 'end' times representing available slots
+    """
+    if not timeline:
+        return []
+        
+    # Sort timeline by start time
+    sorted_timeline = sorted(timeline, key=lambda x: x['start'])
+    
+    # Initialize result list
+    available_slots = []
+    
+    # Get the full day boundaries
+    day_start = datetime.strptime("00:00", "%H:%M").time()
+    day_end = datetime.strptime("23:59", "%H:%M").time()
+    
+    # Check if there's a gap at the start of the day
+    if sorted_timeline[0]['start'] != day_start:
+        available_slots.append({
+            'start': day_start,
+            'end': sorted_timeline[0]['start']
+        })
+    
+    # Check for gaps between timeline slots
+    for i in range(len(sorted_timeline) - 1):
+        current_end = sorted_timeline[i]['end']
+        next_start = sorted_timeline[i + 1]['start']
+        
+        if current_end != next_start:
+            available_slots.append({
+                'start': current_end,
+                'end': next_start
+            })
+    
+    # Check if there's a gap at the end of the day
+    if sorted_timeline[-1]['end'] != day_end:
+        available_slots.append({
+            'start': sorted_timeline[-1]['end'],
+            'end': day_end
+        })
+    
+    return available_slots
@@ -0,0 +1,83 @@
+from typing import List, Optional
+
+from src.core.numbers import iter_numbers
+
+TIME_PLACEHOLDER = "<time>"
+
+class Token:
+    """
+    A word of the input sentence as seen by the model.
+
+    Attributes:
+        text: Original text of the word, a number phrase like "Twenty Five" is a single token
+        norm: Lowercase word without special characters, "<time>" for numbers
+        start: Offset of the first character of the word in the original sentence
+        end: Offset after the last character of the word in the original sentence
+        value: Value of the number, None for other words
+    """
+    __slots__ = ("text", "norm", "start", "end", "value")
+
+    def __init__(self, text: str, norm: str, start: int, end: int, value: Optional[int] = None):
+        self.text = text
+        self.norm = norm
+        self.start = start
+        self.end = end
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Token({self.text!r}, {self.norm!r}, {self.start}, {self.end}, {self.value!r})"
+
+    @property
+    def number(self) -> Optional[str]:
+        """The number as it should be shown, digits are kept as they were written."""
+        if self.value is None:
+            return None
+        if self.text.isdecimal():
+            return self.text
+        return str(self.value)
+
+def tokenize(sentence: str) -> List[Token]:
+    """
+    Split a sentence into tokens in one pass over its characters.
+
+    Words are separated by whitespace and only keep letters and digits, words without any are dropped.
+    Hyphens are kept while looking for number phrases so that "twenty-nine" is recognized.
+    """
+    # (start, end, lowercase word with hyphens) of every word
+    words = []
+    start = end = None
+    characters = []
+
+    for index, char in enumerate(sentence):
+        if char.isspace():
+            if characters:
+                words.append((start, end, "".join(characters)))
+            start = None
+            characters = []
+        elif char.isalpha() or char.isdigit() or char == "-":
+            if start is None:
+                start = index
+            end = index + 1
+            characters.append(char.lower())
+
+    if characters:
+        words.append((start, end, "".join(characters)))
+
+    tokens = []
+
+    for first, last, value in iter_numbers([word for _, _, word in words]):
+        start, end = words[first][0], words[last - 1][1]
+
+        if value is not None:
+            tokens.append(Token(sentence[start:end], TIME_PLACEHOLDER, start, end, value))
+            continue
+
+        norm = words[first][2].replace("-", "")
+        if norm:
+            tokens.append(Token(sentence[start:end], norm, start, end))
+
+    return tokens
+
+def join_tokens(tokens: List[Token]) -> str:
+    """The sentence given to the model."""
+    return " ".join(token.norm for token in tokens)
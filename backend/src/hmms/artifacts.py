@@ -0,0 +1,220 @@
+from typing import Dict, Optional, Tuple
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from src.config import MODEL_DIR, INDEXES_DIR
+
+# Binary matrix artifacts are a fixed size header followed by raw little-endian float32 values.
+# The header is padded to 64 bytes so the data is aligned and can be memory-mapped directly.
+ARRAY_MAGIC = b"HMMA"
+
+ARRAY_FORMAT_VERSION = 1
+
+ARRAY_HEADER_SIZE = 64
+
+ARRAY_DTYPE = np.dtype("<f4")
+
+# Header layout: magic, version, number of dimensions, then one uint32 per dimension
+ARRAY_HEADER_PREFIX = struct.Struct("<4sHH")
+
+MATRIX_FILES = ["transition", "emission", "state_priors"]
+
+INDEX_FILES = ["word_index", "state_index"]
+
+def write_array(path: str, array: np.ndarray) -> None:
+    """
+    Write an array to the binary artifact format.
+
+    Args:
+        path: The file to write
+        array: The array to save, it is stored as little-endian float32
+    """
+    array = np.ascontiguousarray(array, dtype=ARRAY_DTYPE)
+
+    header = ARRAY_HEADER_PREFIX.pack(ARRAY_MAGIC, ARRAY_FORMAT_VERSION, array.ndim)
+    header += struct.pack(f"<{array.ndim}I", *array.shape)
+
+    if len(header) > ARRAY_HEADER_SIZE:
+        raise ValueError(f"Arrays with {array.ndim} dimensions do not fit in the artifact header")
+
+    with open(path, "wb") as f:
+        f.write(header.ljust(ARRAY_HEADER_SIZE, b"\0"))
+        f.write(array.tobytes())
+
+def read_array(path: str, mmap_mode: Optional[str] = "r") -> np.ndarray:
+    """
+    Read an array written by write_array.
+
+    Args:
+        path: The file to read
+        mmap_mode: Mode passed to np.memmap ("r" shares the pages between processes, "c" is copy-on-write).
+            If None the data is read into memory instead.
+
+    Returns:
+        The array as float32
+    """
+    with open(path, "rb") as f:
+        header = f.read(ARRAY_HEADER_SIZE)
+
+    if len(header) < ARRAY_HEADER_SIZE:
+        raise ValueError(f"Invalid model artifact: {path}")
+
+    magic, version, ndim = ARRAY_HEADER_PREFIX.unpack_from(header)
+
+    if magic != ARRAY_MAGIC:
+        raise ValueError(f"Invalid model artifact: {path}")
+
+    if version != ARRAY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {version}: {path}")
+
+    shape = struct.unpack_from(f"<{ndim}I", header, ARRAY_HEADER_PREFIX.size)
+
+    if mmap_mode is None:
+        with open(path, "rb") as f:
+            f.seek(ARRAY_HEADER_SIZE)
+            return np.fromfile(f, dtype=ARRAY_DTYPE, count=int(np.prod(shape))).reshape(shape)
+
+    return np.memmap(path, dtype=ARRAY_DTYPE, mode=mmap_mode, offset=ARRAY_HEADER_SIZE, shape=shape)
+
+def save_matrix_arrays(run_dir: str, transition_matrix: np.ndarray, emission_matrix: np.ndarray, state_priors: np.ndarray, export_json: bool = False) -> None:
+    """
+    Save the matrices of a run in the binary artifact format.
+
+    Args:
+        run_dir: The run directory to save into
+        transition_matrix: The transition matrix
+        emission_matrix: The emission matrix
+        state_priors: The state priors
+        export_json: Also write the matrices as indented JSON, useful for debugging
+    """
+    matrices = dict(zip(MATRIX_FILES, [transition_matrix, emission_matrix, state_priors]))
+
+    for name, matrix in matrices.items():
+        write_array(os.path.join(run_dir, f'{name}.bin'), matrix)
+
+        if export_json:
+            with open(os.path.join(run_dir, f'{name}.json'), 'w') as f:
+                json.dump(np.asarray(matrix).tolist(), f, indent=2)
+
+def is_complete_run(run_dir: str) -> bool:
+    """A run is complete once every matrix has been written, either as a binary artifact or as JSON."""
+    return all(
+        os.path.exists(os.path.join(run_dir, f'{name}.bin')) or os.path.exists(os.path.join(run_dir, f'{name}.json'))
+        for name in MATRIX_FILES
+    )
+
+def get_next_run_number() -> int:
+    """Number of the next run, one more than every run directory including incomplete ones."""
+    runs = [d for d in os.listdir(MODEL_DIR) if d.startswith('run') and d[3:].isdigit() and os.path.isdir(os.path.join(MODEL_DIR, d))]
+    return max((int(d[3:]) for d in runs), default=0) + 1
+
+def get_latest_run_number() -> int:
+    """Get the number of the latest complete run."""
+    runs = [d for d in os.listdir(MODEL_DIR) if d.startswith('run') and d[3:].isdigit() and os.path.isdir(os.path.join(MODEL_DIR, d))]
+    runs = [d for d in runs if is_complete_run(os.path.join(MODEL_DIR, d))]
+    if not runs:
+        raise ValueError("No model runs found")
+
+    return max(int(d[3:]) for d in runs)  # Extract number from 'runX'
+
+def get_latest_run() -> str:
+    """Get the path of the latest run directory."""
+    return os.path.join(MODEL_DIR, f'run{get_latest_run_number()}')
+
+def get_run_dir(run_number: Optional[int] = None) -> str:
+    """
+    Get the directory of a specific run or the latest run.
+
+    Args:
+        run_number: Optional run number. If None, the latest run is used.
+
+    Returns:
+        str: The path of the run directory
+    """
+    if run_number is not None:
+        run_dir = os.path.join(MODEL_DIR, f'run{run_number}')
+        if not os.path.exists(run_dir):
+            raise ValueError(f"Run {run_number} does not exist")
+        return run_dir
+
+    return get_latest_run()
+
+def load_matrix_arrays(run_number: Optional[int] = None, mmap_mode: Optional[str] = "r") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load the transition matrix, emission matrix and state priors of a run as float32 NumPy arrays.
+    This does not depend on torch, so it can be used by the NumPy inference backend.
+
+    Binary artifacts are memory-mapped so worker processes share one copy of the pages,
+    runs saved before the binary format was introduced are read from their JSON files.
+
+    Args:
+        run_number: Optional run number to load from. If None, loads from latest run.
+        mmap_mode: Memory map mode for binary artifacts, see read_array
+
+    Returns:
+        Tuple of (transition_matrix, emission_matrix, state_priors) as NumPy arrays
+    """
+    run_dir = get_run_dir(run_number)
+
+    matrices = []
+
+    for name in MATRIX_FILES:
+        binary_path = os.path.join(run_dir, f'{name}.bin')
+
+        if os.path.exists(binary_path):
+            matrices.append(read_array(binary_path, mmap_mode=mmap_mode))
+            continue
+
+        with open(os.path.join(run_dir, f'{name}.json'), 'r') as f:
+            matrices.append(np.asarray(json.load(f), dtype=np.float32))
+
+    transition_matrix, emission_matrix, state_priors = matrices
+
+    return transition_matrix, emission_matrix, state_priors
+
+def save_index_dicts(directory: str, word_index_dict: dict, state_index_dict: dict) -> None:
+    """
+    Save word and state index dictionaries to JSON files in a directory.
+
+    Args:
+        directory: The directory to save into, a run directory or INDEXES_DIR
+        word_index_dict: Dictionary mapping words to their indexes
+        state_index_dict: Dictionary mapping states to their indexes
+    """
+    for name, index_dict in zip(INDEX_FILES, [word_index_dict, state_index_dict]):
+        with open(os.path.join(directory, f'{name}.json'), 'w') as f:
+            json.dump(index_dict, f, indent=2)
+
+def load_indexes(run_number: Optional[int] = None) -> Tuple[Dict[str, int], Dict[str, int], Dict[int, str], Dict[int, str]]:
+    """
+    Load index dictionaries and create their reverse mappings.
+
+    The indexes are saved with the matrices of a run, runs saved before that are read from INDEXES_DIR.
+
+    Args:
+        run_number: Optional run number to load from. If None, loads from latest run.
+
+    Returns:
+        Tuple of (word_index_dict, state_index_dict, reverse_word_index, reverse_state_index)
+    """
+    indexes_dir = get_run_dir(run_number)
+    if not all(os.path.exists(os.path.join(indexes_dir, f'{name}.json')) for name in INDEX_FILES):
+        indexes_dir = INDEXES_DIR
+
+    # Load word index dictionary
+    with open(os.path.join(indexes_dir, 'word_index.json'), 'r') as f:
+        word_index_dict = json.load(f)
+    
+    # Load state index dictionary
+    with open(os.path.join(indexes_dir, 'state_index.json'), 'r') as f:
+        state_index_dict = json.load(f)
+    
+    # Create reverse mappings
+    reverse_word_index = {v: k for k, v in word_index_dict.items()}
+    reverse_state_index = {v: k for k, v in state_index_dict.items()}
+    
+    return word_index_dict, state_index_dict, reverse_word_index, reverse_state_index
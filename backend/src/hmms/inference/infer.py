@@ -1,43 +1,152 @@
-import torch
-
-from src.core.helpers import (
-    get_model, 
-    Model, 
-    preprocess_inference_sentence, 
-    get_indexes_list,
-    replace_time_with_number
+from typing import Dict, List, Optional
+
+import logging
+import threading
+
+from src.config import (
+    INFERENCE_BACKEND,
+    WARM_UP_SENTENCE,
+    MODEL_WATCH_INTERVAL,
+    INFERENCE_CACHE_SIZE,
+    INFERENCE_CACHE_TTL
 )
 
-model = None
+from src.core.preprocessing import preprocess_inference_sentence, fill_in_numbers
+from src.core.tokenizer import tokenize, join_tokens
+
+from src.hmms.inference.manager import ModelManager
+from src.hmms.inference.cache import LRUCache
+
+logger = logging.getLogger(__name__)
 
 hmm = None
 
-got_model = False
+# Set once the model is loaded and has decoded a sentence, by the warm-up or by the first request
+model_ready = False
 
-if not got_model:
-    model = get_model()
-    print(model.transition_matrix.shape)
-    print(model.emission_matrix.shape)
-    print(model.state_priors.shape)
-    got_model = True
+warm_up_error = None
 
-def infer(sentence: str) -> str:
-    global model
+def load_model(run_number: Optional[int] = None):
+    """Load the model with the configured inference backend, torch is only imported for the torch backend."""
+    if INFERENCE_BACKEND == "numpy":
+        from src.hmms.numpy_model import get_numpy_model
+        return get_numpy_model(run_number)
+    elif INFERENCE_BACKEND == "torch":
+        from src.core.helpers import get_model
+        return get_model(run_number)
+    else:
+        raise ValueError(f"Invalid inference backend: {INFERENCE_BACKEND}")
+
+# The manager loads the latest run on first use and swaps in newer runs when watching
+model_manager = ModelManager(lambda run_number: load_model(run_number), poll_interval=MODEL_WATCH_INTERVAL)
+
+# Viterbi results keyed on the run number of the model and the preprocessed sentence, the numbers of each
+# request are filled in after the lookup
+inference_cache = LRUCache(max_size=INFERENCE_CACHE_SIZE, ttl=INFERENCE_CACHE_TTL)
+
+# Results of the old model can no longer be looked up after a swap, free them. A request still decoding
+# with the old model caches its result under the old run number
+model_manager.add_swap_listener(lambda model, run_number: inference_cache.clear())
+
+def get_inference_model():
+    """Return the current inference model, loading it on first use."""
+    return model_manager.get_model()
+
+def start_model_watcher() -> threading.Thread:
+    """Watch MODEL_DIR for newly trained runs and swap them in without restarting the server."""
+    return model_manager.start_watching()
+
+def set_ready() -> None:
+    """The model is loaded and has decoded a sentence, it is ready to serve requests."""
+    global model_ready, warm_up_error
+
+    warm_up_error = None
+    model_ready = True
+
+def warm_up() -> None:
+    """Load the model and run one dummy decode, after this the model is ready to serve requests."""
+    global warm_up_error
+
+    try:
+        get_inference_model().get_most_likely_state_sequence(preprocess_inference_sentence(WARM_UP_SENTENCE))
+    except Exception as e:
+        warm_up_error = str(e)
+        logger.exception("Model warm-up failed")
+        raise
+
+    set_ready()
 
-    original_sentence = sentence
+def start_warm_up() -> threading.Thread:
+    """Warm up the model in a background thread so the server can start serving other routes."""
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            pass
 
-    # Preprocess the sentence
-    sentence = preprocess_inference_sentence(sentence)
+    thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
 
-    print(sentence)
+def is_ready() -> bool:
+    return model_ready
 
-    # print(tensor_sentence_indexes.unsqueeze(0))
-    result = model.get_most_likely_state_sequence(sentence)
+def get_warm_up_error() -> Optional[str]:
+    return warm_up_error
 
-    result = replace_time_with_number(result, original_sentence, get_placeholder=False)
+def get_cache_stats() -> Dict[str, float]:
+    return inference_cache.stats()
+
+def copy_result(result: Dict[str, List]) -> Dict[str, List]:
+    """Copy a decoding result so the cached one is not modified when the numbers are filled in."""
+    return {
+        "state_sequence": list(result["state_sequence"]),
+        "word_indices": list(result["word_indices"]),
+        "state_sequence_with_words": [list(item) for item in result["state_sequence_with_words"]]
+    }
+
+def infer(sentence: str) -> str:
+    # Tokenize once, the same tokens build the model input and fill the numbers back in
+    tokens = tokenize(sentence)
+    sentence = join_tokens(tokens)
+
+    model, run_number = model_manager.get_current()
+    result = inference_cache.get((run_number, sentence))
+
+    if result is None:
+        result = model.get_most_likely_state_sequence(sentence)
+        inference_cache.put((run_number, sentence), result)
+
+    # A lazily loaded model is ready once it has decoded a request, even without a warm-up
+    if not model_ready:
+        set_ready()
+
+    result = fill_in_numbers(copy_result(result), tokens)
     
     return result
 
+def infer_batch(sentences: List[str]) -> List[Dict[str, List]]:
+    # Tokenize every sentence and decode the ones that are not cached together in one Viterbi pass
+    sentence_tokens = [tokenize(sentence) for sentence in sentences]
+    preprocessed_sentences = [join_tokens(tokens) for tokens in sentence_tokens]
+
+    model, run_number = model_manager.get_current()
+    results = [inference_cache.get((run_number, sentence)) for sentence in preprocessed_sentences]
+
+    missing = [index for index, result in enumerate(results) if result is None]
+
+    if missing:
+        decoded = model.decode_batch([preprocessed_sentences[index] for index in missing])
+
+        for index, result in zip(missing, decoded):
+            inference_cache.put((run_number, preprocessed_sentences[index]), result)
+            results[index] = result
+
+    if not model_ready:
+        set_ready()
+
+    return [fill_in_numbers(copy_result(result), tokens) for result, tokens in zip(results, sentence_tokens)]
+
 if __name__ == "__main__":
     sentence = """The time for playing hockey should be twenty-nine hours in the morning"""
 
@@ -0,0 +1,120 @@
+from typing import Any, Callable, List, Optional, Tuple
+
+import logging
+import threading
+
+from src.hmms.artifacts import get_latest_run_number
+
+logger = logging.getLogger(__name__)
+
+
+class ModelManager:
+    """
+    Owns the model used for inference and swaps it for newer runs without a restart.
+
+    Requests take a reference to the current model with get_model() and keep using it,
+    so a request that is in flight when a new run is swapped in finishes on the old model.
+    """
+    def __init__(self, loader: Callable[[Optional[int]], Any], poll_interval: float = 30.0):
+        """
+        Args:
+            loader: Function loading the model of a given run number
+            poll_interval: Seconds between two checks of MODEL_DIR for a new run
+        """
+        self.loader = loader
+        self.poll_interval = poll_interval
+
+        # (model, run_number), replaced as a whole so a reader never pairs a model with another run
+        self.current: Tuple[Any, Optional[int]] = (None, None)
+
+        self.swap_listeners: List[Callable[[Any, Optional[int]], None]] = []
+
+        self.load_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.watcher = None
+
+    @property
+    def model(self) -> Any:
+        return self.current[0]
+
+    @property
+    def run_number(self) -> Optional[int]:
+        return self.current[1]
+
+    def get_current(self) -> Tuple[Any, Optional[int]]:
+        """Return the current model and its run number, loading the latest run on first use."""
+        current = self.current
+
+        if current[0] is None:
+            with self.load_lock:
+                if self.current[0] is None:
+                    run_number = get_latest_run_number()
+                    self.swap(self.loader(run_number), run_number)
+                current = self.current
+
+        return current
+
+    def get_model(self) -> Any:
+        """Return the current model, loading the latest run on first use."""
+        return self.get_current()[0]
+
+    def swap(self, model: Any, run_number: Optional[int]) -> None:
+        """Replace the current model, a single reference assignment so readers never see a partial swap."""
+        self.current = (model, run_number)
+
+        for listener in self.swap_listeners:
+            listener(model, run_number)
+
+    def add_swap_listener(self, listener: Callable[[Any, Optional[int]], None]) -> None:
+        """Register a function called with (model, run_number) every time a model is swapped in."""
+        self.swap_listeners.append(listener)
+
+    def check_for_new_run(self) -> bool:
+        """
+        Load the latest complete run if it is newer than the current one and swap it in.
+
+        Returns:
+            bool: True if a new model was swapped in
+        """
+        try:
+            latest_run_number = get_latest_run_number()
+        except ValueError:
+            return False
+
+        if self.run_number is not None and latest_run_number <= self.run_number:
+            return False
+
+        # Load outside of the lock so requests keep being served by the old model meanwhile
+        model = self.loader(latest_run_number)
+
+        with self.load_lock:
+            if self.run_number is not None and latest_run_number <= self.run_number:
+                return False
+            self.swap(model, latest_run_number)
+
+        logger.info(f"Swapped in model run{latest_run_number}")
+        return True
+
+    def start_watching(self) -> threading.Thread:
+        """Poll MODEL_DIR for new runs in a background thread."""
+        if self.watcher is not None and self.watcher.is_alive():
+            return self.watcher
+
+        self.stop_event.clear()
+
+        def watch():
+            while not self.stop_event.wait(self.poll_interval):
+                try:
+                    self.check_for_new_run()
+                except Exception:
+                    logger.exception("Failed to load the new model run")
+
+        self.watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self.watcher.start()
+        return self.watcher
+
+    def stop_watching(self) -> None:
+        self.stop_event.set()
+        if self.watcher is not None:
+            self.watcher.join()
+            self.watcher = None
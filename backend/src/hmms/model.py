@@ -19,71 +19,153 @@ class Model:
         self.reverse_state_index = reverse_state_index
         self.state_priors = state_priors
 
+        self.log_transition_matrix = None
+        self.log_emission_matrix = None
+        self.log_state_priors = None
+
+        if transition_matrix is not None and emission_matrix is not None and state_priors is not None:
+            self.compute_log_matrices()
+
+    def compute_log_matrices(self) -> None:
+        """
+        Precompute the log-space transition, emission and prior matrices used by Viterbi.
+        Must be called again if any of the probability matrices are replaced.
+        """
+        self.log_transition_matrix = torch.log(self.transition_matrix)
+        self.log_emission_matrix = torch.log(self.emission_matrix)
+        self.log_state_priors = torch.log(self.state_priors)
+
+    def get_word_indices(self, words: List[str]) -> List[int]:
+        """Map words to their vocabulary indexes, using the unknown word index for unseen words."""
+        unknown_index = self.word_index_dict.get(UNKNOWN_WORD)
+        return [self.word_index_dict.get(word, unknown_index) for word in words]
+
     def get_most_likely_state_sequence(self, sentence: str) -> List[str]:
         """
         Implements the Viterbi algorithm to find the most likely sequence of states
         given an observation sequence (sentence).
-        
+
+        Each timestep is a single max-plus operation over all states using the
+        log matrices precomputed when the model was loaded.
+
         Args:
             sentence: A preprocessed sentence string
-            
+
         Returns:
             A list of state labels corresponding to each word in the sentence
         """
         # Convert sentence to word indices
         words = sentence.split()
-        word_indices = []
-        for word in words:
-            if word in self.word_index_dict:
-                word_indices.append(self.word_index_dict[word])
-            else:
-                # Handle unknown words with a special token index
-                word_indices.append(self.word_index_dict.get(UNKNOWN_WORD))
-        
-        # Initialize variables
-        num_states = len(self.state_index_dict)
+        word_indices = self.get_word_indices(words)
+
         T = len(word_indices)
-        
-        # Initialize the viterbi matrix (T x num_states) and backpointer matrix
-        viterbi = torch.zeros((T, num_states))
-        backpointer = torch.zeros((T, num_states), dtype=torch.long)
-        
+
+        if T == 0:
+            return self.build_result([], [], [])
+
+        # Gather the emission log probabilities of every word at once (T x num_states)
+        log_emissions = self.log_emission_matrix[torch.tensor(word_indices, dtype=torch.long)]
+
+        # Backpointer matrix (T x num_states), the first row is never read
+        backpointer = torch.zeros((T, self.log_transition_matrix.shape[0]), dtype=torch.long)
+
         # Initialize first timestep using state priors and emission probabilities
-        first_word_idx = word_indices[0]
-        viterbi[0] = torch.log(self.state_priors) + torch.log(self.emission_matrix[first_word_idx])
-        
-        # Forward pass
+        viterbi = self.log_state_priors + log_emissions[0]
+
+        # Forward pass, rows of the transition matrix are the current state and columns the previous one
         for t in range(1, T):
-            word_idx = word_indices[t]
-            for s in range(num_states):
-                # Calculate emission probability for current state and word
-                emission_prob = torch.log(self.emission_matrix[word_idx][s])
-                
-                # Calculate transition probabilities to current state
-                transition_probs = torch.log(self.transition_matrix[s,:]) + viterbi[t-1]
-                
-                # Find the maximum probability and its corresponding previous state
-                max_prob, prev_state = torch.max(transition_probs, dim=0)
-                
-                # Store the probability and backpointer
-                viterbi[t][s] = emission_prob + max_prob
-                backpointer[t][s] = prev_state
-        
-        # Backward pass to find the most likely sequence
-        state_sequence_indices = []
-        
-        # Find the most likely final state
-        current_state = torch.argmax(viterbi[-1])
-        state_sequence_indices.append(current_state.item())
-        
-        # Backtrack through the sequence
-        for t in range(T-1, 0, -1):
-            current_state = backpointer[t][current_state]
-            state_sequence_indices.insert(0, current_state.item())
-        
+            scores = self.log_transition_matrix + viterbi.unsqueeze(0)
+            max_probs, backpointer[t] = torch.max(scores, dim=1)
+            viterbi = max_probs + log_emissions[t]
+
+        # Backward pass into a preallocated array
+        state_sequence_indices = [0] * T
+        backpointer_rows = backpointer.tolist()
+
+        current_state = int(torch.argmax(viterbi))
+        state_sequence_indices[T - 1] = current_state
+
+        for t in range(T - 1, 0, -1):
+            current_state = backpointer_rows[t][current_state]
+            state_sequence_indices[t - 1] = current_state
+
+        return self.build_result(state_sequence_indices, words, word_indices)
+
+    def decode_batch(self, sentences: List[str]) -> List[Dict[str, List]]:
+        """
+        Run Viterbi over a list of preprocessed sentences in one pass.
+
+        Sentences are padded into a single (batch x max_length) index tensor with a
+        length mask. Padded timesteps carry the scores over unchanged and point back
+        to the same state, so every backtrace can start from the last column.
+
+        Args:
+            sentences: A list of preprocessed sentence strings
+
+        Returns:
+            A list with one result per sentence, in the same format as get_most_likely_state_sequence
+        """
+        if not sentences:
+            return []
+
+        batch_words = [sentence.split() for sentence in sentences]
+        batch_word_indices = [self.get_word_indices(words) for words in batch_words]
+        lengths = [len(word_indices) for word_indices in batch_word_indices]
+
+        B = len(sentences)
+        T = max(lengths)
+        num_states = self.log_transition_matrix.shape[0]
+
+        if T == 0:
+            return [self.build_result([], [], []) for _ in sentences]
+
+        # Pad with index 0, the padded positions are masked out below
+        index_tensor = torch.zeros((B, T), dtype=torch.long)
+        for b, word_indices in enumerate(batch_word_indices):
+            index_tensor[b, :lengths[b]] = torch.tensor(word_indices, dtype=torch.long)
+
+        length_tensor = torch.tensor(lengths, dtype=torch.long)
+        mask = torch.arange(T).unsqueeze(0) < length_tensor.unsqueeze(1)
+
+        # Emission log probabilities for the whole batch (B x T x num_states)
+        log_emissions = self.log_emission_matrix[index_tensor]
+
+        # Padded timesteps point back to the state they are in
+        identity_pointers = torch.arange(num_states).unsqueeze(0).expand(B, num_states)
+        backpointer = torch.zeros((B, T, num_states), dtype=torch.long)
+
+        viterbi = self.log_state_priors.unsqueeze(0) + log_emissions[:, 0]
+
+        for t in range(1, T):
+            scores = self.log_transition_matrix.unsqueeze(0) + viterbi.unsqueeze(1)
+            max_probs, prev_states = torch.max(scores, dim=2)
+
+            step_mask = mask[:, t].unsqueeze(1)
+            viterbi = torch.where(step_mask, max_probs + log_emissions[:, t], viterbi)
+            backpointer[:, t] = torch.where(step_mask, prev_states, identity_pointers)
+
+        # Backtrace every sentence from the last column
+        backpointer_rows = backpointer.tolist()
+        final_states = torch.argmax(viterbi, dim=1).tolist()
+
+        results = []
+        for b in range(B):
+            state_sequence_indices = [0] * T
+            current_state = final_states[b]
+            state_sequence_indices[T - 1] = current_state
+
+            for t in range(T - 1, 0, -1):
+                current_state = backpointer_rows[b][t][current_state]
+                state_sequence_indices[t - 1] = current_state
+
+            results.append(self.build_result(state_sequence_indices[:lengths[b]], batch_words[b], batch_word_indices[b]))
+
+        return results
+
+    def build_result(self, state_sequence_indices: List[int], words: List[str], word_indices: List[int]) -> Dict[str, List]:
+        """Convert decoded state indexes into the result dictionary returned by the decoders."""
         # Convert state indices back to state labels
         state_sequence = [self.reverse_state_index[idx] for idx in state_sequence_indices]
-        
 
         # Zip the state sequence and word indices
         # Convert from tuple to list of lists
@@ -95,8 +177,7 @@ class Model:
             "state_sequence_with_words": state_sequence_with_words
         }
 
-
 if __name__ == "__main__":
     # model = Model()
     # print(model.get_most_likely_state_sequence("I want to go to the store"))
-    pass
\ No newline at end of file
+    pass
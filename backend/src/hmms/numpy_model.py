@@ -0,0 +1,193 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.config import UNKNOWN_WORD
+from src.hmms.artifacts import get_latest_run_number, load_matrix_arrays, load_indexes
+
+
+class NumpyModel:
+    """
+    Torch free HMM used for inference. It loads the same run artifacts as the torch Model
+    and decodes with the same float32 log-space Viterbi, so both give identical state sequences.
+    """
+    def __init__(self, transition_matrix: np.ndarray = None,
+                 emission_matrix: np.ndarray = None,
+                 word_index_dict: Dict[str, int] = None,
+                 state_index_dict: Dict[str, int] = None,
+                 reverse_word_index: Dict[int, str] = None,
+                 reverse_state_index: Dict[int, str] = None,
+                 state_priors: np.ndarray = None):
+        self.transition_matrix = transition_matrix
+        self.emission_matrix = emission_matrix
+        self.word_index_dict = word_index_dict
+        self.state_index_dict = state_index_dict
+        self.reverse_word_index = reverse_word_index
+        self.reverse_state_index = reverse_state_index
+        self.state_priors = state_priors
+
+        self.log_transition_matrix = None
+        self.log_state_priors = None
+
+        if transition_matrix is not None and emission_matrix is not None and state_priors is not None:
+            self.compute_log_matrices()
+
+    def compute_log_matrices(self) -> None:
+        """
+        Precompute the log-space transition and prior matrices used by Viterbi.
+        Must be called again if any of the probability matrices are replaced.
+
+        The emission matrix is not converted as a whole, it can be a memory-mapped artifact shared
+        between worker processes, instead the rows of each decoded sentence are gathered and logged.
+        """
+        with np.errstate(divide="ignore"):
+            self.log_transition_matrix = np.log(self.transition_matrix)
+            self.log_state_priors = np.log(self.state_priors)
+
+    def get_log_emissions(self, word_indices: np.ndarray) -> np.ndarray:
+        """Gather the emission rows of the given word indexes and convert them to log space."""
+        with np.errstate(divide="ignore"):
+            return np.log(self.emission_matrix[word_indices])
+
+    def get_word_indices(self, words: List[str]) -> List[int]:
+        """Map words to their vocabulary indexes, using the unknown word index for unseen words."""
+        unknown_index = self.word_index_dict.get(UNKNOWN_WORD)
+        return [self.word_index_dict.get(word, unknown_index) for word in words]
+
+    def get_most_likely_state_sequence(self, sentence: str) -> Dict[str, List]:
+        """
+        Viterbi decoding of a single preprocessed sentence.
+
+        Args:
+            sentence: A preprocessed sentence string
+
+        Returns:
+            The same result dictionary as Model.get_most_likely_state_sequence
+        """
+        words = sentence.split()
+        word_indices = self.get_word_indices(words)
+
+        T = len(word_indices)
+
+        if T == 0:
+            return self.build_result([], [], [])
+
+        log_emissions = self.get_log_emissions(word_indices)
+
+        backpointer = np.zeros((T, self.log_transition_matrix.shape[0]), dtype=np.int64)
+
+        viterbi = self.log_state_priors + log_emissions[0]
+
+        # Rows of the transition matrix are the current state and columns the previous one
+        for t in range(1, T):
+            scores = self.log_transition_matrix + viterbi[np.newaxis, :]
+            backpointer[t] = np.argmax(scores, axis=1)
+            viterbi = np.max(scores, axis=1) + log_emissions[t]
+
+        state_sequence_indices = [0] * T
+        backpointer_rows = backpointer.tolist()
+
+        current_state = int(np.argmax(viterbi))
+        state_sequence_indices[T - 1] = current_state
+
+        for t in range(T - 1, 0, -1):
+            current_state = backpointer_rows[t][current_state]
+            state_sequence_indices[t - 1] = current_state
+
+        return self.build_result(state_sequence_indices, words, word_indices)
+
+    def decode_batch(self, sentences: List[str]) -> List[Dict[str, List]]:
+        """
+        Run Viterbi over a list of preprocessed sentences in one pass, see Model.decode_batch.
+
+        Args:
+            sentences: A list of preprocessed sentence strings
+
+        Returns:
+            A list with one result per sentence
+        """
+        if not sentences:
+            return []
+
+        batch_words = [sentence.split() for sentence in sentences]
+        batch_word_indices = [self.get_word_indices(words) for words in batch_words]
+        lengths = np.array([len(word_indices) for word_indices in batch_word_indices], dtype=np.int64)
+
+        B = len(sentences)
+        T = int(lengths.max())
+        num_states = self.log_transition_matrix.shape[0]
+
+        if T == 0:
+            return [self.build_result([], [], []) for _ in sentences]
+
+        index_array = np.zeros((B, T), dtype=np.int64)
+        for b, word_indices in enumerate(batch_word_indices):
+            index_array[b, :lengths[b]] = word_indices
+
+        mask = np.arange(T)[np.newaxis, :] < lengths[:, np.newaxis]
+
+        log_emissions = self.get_log_emissions(index_array)
+
+        identity_pointers = np.broadcast_to(np.arange(num_states), (B, num_states))
+        backpointer = np.zeros((B, T, num_states), dtype=np.int64)
+
+        viterbi = self.log_state_priors[np.newaxis, :] + log_emissions[:, 0]
+
+        for t in range(1, T):
+            scores = self.log_transition_matrix[np.newaxis, :, :] + viterbi[:, np.newaxis, :]
+            prev_states = np.argmax(scores, axis=2)
+            max_probs = np.max(scores, axis=2)
+
+            step_mask = mask[:, t, np.newaxis]
+            viterbi = np.where(step_mask, max_probs + log_emissions[:, t], viterbi)
+            backpointer[:, t] = np.where(step_mask, prev_states, identity_pointers)
+
+        backpointer_rows = backpointer.tolist()
+        final_states = np.argmax(viterbi, axis=1).tolist()
+
+        results = []
+        for b in range(B):
+            state_sequence_indices = [0] * T
+            current_state = final_states[b]
+            state_sequence_indices[T - 1] = current_state
+
+            for t in range(T - 1, 0, -1):
+                current_state = backpointer_rows[b][t][current_state]
+                state_sequence_indices[t - 1] = current_state
+
+            results.append(self.build_result(state_sequence_indices[:lengths[b]], batch_words[b], batch_word_indices[b]))
+
+        return results
+
+    def build_result(self, state_sequence_indices: List[int], words: List[str], word_indices: List[int]) -> Dict[str, List]:
+        """Convert decoded state indexes into the result dictionary returned by the decoders."""
+        state_sequence = [self.reverse_state_index[idx] for idx in state_sequence_indices]
+
+        state_sequence_with_words = [list(item) for item in zip(state_sequence, words)]
+
+        return {
+            "state_sequence": state_sequence,
+            "word_indices": word_indices,
+            "state_sequence_with_words": state_sequence_with_words
+        }
+
+
+def get_numpy_model(run_number: Optional[int] = None) -> NumpyModel:
+    """
+    Load the HMM run artifacts into a NumpyModel.
+
+    Args:
+        run_number: Optional run number to load from. If None, loads from latest run.
+
+    Returns:
+        NumpyModel
+    """
+    # Resolve the latest run once so the matrices and indexes come from the same run
+    if run_number is None:
+        run_number = get_latest_run_number()
+
+    transition_matrix, emission_matrix, state_priors = load_matrix_arrays(run_number)
+
+    word_index_dict, state_index_dict, reverse_word_index, reverse_state_index = load_indexes(run_number)
+
+    return NumpyModel(transition_matrix, emission_matrix, word_index_dict, state_index_dict, reverse_word_index, reverse_state_index, state_priors)
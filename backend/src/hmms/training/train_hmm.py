@@ -3,15 +3,19 @@ from src.hmms.training.get_training_data_code import get_training_data_cartesian
 from src.hmms.training.templates import TrainingInstance
 
 from src.core.helpers import (
-    get_index_dict_from_corpus, get_index_dict_from_states, add_indexes_to_training_corpus, normalize_matrices, save_matrices, save_indexes
+    get_index_dict_from_corpus, get_index_dict_from_states, add_indexes_to_training_corpus, normalize_matrices, save_matrices
 )
 
 import torch
 from typing import Tuple
 
-def train_hmm(na_normalizing_alpha: int = 0.05) -> Tuple[torch.Tensor, torch.Tensor]:
+def train_hmm(na_normalizing_alpha: int = 0.05, export_json: bool = False) -> Tuple[torch.Tensor, torch.Tensor]:
     """
     Train an HMM model using the training data.
+
+    Args:
+        na_normalizing_alpha: Weight of the emission counts assigned to the unknown word
+        export_json: Also save the matrices as JSON next to the binary artifacts
     
     Returns:
         Tuple of (transition_matrix, emission_matrix) as PyTorch tensors
@@ -56,12 +60,15 @@ def train_hmm(na_normalizing_alpha: int = 0.05) -> Tuple[torch.Tensor, torch.Ten
     assert torch.allclose(torch.sum(transition_matrix, dim=0), torch.ones(len(state_index_dict))), "Transition matrix columns do not sum to 1"
     assert torch.allclose(torch.sum(emission_matrix, dim=0), torch.ones(len(state_index_dict))), "Emission matrix columns do not sum to 1"
 
-    # Save the index dictionaries
-    indexes_dir = save_indexes(word_index_dict, state_index_dict)
-    print(f"Indexes saved in: {indexes_dir}")
-    
-    # Save the matrices
-    save_dir = save_matrices(transition_matrix, emission_matrix)
+    # Save the matrices with the index dictionaries in the run folder. INDEXES_DIR is left as it is,
+    # runs saved before the indexes were kept with the matrices still load their indexes from it
+    save_dir = save_matrices(
+        transition_matrix,
+        emission_matrix,
+        export_json=export_json,
+        word_index_dict=word_index_dict,
+        state_index_dict=state_index_dict
+    )
     print(f"Matrices saved in: {save_dir}")
 
     return transition_matrix, emission_matrix
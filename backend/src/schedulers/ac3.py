@@ -1,28 +1,31 @@
-from datetime import timedelta, datetime
-
-from src.core.helpers import get_time_to_preference, adjust_wakeup_and_sleep, get_available_slots
-
-def minutes_between(start_time, end_time):
-    start_dt = datetime.combine(datetime.today(), start_time)
-    end_dt = datetime.combine(datetime.today(), end_time)
-    return int((end_dt - start_dt).total_seconds() // 60)
-
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+from src.config import CSP_VALUE_ORDERING
+from src.core.timeline import get_time_to_preference
+from src.core.bitset import get_placement_masks
+from src.core.budget import BudgetExhausted, SearchBudget
+from src.core.domain_store import DomainStore
+from src.core.feasibility import get_infeasible_tasks
+from src.core.free_slots import get_free_slots
+from src.core.heuristics import LCV, VALUE_ORDERINGS, VariableOrder, order_values
+from src.core.minutes import (
+    MINUTES_PER_DAY,
+    to_minutes,
+    generate_domains,
+    get_preference_domains,
+    overlaps,
+    to_task_dict
+)
+from src.core.periods import DEFAULT_PERIODS
 
 def is_consistent(task1, time1, task2, time2):
     """Check if two tasks' time slots are consistent with each other."""
     # Convert times to minutes since midnight for easier comparison
-    t1_start = time1[0].hour * 60 + time1[0].minute
-    t1_end = time1[1].hour * 60 + time1[1].minute
-    t2_start = time2[0].hour * 60 + time2[0].minute
-    t2_end = time2[1].hour * 60 + time2[1].minute
-    
-    # Check for overlap
-    if t1_start < t2_end and t1_end > t2_start:
-        return False
-    
-    return True
-
-
+    return not overlaps(
+        (to_minutes(time1[0]), to_minutes(time1[1])),
+        (to_minutes(time2[0]), to_minutes(time2[1]))
+    )
 
 def filter_domain_by_preference(domain, preference):
     if not preference:
@@ -36,224 +39,217 @@ def filter_domain_by_preference(domain, preference):
             filtered_domain.append((start_time, end_time))
     return filtered_domain
 
-def ac3_schedule(wake_up, sleep, obligations, tasks, rest_time=0):
+def ac3_schedule(wake_up, sleep, obligations, tasks, rest_time=0, budget=None, periods=DEFAULT_PERIODS):
     """
     Schedule tasks using AC3 algorithm.
     Now includes support for time preferences (morning, afternoon, evening, night).
     
+    Args:
+        budget: SearchBudget shared by both passes of the search, None for no limit
+        periods: PeriodTable of the preference periods of the request
+
     Returns:
         dict: A dictionary containing:
             - 'tasks': List of scheduled tasks with start and end times
             - 'preference_respected': Boolean indicating if preferences were respected
+            - 'budget_exhausted': Boolean indicating if the search ran out of budget, 'tasks' is
+              then the largest partial schedule it reached
+            - 'infeasible_tasks': Names of the tasks that cannot fit, only when the request fails
+              the feasibility bounds before any search
     """
-    tasks_dict = {task["task"]: task for task in tasks}
-    
-    domains = {}
     task_names = [task["task"] for task in tasks]
     constraints = {name: set(task_names) - {name} for name in task_names}
 
-    timeline = adjust_wakeup_and_sleep(wake_up, sleep)
-
-    timeline = get_available_slots(timeline)
-
     # If there are no task then just add them transparently
     if len(tasks) == 0:
         print("no tasks")
-        return {"tasks": [], "preference_respected": True, "found_schedule": True}
+        return {"tasks": [], "preference_respected": True, "found_schedule": True, "budget_exhausted": False}
     
-    # Split timeline based on obligations
-    for obligation in sorted(obligations, key=lambda x: x["start"]):
-        new_timeline = []
-        for slot in timeline:
-            if slot["start"] < obligation["start"] < slot["end"]:
-                if slot["start"] != obligation["start"]:
-                    new_timeline.append({"start": slot["start"], "end": obligation["start"]})
-            if slot["start"] < obligation["end"] < slot["end"]:
-                if obligation["end"] != slot["end"]:
-                    new_timeline.append({"start": obligation["end"], "end": slot["end"]})
-            if obligation["end"] <= slot["start"] or obligation["start"] >= slot["end"]:
-                new_timeline.append(slot)
-        timeline = new_timeline
-
-    # Generate possible time slots for each task
-    for task in tasks:
-        duration = task["duration"]
-        task_domains = []
-        for slot in timeline:
-            available_minutes = minutes_between(slot["start"], slot["end"])
-            if available_minutes >= duration:
-                # Generate all possible start times within this slot
-                current_time = slot["start"]
-                while True:
-                    # Check if there's enough time left in the slot
-                    end_time = (datetime.combine(datetime.today(), current_time) +
-                              timedelta(minutes=duration)).time()
-                    if minutes_between(current_time, slot["end"]) >= duration:
-                        task_domains.append((current_time, end_time))
-                        # Move to next possible start time (e.g., in 30-minute increments)
-                        current_time = (datetime.combine(datetime.today(), current_time) +
-                                     timedelta(minutes=30)).time()
-                    else:
-                        break
-        domains[task["task"]] = task_domains
+    # Free slots of the day in minutes, split around the obligations
+    timeline = get_free_slots(wake_up, sleep, obligations)
+
+    # Give up before building the domains if the tasks obviously cannot fit
+    infeasible_tasks = get_infeasible_tasks(timeline, tasks)
+    if infeasible_tasks:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "budget_exhausted": False,
+            "infeasible_tasks": infeasible_tasks
+        }
+
+    # Generate possible time slots for each task, in 30-minute increments
+    domains = generate_domains(timeline, tasks)
+
+    if budget is None:
+        budget = SearchBudget()
 
     # Try scheduling with preferences first
-    preference_domains = {}
-    for task in tasks:
-        if task.get("preference"):
-            filtered_domain = filter_domain_by_preference(domains[task["task"]], task["preference"])
-            if filtered_domain:  # Only use filtered domain if it's not empty
-                preference_domains[task["task"]] = filtered_domain
-            else:
-                preference_domains[task["task"]] = domains[task["task"]]
-        else:
-            preference_domains[task["task"]] = domains[task["task"]]
+    preference_domains = get_preference_domains(domains, tasks, periods)
 
     # Try AC3 with preferences
-    preference_result = run_ac3(preference_domains.copy(), constraints, tasks)
+    preference_result = run_ac3(preference_domains.copy(), constraints, tasks, budget=budget, periods=periods)
     if preference_result:
         return {
             "tasks": preference_result,
             "preference_respected": True,
-            "found_schedule": True
+            "found_schedule": True,
+            "budget_exhausted": False
         }
 
     # If scheduling with preferences fails, try regular AC3
-    regular_result = run_ac3(domains, constraints, tasks)
-    if regular_result:
+    if not budget.exhausted:
+        regular_result = run_ac3(domains, constraints, tasks, budget=budget, periods=periods)
+        if regular_result:
+            return {
+                "tasks": regular_result,
+                "preference_respected": False,
+                "found_schedule": True,
+                "budget_exhausted": False
+            }
+
+    # Out of budget, return the largest partial schedule reached
+    if budget.exhausted:
         return {
-            "tasks": regular_result,
+            "tasks": budget.best,
             "preference_respected": False,
-            "found_schedule": True
+            "found_schedule": False,
+            "budget_exhausted": True
         }
 
     return {
         "tasks": [],
         "preference_respected": False,
-        "found_schedule": False
+        "found_schedule": False,
+        "budget_exhausted": False
     }
 
-def run_ac3(domains, constraints, tasks):
+def run_ac3(domains, constraints, tasks, value_ordering=CSP_VALUE_ORDERING, budget=None, periods=DEFAULT_PERIODS):
     """
     Run AC3 algorithm with backtracking and arc consistency after each assignment.
+    Domains hold (start, end) slots in minutes, they live in a DomainStore restored on backtrack.
+    If no schedule is found, None is returned and the largest partial assignment is kept by the budget.
     """
-    def enforce_arc_consistency(current_domains, current_task=None):
+    if value_ordering not in VALUE_ORDERINGS:
+        raise ValueError(f"Invalid value ordering: {value_ordering}")
+    if budget is None:
+        budget = SearchBudget()
+
+    # Largest assignment reached, returned through the budget if the search is stopped
+    best = {}
+
+    store = DomainStore(domains)
+    order = VariableOrder(tasks, store)
+    masks = get_placement_masks(domains)
+
+    def enforce_arc_consistency(current_task=None):
         """Run AC3 on the current domains after an assignment."""
-        queue = []
         if current_task:
             # If a task was just assigned, check arcs connected to it first
-            for other_task in constraints[current_task]:
-                queue.append((other_task, current_task))
+            queue = deque((other_task, current_task) for other_task in constraints[current_task])
         else:
             # Initial run: check all arcs
-            queue = [(x, y) for x in constraints for y in constraints[x]]
+            queue = deque((x, y) for x in constraints for y in constraints[x])
+
+        # An arc already waiting in the queue is revised against the latest domains anyway
+        queued = set(queue)
 
         while queue:
-            (x, y) = queue.pop(0)
-            if revise(current_domains, x, y, is_consistent):
-                if not current_domains[x]:
+            arc = queue.popleft()
+            queued.discard(arc)
+            x, y = arc
+            if revise(store, x, y):
+                if not store.domains[x]:
                     return False  # Domain wipeout
-                for z in constraints[x] - {y}:
-                    queue.append((z, x))
+                for z in constraints[x]:
+                    if z != y and (z, x) not in queued:
+                        queued.add((z, x))
+                        queue.append((z, x))
         return True
 
-    def select_unassigned_variable(current_domains, assigned_tasks):
-        """Select the most constrained variable with preference priority."""
-        # First, try to schedule tasks with preferences
-        unassigned_with_pref = [(task["task"], len(current_domains[task["task"]]))
-                               for task in tasks 
-                               if task["task"] not in assigned_tasks and task.get("preference")]
-        
-        if unassigned_with_pref:
-            return min(unassigned_with_pref, key=lambda x: x[1])[0]
-        
-        # Then schedule tasks without preferences
-        unassigned = [(task["task"], len(current_domains[task["task"]]))
-                     for task in tasks 
-                     if task["task"] not in assigned_tasks]
-        
-        if not unassigned:
-            return None
-        return min(unassigned, key=lambda x: x[1])[0]
-
-    def backtrack_with_ac3(assigned_tasks, current_domains):
+    def backtrack_with_ac3(assigned_tasks, occupied):
         """Backtracking search with AC3 after each assignment."""
+        nonlocal best
+
         if len(assigned_tasks) == len(tasks):
             return assigned_tasks
 
+        if len(assigned_tasks) > len(best):
+            best = dict(assigned_tasks)
+        budget.spend()
+
         # Choose the next task (most constrained variable)
-        current_task = select_unassigned_variable(current_domains, assigned_tasks)
+        current_task = order.select(assigned_tasks)
         if current_task is None:
             return None
 
-        # Get the task object for preference information
-        task_obj = next(task for task in tasks if task["task"] == current_task)
-        
-        # Sort domain values based on preference if it exists
-        domain_values = current_domains[current_task][:]
-        if task_obj.get("preference"):
-            domain_values.sort(
-                key=lambda x: 0 if get_time_to_preference(x[0]) == task_obj["preference"].lower() else 1
-            )
+        # Values of the preferred period first
+        demand = order.get_demand(current_task, assigned_tasks) if value_ordering == LCV else None
+        domain_values = order_values(store.get_values(current_task), order.preferences[current_task], demand, periods)
 
         # Try each value in the domain
-        for start_time, end_time in domain_values:
-            # Check if the value is consistent with current assignments
-            is_valid = True
-            for assigned_task, (assigned_start, assigned_end) in assigned_tasks.items():
-                if not is_consistent(current_task, (start_time, end_time), 
-                                  assigned_task, (assigned_start, assigned_end)):
-                    is_valid = False
-                    break
-
-            if is_valid:
-                # Make assignment
-                assigned_tasks[current_task] = (start_time, end_time)
-                
-                # Create a copy of domains for this branch
-                branch_domains = {task: list(domain) for task, domain in current_domains.items()}
-                
-                # Update domain of current task to only include the assigned value
-                branch_domains[current_task] = [(start_time, end_time)]
+        for time_slot in domain_values:
+            # The value is consistent with the assignments if none of its minutes is used
+            if not masks[time_slot] & occupied:
+                # Make assignment, the domain of the current task only keeps the assigned value
+                assigned_tasks[current_task] = time_slot
+                checkpoint = store.checkpoint()
+                store.assign(current_task, time_slot)
                 
                 # Run arc consistency
-                if enforce_arc_consistency(branch_domains, current_task):
-                    result = backtrack_with_ac3(assigned_tasks, branch_domains)
+                if enforce_arc_consistency(current_task):
+                    result = backtrack_with_ac3(assigned_tasks, occupied | masks[time_slot])
                     if result is not None:
                         return result
 
                 # If we get here, this assignment failed
+                store.restore(checkpoint)
                 del assigned_tasks[current_task]
 
         return None
 
     # Initial arc consistency check
-    initial_domains = {task: list(domain) for task, domain in domains.items()}
-    if not enforce_arc_consistency(initial_domains):
+    if not enforce_arc_consistency():
         return None
 
     # Start backtracking search
-    result = backtrack_with_ac3({}, initial_domains)
+    try:
+        result = backtrack_with_ac3({}, 0)
+    except BudgetExhausted:
+        result = None
+
     if result is None:
+        budget.keep_best([to_task_dict(task_name, start, end) for task_name, (start, end) in best.items()])
         return None
 
     # Convert result to scheduled tasks list
     scheduled_tasks = []
     for task_name, (start_time, end_time) in result.items():
-        scheduled_tasks.append({
-            "task": task_name,
-            "start": start_time,
-            "end": end_time
-        })
+        scheduled_tasks.append(to_task_dict(task_name, start_time, end_time))
 
     return scheduled_tasks
 
-def revise(domains, x, y, is_consistent):
-    """Revise the domain of x with respect to y."""
-    revised = False
-    for value_x in domains[x][:]:  # Make a copy to avoid modifying during iteration
-        # Check if there's at least one value in y's domain that's consistent with x's value
-        if not any(is_consistent(x, value_x, y, value_y) for value_y in domains[y]):
-            domains[x].remove(value_x)
-            revised = True
-    return revised
\ No newline at end of file
+def revise(store, x, y):
+    """
+    Revise the domain of x with respect to y for the non-overlap constraint.
+
+    The domains of the store are sorted by start and all values of a task have the same duration,
+    so the value of y with the earliest end is its first one and the value with the latest start
+    its last one. These two values are the only supports to look at: (start, end) of x is supported
+    if it starts after the earliest end or ends before the latest start of y. The values left without
+    support start in (latest start - duration, earliest end), a contiguous run removed by bisection.
+    """
+    domain_x = store.domains[x]
+    domain_y = store.domains[y]
+    if not domain_x:
+        return False
+    if not domain_y:
+        return store.remove_range(x, 0, len(domain_x))
+
+    start, end = domain_x[0]
+    return store.remove_range(
+        x,
+        bisect_right(domain_x, (domain_y[-1][0] - (end - start), MINUTES_PER_DAY)),
+        bisect_left(domain_x, (domain_y[0][1], -1))
+    )
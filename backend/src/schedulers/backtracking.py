@@ -1,31 +1,28 @@
-from datetime import datetime, timedelta
-from src.validators.scheduler import minutes_between
-from src.core.helpers import get_time_to_preference, adjust_wakeup_and_sleep, get_available_slots
+from datetime import datetime
+from src.config import CSP_VALUE_ORDERING
+from src.core.timeline import get_time_to_preference
+from src.core.bitset import get_placement_masks
+from src.core.budget import BudgetExhausted, SearchBudget
+from src.core.domain_store import DomainStore
+from src.core.feasibility import get_infeasible_tasks
+from src.core.free_slots import get_free_slots
+from src.core.heuristics import LCV, VALUE_ORDERINGS, VariableOrder, order_values
+from src.core.minutes import (
+    from_minutes,
+    slots_from_timeline,
+    generate_domains as generate_minute_domains,
+    get_preference_domains,
+    to_task_dict
+)
+from src.core.periods import DEFAULT_PERIODS
 
 def generate_domains(timeline, tasks):
     """Generate initial domains for all tasks."""
-    domains = {}
-    for task in tasks:
-        duration = task["duration"]
-        task_domains = []
-        for slot in timeline:
-            available_minutes = minutes_between(slot["start"], slot["end"])
-            if available_minutes >= duration:
-                # Generate all possible start times within this slot
-                current_time = slot["start"]
-                while True:
-                    # Check if there's enough time left in the slot
-                    end_time = (datetime.combine(datetime.today(), current_time) +
-                              timedelta(minutes=duration)).time()
-                    if minutes_between(current_time, slot["end"]) >= duration:
-                        task_domains.append((current_time, end_time))
-                        # Move to next possible start time (e.g., in 30-minute increments)
-                        current_time = (datetime.combine(datetime.today(), current_time) +
-                                     timedelta(minutes=30)).time()
-                    else:
-                        break
-        domains[task["task"]] = task_domains
-    return domains
+    domains = generate_minute_domains(slots_from_timeline(timeline), tasks)
+    return {
+        task: [(from_minutes(start), from_minutes(end)) for start, end in domain]
+        for task, domain in domains.items()
+    }
 
 def is_consistent(task1, time_slot1, task2, time_slot2):
     """Check if two tasks' time slots are consistent with each other."""
@@ -52,164 +49,169 @@ def filter_domain_by_preference(domain, preference):
             filtered_domain.append((start_time, end_time))
     return filtered_domain
 
-def run_backtracking(domains, constraints, tasks):
+def run_backtracking(domains, constraints, tasks, value_ordering=CSP_VALUE_ORDERING, budget=None, periods=DEFAULT_PERIODS):
     """
     Run backtracking algorithm with the given domains and constraints.
+    Domains hold (start, end) slots in minutes, they live in a DomainStore restored on backtrack,
+    the used minutes are kept in an occupancy bitmask.
+    If no schedule is found, None is returned and the largest partial assignment is kept by the budget.
     """
+    if value_ordering not in VALUE_ORDERINGS:
+        raise ValueError(f"Invalid value ordering: {value_ordering}")
+    if budget is None:
+        budget = SearchBudget()
+
     scheduled_tasks = []
-    used_slots = []  # Changed from set to list for easier time slot comparison
-
-    def select_unassigned_variable(current_domains, scheduled):
-        """Select the most constrained variable with preference priority."""
-        # First, try to schedule tasks with preferences
-        unassigned_with_pref = [(task["task"], len(current_domains[task["task"]]))
-                               for task in tasks 
-                               if task["task"] not in [t["task"] for t in scheduled] 
-                               and task.get("preference")]
-        
-        if unassigned_with_pref:
-            return min(unassigned_with_pref, key=lambda x: x[1])[0]
-        
-        # Then schedule tasks without preferences
-        unassigned = [(task["task"], len(current_domains[task["task"]]))
-                     for task in tasks 
-                     if task["task"] not in [t["task"] for t in scheduled]]
-        
-        if not unassigned:
-            return None
-        return min(unassigned, key=lambda x: x[1])[0]
-
-    def is_slot_consistent(time_slot):
-        """Check if a time slot is consistent with already used slots."""
-        for used_slot in used_slots:
-            if not is_consistent("", time_slot, "", used_slot):
-                return False
-        return True
-
-    def backtrack(current_domains):
+    assigned = set()
+    store = DomainStore(domains)
+    order = VariableOrder(tasks, store)
+    masks = get_placement_masks(domains)
+    occupied = 0
+
+    # Largest assignment reached, returned through the budget if the search is stopped
+    best = []
+
+    def backtrack():
         """Recursive backtracking function."""
+        nonlocal occupied, best
+
         if len(scheduled_tasks) == len(tasks):
             return True
 
+        if len(scheduled_tasks) > len(best):
+            best = list(scheduled_tasks)
+        budget.spend()
+
         # Select the next task to schedule
-        current_task = select_unassigned_variable(current_domains, scheduled_tasks)
+        current_task = order.select(assigned)
         if current_task is None:
             return False
 
-        # Get the task object for preference information
-        task_obj = next(task for task in tasks if task["task"] == current_task)
-        
-        # Sort domain values based on preference if it exists
-        domain_values = current_domains[current_task][:]
-        if task_obj.get("preference"):
-            domain_values.sort(
-                key=lambda x: 0 if get_time_to_preference(x[0]) == task_obj["preference"].lower() else 1
-            )
+        # Values of the preferred period first
+        demand = order.get_demand(current_task, assigned) if value_ordering == LCV else None
+        domain_values = order_values(store.get_values(current_task), order.preferences[current_task], demand, periods)
 
         # Try each value in the domain
         for time_slot in domain_values:
-            if is_slot_consistent(time_slot):
+            # The slot is consistent if none of its minutes is already used
+            if not masks[time_slot] & occupied:
                 start_time, end_time = time_slot
-                scheduled_tasks.append({
-                    "task": current_task,
-                    "start": start_time,
-                    "end": end_time
-                })
-                used_slots.append(time_slot)
-
-                # Create a copy of domains for this branch
-                branch_domains = {task: list(domain) for task, domain in current_domains.items()}
-                
-                # Update domain of current task to only include the assigned value
-                branch_domains[current_task] = [time_slot]
-
-                if backtrack(branch_domains):
+                scheduled_tasks.append({"task": current_task, "start": start_time, "end": end_time})
+                assigned.add(current_task)
+                occupied |= masks[time_slot]
+
+                # Plain backtracking never prunes the domains of the unassigned tasks
+                checkpoint = store.checkpoint()
+                store.assign(current_task, time_slot)
+
+                if backtrack():
                     return True
 
+                store.restore(checkpoint)
                 scheduled_tasks.pop()
-                used_slots.pop()
+                assigned.discard(current_task)
+                occupied ^= masks[time_slot]
 
         return False
 
     # Start backtracking search
-    initial_domains = {task: list(domain) for task, domain in domains.items()}
-    if backtrack(initial_domains):
-        return scheduled_tasks
+    try:
+        found = backtrack()
+    except BudgetExhausted:
+        found = False
+
+    if found:
+        return [to_task_dict(task["task"], task["start"], task["end"]) for task in scheduled_tasks]
+
+    budget.keep_best([to_task_dict(task["task"], task["start"], task["end"]) for task in best])
     return None
 
-def backtracking_slot_placement(wake_up, sleep, obligations, tasks):
+def backtracking_slot_placement(wake_up, sleep, obligations, tasks, budget=None, periods=DEFAULT_PERIODS):
     """
     Schedule tasks using backtracking algorithm with preference support.
     
+    Args:
+        budget: SearchBudget shared by both passes of the search, None for no limit
+        periods: PeriodTable of the preference periods of the request
+
     Returns:
         dict: A dictionary containing:
             - 'tasks': List of scheduled tasks with start and end times
             - 'preference_respected': Boolean indicating if preferences were respected
+            - 'budget_exhausted': Boolean indicating if the search ran out of budget, 'tasks' is
+              then the largest partial schedule it reached
+            - 'infeasible_tasks': Names of the tasks that cannot fit, only when the request fails
+              the feasibility bounds before any search
     """
-    # Create initial timeline
-    timeline = adjust_wakeup_and_sleep(wake_up, sleep)
-
-    timeline = get_available_slots(timeline)
-
     # If there are no task then just add them transparently
     if len(tasks) == 0:
         return {
             "tasks": [],
             "preference_respected": True,
-            "found_schedule": True
+            "found_schedule": True,
+            "budget_exhausted": False
         }
 
-    # Process obligations
-    for obligation in sorted(obligations, key=lambda x: x["start"]):
-        new_timeline = []
-        for slot in timeline:
-            if slot["start"] < obligation["start"] < slot["end"]:
-                new_timeline.append({"start": slot["start"], "end": obligation["start"]})
-            if slot["start"] < obligation["end"] < slot["end"]:
-                new_timeline.append({"start": obligation["end"], "end": slot["end"]})
-            if obligation["end"] <= slot["start"] or obligation["start"] >= slot["end"]:
-                new_timeline.append(slot)
-        timeline = new_timeline
+    # Free slots of the day in minutes, split around the obligations
+    timeline = get_free_slots(wake_up, sleep, obligations)
+
+    # Give up before building the domains if the tasks obviously cannot fit
+    infeasible_tasks = get_infeasible_tasks(timeline, tasks)
+    if infeasible_tasks:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "budget_exhausted": False,
+            "infeasible_tasks": infeasible_tasks
+        }
 
     # Generate initial domains
-    domains = generate_domains(timeline, tasks)
+    domains = generate_minute_domains(timeline, tasks)
     task_names = [task["task"] for task in tasks]
     constraints = {name: set(task_names) - {name} for name in task_names}
 
+    if budget is None:
+        budget = SearchBudget()
+
     # Try scheduling with preferences first
-    preference_domains = {}
-    for task in tasks:
-        if task.get("preference"):
-            filtered_domain = filter_domain_by_preference(domains[task["task"]], task["preference"])
-            if filtered_domain:  # Only use filtered domain if it's not empty
-                preference_domains[task["task"]] = filtered_domain
-            else:
-                preference_domains[task["task"]] = domains[task["task"]]
-        else:
-            preference_domains[task["task"]] = domains[task["task"]]
+    preference_domains = get_preference_domains(domains, tasks, periods)
 
     # Try backtracking with preferences
-    preference_result = run_backtracking(preference_domains.copy(), constraints, tasks)
+    preference_result = run_backtracking(preference_domains.copy(), constraints, tasks, budget=budget, periods=periods)
     if preference_result:
         return {
             "tasks": preference_result,
             "preference_respected": True,
-            "found_schedule": True
+            "found_schedule": True,
+            "budget_exhausted": False
         }
 
     # If scheduling with preferences fails, try regular backtracking
-    regular_result = run_backtracking(domains, constraints, tasks)
-    if regular_result:
+    if not budget.exhausted:
+        regular_result = run_backtracking(domains, constraints, tasks, budget=budget, periods=periods)
+        if regular_result:
+            return {
+                "tasks": regular_result,
+                "preference_respected": False,
+                "found_schedule": True,
+                "budget_exhausted": False
+            }
+
+    # Out of budget, return the largest partial schedule reached
+    if budget.exhausted:
         return {
-            "tasks": regular_result,
+            "tasks": budget.best,
             "preference_respected": False,
-            "found_schedule": True
+            "found_schedule": False,
+            "budget_exhausted": True
         }
 
     return {
         "tasks": [],
         "preference_respected": False,
-        "found_schedule": False
+        "found_schedule": False,
+        "budget_exhausted": False
     }
 
 def main():
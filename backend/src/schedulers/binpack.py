@@ -0,0 +1,296 @@
+"""
+Scheduling as bin packing of the task durations into the free slots of the day.
+
+Where a task starts inside its slot does not matter for fitting it: the tasks of a slot fit if their
+durations add up to at most its length, they are then placed back to back. The tasks are first packed
+first fit decreasing, which places every task right away on most days. If a task is left out, a branch
+and bound over the slot of every task, longest first, finds a packing or proves there is none. It
+prunes with the bounds of src.core.feasibility on the remaining tasks and slot capacities, and
+remembers the capacities that already failed. Branches stop at the search budget, the first fit
+decreasing packing is then returned as a partial schedule.
+
+The slots where a task can start in its preferred period are tried first for it, and the tasks of each
+slot are laid out so that as many as possible start in their preferred period.
+"""
+from itertools import accumulate
+from math import gcd
+from typing import Dict, List, Optional, Tuple
+
+from src.core.budget import BudgetExhausted, SearchBudget
+from src.core.feasibility import bounds_hold, get_infeasible_tasks
+from src.core.free_slots import get_free_slots
+from src.core.minutes import Slot, get_minute_preference, get_preference_ranges, to_task_dict
+from src.core.periods import DEFAULT_PERIODS, PeriodTable
+
+def get_preferred_start(earliest: int, latest: int, preference: Optional[str],
+                        periods: PeriodTable = DEFAULT_PERIODS) -> Optional[int]:
+    """First minute in [earliest, latest] of the preferred period, None if there is none."""
+    if not preference or earliest > latest:
+        return None
+
+    for start, end in get_preference_ranges(preference, periods):
+        if start <= latest and end > earliest:
+            return max(start, earliest)
+    return None
+
+def count_preferred_starts(earliest: int, latest: int, preference: Optional[str],
+                           periods: PeriodTable = DEFAULT_PERIODS) -> int:
+    """Number of minutes in [earliest, latest] of the preferred period."""
+    if not preference:
+        return 0
+
+    return sum(
+        max(0, min(end, latest + 1) - max(start, earliest))
+        for start, end in get_preference_ranges(preference, periods)
+    )
+
+def slots_allow_preference(slots: List[Slot], task: Dict, periods: PeriodTable = DEFAULT_PERIODS) -> bool:
+    """Whether the task can start in its preferred period in one of the slots."""
+    return any(
+        get_preferred_start(slot.start, slot.end - task["duration"], task.get("preference"), periods) is not None
+        for slot in slots
+    )
+
+def get_slot_order(slots: List[Slot], task: Dict, periods: PeriodTable = DEFAULT_PERIODS) -> List[int]:
+    """
+    Indices of the slots, the slots where the task can start in its preferred period first.
+
+    The slots with the most preferred starts come first, leaving the short stretches of the period
+    to the tasks that have no other choice.
+    """
+    duration = task["duration"]
+    counts = [count_preferred_starts(slot.start, slot.end - duration, task.get("preference"), periods) for slot in slots]
+    return sorted(range(len(slots)), key=lambda index: -counts[index])
+
+def first_fit_decreasing(capacities: List[int], durations: List[int], slot_orders: List[List[int]],
+                         order: Optional[List[int]] = None) -> List[Optional[int]]:
+    """
+    Slot of every task, durations sorted longest first, None for the tasks that do not fit.
+
+    The tasks are placed in the order of their durations, or in the given order of their indices.
+    """
+    capacities = list(capacities)
+    packing = [None] * len(durations)
+
+    for index in order if order is not None else range(len(durations)):
+        duration = durations[index]
+        slot = next((slot for slot in slot_orders[index] if capacities[slot] >= duration), None)
+        if slot is not None:
+            capacities[slot] -= duration
+        packing[index] = slot
+
+    return packing
+
+def branch_and_bound(capacities: List[int], durations: List[int], slot_orders: List[List[int]],
+                     budget: SearchBudget) -> Optional[List[int]]:
+    """
+    Slot of every task, durations sorted longest first, None if the tasks cannot all be packed.
+
+    Raises:
+        BudgetExhausted: The search used up its budget
+    """
+    capacities = list(capacities)
+    packing = [None] * len(durations)
+
+    # Capacities left when placing a task that cannot lead to a packing, the slots are interchangeable
+    # for fitting the remaining tasks so their order does not matter
+    failed = set()
+
+    # Greatest common divisor of the durations of every task from an index on
+    steps = list(accumulate(reversed(durations), gcd))[::-1]
+
+    def place(index):
+        if index == len(durations):
+            return True
+
+        budget.spend()
+
+        key = (index, tuple(sorted(capacities)))
+        if key in failed:
+            return False
+
+        # A slot only fills up to a multiple of the gcd of the remaining durations
+        step = steps[index] or 1
+        if bounds_hold([capacity - capacity % step for capacity in capacities], durations[index:]):
+            duration = durations[index]
+            # Two slots with the same capacity left lead to the same packings of the remaining tasks
+            tried = set()
+
+            for slot in slot_orders[index]:
+                capacity = capacities[slot]
+                if capacity < duration or capacity in tried:
+                    continue
+                tried.add(capacity)
+
+                capacities[slot] -= duration
+                packing[index] = slot
+                if place(index + 1):
+                    return True
+                capacities[slot] += duration
+
+        failed.add(key)
+        return False
+
+    return packing if place(0) else None
+
+def lay_out(slots: List[Slot], tasks: List[Dict], packing: List[Optional[int]],
+            periods: PeriodTable = DEFAULT_PERIODS) -> Tuple[List[Dict], bool]:
+    """
+    Place the tasks back to back in their slot, moving them later to start in their preferred period.
+
+    Returns:
+        The scheduled tasks in the order of the day, and whether every task that could start in its
+        preferred period does
+    """
+    tasks_by_slot = {}
+    for task, slot in zip(tasks, packing):
+        if slot is not None:
+            tasks_by_slot.setdefault(slot, []).append(task)
+
+    scheduled_tasks = []
+    preference_respected = True
+
+    for index, slot in enumerate(slots):
+        slot_tasks = tasks_by_slot.get(index, [])
+        slack = slot.duration - sum(task["duration"] for task in slot_tasks)
+
+        # Tasks in the order of their first preferred minute in the slot, the tasks without one fill
+        # the waits before the preferred periods and the end of the slot
+        targets = [
+            get_preferred_start(slot.start, slot.end - task["duration"], task.get("preference"), periods)
+            for task in slot_tasks
+        ]
+        # Shorter tasks first among the tasks of a period, so that more of them start in it
+        preferred = [
+            slot_tasks[position]
+            for _, _, position in sorted(
+                (target, slot_tasks[position]["duration"], position)
+                for position, target in enumerate(targets) if target is not None
+            )
+        ]
+        fillers = [task for task, target in zip(slot_tasks, targets) if target is None]
+
+        # A filler cannot start in its preferred period in this slot, which only respects its preference
+        # if the period is in no slot, like in the CSP solvers
+        if any(slots_allow_preference(slots, task, periods) for task in fillers):
+            preference_respected = False
+
+        fillers.sort(key=lambda task: -task["duration"])
+        filler_minutes = sum(task["duration"] for task in fillers)
+
+        cursor = slot.start
+        for task in preferred:
+            # The unused minutes of the slot and the tasks without a preferred period placed first
+            # let a task start later, up to its preferred period
+            start = get_preferred_start(cursor, cursor + slack + filler_minutes, task["preference"], periods)
+            if start is None:
+                start = cursor
+
+            # Tasks without a preferred period fill the wait, longest first
+            for filler in list(fillers):
+                if cursor + filler["duration"] <= start:
+                    scheduled_tasks.append(to_task_dict(filler["task"], cursor, cursor + filler["duration"]))
+                    cursor += filler["duration"]
+                    filler_minutes -= filler["duration"]
+                    fillers.remove(filler)
+
+            # The rest of the wait is taken from the unused minutes
+            start = min(start, cursor + slack)
+            slack -= start - cursor
+            if get_minute_preference(start, periods) != task["preference"].lower():
+                preference_respected = False
+
+            scheduled_tasks.append(to_task_dict(task["task"], start, start + task["duration"]))
+            cursor = start + task["duration"]
+
+        for task in fillers:
+            scheduled_tasks.append(to_task_dict(task["task"], cursor, cursor + task["duration"]))
+            cursor += task["duration"]
+
+    return scheduled_tasks, preference_respected
+
+def binpack_schedule(wake_up, sleep, obligations, tasks, budget=None, periods=DEFAULT_PERIODS):
+    """
+    Schedule tasks by packing their durations into the free slots of the day.
+
+    Args:
+        budget: SearchBudget of the branch and bound, None for no limit
+        periods: PeriodTable of the preference periods of the request
+
+    Returns:
+        dict: A dictionary containing:
+            - 'tasks': List of scheduled tasks with start and end times
+            - 'preference_respected': Boolean indicating if preferences were respected
+            - 'budget_exhausted': Boolean indicating if the search ran out of budget, 'tasks' is
+              then the first fit decreasing packing of the tasks that fit
+            - 'infeasible_tasks': Names of the tasks that cannot fit, only when the request fails
+              the feasibility bounds before any search
+    """
+    # If there are no task then just add them transparently
+    if len(tasks) == 0:
+        return {
+            "tasks": [],
+            "preference_respected": True,
+            "found_schedule": True,
+            "budget_exhausted": False
+        }
+
+    # Free slots of the day in minutes, split around the obligations
+    timeline = get_free_slots(wake_up, sleep, obligations)
+
+    # Give up before packing if the tasks obviously cannot fit
+    infeasible_tasks = get_infeasible_tasks(timeline, tasks)
+    if infeasible_tasks:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "budget_exhausted": False,
+            "infeasible_tasks": infeasible_tasks
+        }
+
+    if budget is None:
+        budget = SearchBudget()
+
+    # Longest tasks first, tasks of the same duration in the order of the request
+    tasks = sorted(tasks, key=lambda task: -task["duration"])
+    durations = [task["duration"] for task in tasks]
+    capacities = [slot.duration for slot in timeline]
+    slot_orders = [get_slot_order(timeline, task, periods) for task in tasks]
+
+    # The tasks that can start in their preferred period are packed first, the other tasks only take
+    # what they leave. If that leaves a task out, the plain first fit decreasing packing is used
+    order = sorted(range(len(tasks)), key=lambda index: not slots_allow_preference(timeline, tasks[index], periods))
+    packing = first_fit_decreasing(capacities, durations, slot_orders, order)
+    if None in packing:
+        packing = first_fit_decreasing(capacities, durations, slot_orders)
+
+    if None in packing:
+        # The tasks first fit decreasing placed are returned if the search is stopped
+        budget.keep_best(lay_out(timeline, tasks, packing, periods)[0])
+
+        try:
+            packing = branch_and_bound(capacities, durations, slot_orders, budget)
+        except BudgetExhausted:
+            return {
+                "tasks": budget.best,
+                "preference_respected": False,
+                "found_schedule": False,
+                "budget_exhausted": True
+            }
+
+        if packing is None:
+            return {
+                "tasks": [],
+                "preference_respected": False,
+                "found_schedule": False,
+                "budget_exhausted": False
+            }
+
+    scheduled_tasks, preference_respected = lay_out(timeline, tasks, packing, periods)
+    return {
+        "tasks": scheduled_tasks,
+        "preference_respected": preference_respected,
+        "found_schedule": True,
+        "budget_exhausted": False
+    }
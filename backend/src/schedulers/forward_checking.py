@@ -1,35 +1,34 @@
-from datetime import timedelta, datetime
-from src.core.helpers import get_time_to_preference, adjust_wakeup_and_sleep, get_available_slots
-
-def minutes_between(start_time, end_time):
-    start_dt = datetime.combine(datetime.today(), start_time)
-    end_dt = datetime.combine(datetime.today(), end_time)
-    return int((end_dt - start_dt).total_seconds() // 60)
+from src.config import CSP_DOMAIN_REPRESENTATION, CSP_VALUE_ORDERING
+from src.core.timeline import get_time_to_preference
+from src.core.bitset import (
+    NUMPY,
+    DOMAIN_REPRESENTATIONS,
+    get_placement_masks,
+    to_array,
+    to_values,
+    prune_array
+)
+from src.core.budget import BudgetExhausted, SearchBudget
+from src.core.domain_store import DomainStore
+from src.core.feasibility import get_infeasible_tasks
+from src.core.free_slots import get_free_slots
+from src.core.heuristics import LCV, VALUE_ORDERINGS, VariableOrder, order_values
+from src.core.minutes import (
+    from_minutes,
+    slots_from_timeline,
+    generate_domains as generate_minute_domains,
+    get_preference_domains,
+    to_task_dict
+)
+from src.core.periods import DEFAULT_PERIODS
 
 def generate_domains(timeline, tasks):
     """Generate initial domains for all tasks."""
-    domains = {}
-    for task in tasks:
-        duration = task["duration"]
-        task_domains = []
-        for slot in timeline:
-            available_minutes = minutes_between(slot["start"], slot["end"])
-            if available_minutes >= duration:
-                # Generate all possible start times within this slot
-                current_time = slot["start"]
-                while True:
-                    # Check if there's enough time left in the slot
-                    end_time = (datetime.combine(datetime.today(), current_time) +
-                              timedelta(minutes=duration)).time()
-                    if minutes_between(current_time, slot["end"]) >= duration:
-                        task_domains.append((current_time, end_time))
-                        # Move to next possible start time (e.g., in 30-minute increments)
-                        current_time = (datetime.combine(datetime.today(), current_time) +
-                                     timedelta(minutes=30)).time()
-                    else:
-                        break
-        domains[task["task"]] = task_domains
-    return domains
+    domains = generate_minute_domains(slots_from_timeline(timeline), tasks)
+    return {
+        task: [(from_minutes(start), from_minutes(end)) for start, end in domain]
+        for task, domain in domains.items()
+    }
 
 def filter_domain_by_preference(domain, preference):
     """Filter domain based on time preference."""
@@ -42,194 +41,205 @@ def filter_domain_by_preference(domain, preference):
             filtered_domain.append((start_time, end_time))
     return filtered_domain
 
-def run_forward_checking(domains, constraints, tasks):
+def run_forward_checking(domains, constraints, tasks, representation=CSP_DOMAIN_REPRESENTATION,
+                         value_ordering=CSP_VALUE_ORDERING, budget=None, periods=DEFAULT_PERIODS):
     """
     Run forward checking algorithm with proper backtracking and domain pruning.
+    Domains hold (start, end) slots in minutes, they live in a DomainStore restored on backtrack.
+    If no schedule is found, None is returned and the largest partial assignment is kept by the budget.
+
+    With the "bitset" representation every placement is a minute mask and the assigned tasks form an
+    occupancy mask, the values overlapping an assignment are cut from the sorted domains by bisection.
+    With "numpy" the domains are arrays pruned with a vectorized comparison.
     """
-    def update_domains(current_domains, assigned_task, time_slot, assigned):
+    if representation not in DOMAIN_REPRESENTATIONS:
+        raise ValueError(f"Invalid domain representation: {representation}")
+    if value_ordering not in VALUE_ORDERINGS:
+        raise ValueError(f"Invalid value ordering: {value_ordering}")
+    if budget is None:
+        budget = SearchBudget()
+
+    use_numpy = representation == NUMPY
+
+    store = DomainStore(domains)
+    order = VariableOrder(tasks, store)
+    masks = get_placement_masks(domains)
+
+    if use_numpy:
+        store.domains = {task: to_array(domain) for task, domain in store.domains.items()}
+
+    # Minutes taken by the assigned tasks
+    occupied = 0
+
+    # Largest assignment reached, returned through the budget if the search is stopped
+    best = {}
+
+    def update_domains(assigned_task, time_slot, assigned):
         """Update domains of unassigned variables based on the current assignment."""
-        new_domains = {task: list(domain) for task, domain in current_domains.items()}
-        
         # Set domain of assigned task to only the assigned value
-        new_domains[assigned_task] = [time_slot]
-        
-        # Create new assigned dict with the current assignment
-        new_assigned = assigned.copy()
-        new_assigned[assigned_task] = time_slot
+        if use_numpy:
+            store.replace(assigned_task, to_array([time_slot]))
+        else:
+            store.assign(assigned_task, time_slot)
         
         # Update domains of unassigned tasks
-        for task in new_domains:
+        for task in store.domains:
             if task != assigned_task and task not in assigned:
-                # Remove values that are inconsistent with the current assignment
-                new_domains[task] = [
-                    value for value in new_domains[task]
-                    if is_consistent(task, value, new_assigned)
-                ]
+                # Remove values that are inconsistent with the current assignment, the remaining
+                # values are already consistent with the earlier assignments
+                if use_numpy:
+                    domain = store.domains[task]
+                    pruned = prune_array(domain, *time_slot)
+                    if len(pruned) != len(domain):
+                        store.replace(task, pruned)
+                else:
+                    store.remove_overlapping(task, *time_slot)
                 
                 # Check for domain wipeout
-                if not new_domains[task]:
-                    return None
-        
-        return new_domains
-
-    def is_consistent(task_name, time_slot, assigned):
-        """Check if a time slot is consistent with already assigned tasks."""
-        start_time, end_time = time_slot
-        start_minutes = start_time.hour * 60 + start_time.minute
-        end_minutes = end_time.hour * 60 + end_time.minute
+                if not store.size(task):
+                    return False
         
-        for other_task, (other_start, other_end) in assigned.items():
-            other_start_minutes = other_start.hour * 60 + other_start.minute
-            other_end_minutes = other_end.hour * 60 + other_end.minute
-            
-            # Check for overlap
-            if not (end_minutes <= other_start_minutes or start_minutes >= other_end_minutes):
-                return False
         return True
 
-    def select_unassigned_variable(current_domains, assigned):
-        """Select the most constrained variable (minimum remaining values)."""
-        # First, try to schedule tasks with preferences
-        unassigned_with_pref = [(task["task"], len(current_domains[task["task"]]))
-                               for task in tasks 
-                               if task["task"] not in assigned and task.get("preference")]
-        
-        if unassigned_with_pref:
-            return min(unassigned_with_pref, key=lambda x: x[1])[0]
-        
-        # Then schedule tasks without preferences
-        unassigned = [(task["task"], len(current_domains[task["task"]]))
-                     for task in tasks 
-                     if task["task"] not in assigned]
-        
-        if not unassigned:
-            return None
-        return min(unassigned, key=lambda x: x[1])[0]
-
-    def backtrack_with_forward_checking(assigned, current_domains):
+    def backtrack_with_forward_checking(assigned):
         """Backtracking search with forward checking after each assignment."""
+        nonlocal occupied, best
+
         if len(assigned) == len(tasks):
             return assigned
 
+        if len(assigned) > len(best):
+            best = dict(assigned)
+        budget.spend()
+
         # Select the next variable to assign
-        current_task = select_unassigned_variable(current_domains, assigned)
+        current_task = order.select(assigned)
         if current_task is None:
             return None
 
-        # Get the task object for preference information
-        task_obj = next(task for task in tasks if task["task"] == current_task)
-        
-        # Sort domain values based on preference if it exists
-        domain_values = current_domains[current_task][:]
-        if task_obj.get("preference"):
-            domain_values.sort(
-                key=lambda x: 0 if get_time_to_preference(x[0]) == task_obj["preference"].lower() else 1
-            )
+        # Values of the preferred period first
+        domain = store.get_values(current_task)
+        demand = order.get_demand(current_task, assigned) if value_ordering == LCV else None
+        domain_values = order_values(to_values(domain) if use_numpy else domain, order.preferences[current_task], demand, periods)
 
         # Try each value in the domain
         for time_slot in domain_values:
-            if is_consistent(current_task, time_slot, assigned):
+            if not masks[time_slot] & occupied:
                 # Make assignment
                 assigned[current_task] = time_slot
+                occupied |= masks[time_slot]
+                checkpoint = store.checkpoint()
                 
                 # Update domains with forward checking
-                new_domains = update_domains(current_domains, current_task, time_slot, assigned)
-                
-                if new_domains is not None:
+                if update_domains(current_task, time_slot, assigned):
                     # Recursive call with updated domains
-                    result = backtrack_with_forward_checking(assigned, new_domains)
+                    result = backtrack_with_forward_checking(assigned)
                     if result is not None:
                         return result
 
                 # If we get here, this assignment failed
+                store.restore(checkpoint)
                 del assigned[current_task]
+                occupied ^= masks[time_slot]
 
         return None
 
     # Start backtracking search with forward checking
-    result = backtrack_with_forward_checking({}, domains)
+    try:
+        result = backtrack_with_forward_checking({})
+    except BudgetExhausted:
+        result = None
     
     if result is None:
+        budget.keep_best([to_task_dict(task, start, end) for task, (start, end) in best.items()])
         return None
 
     # Convert result to scheduled tasks list
     scheduled_tasks = []
     for task, (start_time, end_time) in result.items():
-        scheduled_tasks.append({
-            "task": task,
-            "start": start_time,
-            "end": end_time
-        })
+        scheduled_tasks.append(to_task_dict(task, start_time, end_time))
 
     return scheduled_tasks
 
-def forward_checking_schedule(wake_up, sleep, obligations, tasks, rest_time=0):
+def forward_checking_schedule(wake_up, sleep, obligations, tasks, rest_time=0, budget=None, periods=DEFAULT_PERIODS):
     """
     Schedule tasks using forward checking algorithm with preference support.
     
+    Args:
+        budget: SearchBudget shared by both passes of the search, None for no limit
+        periods: PeriodTable of the preference periods of the request
+
     Returns:
         dict: A dictionary containing:
             - 'tasks': List of scheduled tasks with start and end times
             - 'preference_respected': Boolean indicating if preferences were respected
+            - 'budget_exhausted': Boolean indicating if the search ran out of budget, 'tasks' is
+              then the largest partial schedule it reached
+            - 'infeasible_tasks': Names of the tasks that cannot fit, only when the request fails
+              the feasibility bounds before any search
     """
-    # Create initial timeline
-    timeline = adjust_wakeup_and_sleep(wake_up, sleep)
-
-    timeline = get_available_slots(timeline)
-
     # If there are no task then just add them transparently
     if len(tasks) == 0:
-        return {"tasks": [], "preference_respected": True, "found_schedule": True}
-
-    # Process obligations
-    for obligation in sorted(obligations, key=lambda x: x["start"]):
-        new_timeline = []
-        for slot in timeline:
-            if slot["start"] < obligation["start"] < slot["end"]:
-                new_timeline.append({"start": slot["start"], "end": obligation["start"]})
-            if slot["start"] < obligation["end"] < slot["end"]:
-                new_timeline.append({"start": obligation["end"], "end": slot["end"]})
-            if obligation["end"] <= slot["start"] or obligation["start"] >= slot["end"]:
-                new_timeline.append(slot)
-        timeline = new_timeline
+        return {"tasks": [], "preference_respected": True, "found_schedule": True, "budget_exhausted": False}
+
+    # Free slots of the day in minutes, split around the obligations
+    timeline = get_free_slots(wake_up, sleep, obligations)
+
+    # Give up before building the domains if the tasks obviously cannot fit
+    infeasible_tasks = get_infeasible_tasks(timeline, tasks)
+    if infeasible_tasks:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "budget_exhausted": False,
+            "infeasible_tasks": infeasible_tasks
+        }
 
     # Generate initial domains
-    domains = generate_domains(timeline, tasks)
+    domains = generate_minute_domains(timeline, tasks)
     task_names = [task["task"] for task in tasks]
     constraints = {name: set(task_names) - {name} for name in task_names}
 
+    if budget is None:
+        budget = SearchBudget()
+
     # Try scheduling with preferences first
-    preference_domains = {}
-    for task in tasks:
-        if task.get("preference"):
-            filtered_domain = filter_domain_by_preference(domains[task["task"]], task["preference"])
-            if filtered_domain:  # Only use filtered domain if it's not empty
-                preference_domains[task["task"]] = filtered_domain
-            else:
-                preference_domains[task["task"]] = domains[task["task"]]
-        else:
-            preference_domains[task["task"]] = domains[task["task"]]
+    preference_domains = get_preference_domains(domains, tasks, periods)
 
     # Try forward checking with preferences
-    preference_result = run_forward_checking(preference_domains.copy(), constraints, tasks)
+    preference_result = run_forward_checking(preference_domains.copy(), constraints, tasks, budget=budget, periods=periods)
     if preference_result:
         return {
             "tasks": preference_result,
             "preference_respected": True,
-            "found_schedule": True
+            "found_schedule": True,
+            "budget_exhausted": False
         }
 
     # If scheduling with preferences fails, try regular forward checking
-    regular_result = run_forward_checking(domains, constraints, tasks)
-    if regular_result:
+    if not budget.exhausted:
+        regular_result = run_forward_checking(domains, constraints, tasks, budget=budget, periods=periods)
+        if regular_result:
+            return {
+                "tasks": regular_result,
+                "preference_respected": False,
+                "found_schedule": True,
+                "budget_exhausted": False
+            }
+
+    # Out of budget, return the largest partial schedule reached
+    if budget.exhausted:
         return {
-            "tasks": regular_result,
+            "tasks": budget.best,
             "preference_respected": False,
-            "found_schedule": True
+            "found_schedule": False,
+            "budget_exhausted": True
         }
 
     return {
         "tasks": [],
         "preference_respected": False,
-        "found_schedule": False
+        "found_schedule": False,
+        "budget_exhausted": False
     }
\ No newline at end of file
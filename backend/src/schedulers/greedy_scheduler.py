@@ -1,111 +1,96 @@
-from datetime import timedelta, datetime
-from src.core.helpers import adjust_wakeup_and_sleep, get_available_slots
+from src.config import GREEDY_MODE
+from src.core.free_slots import GapIndex, get_free_slots
+from src.core.minutes import get_minute_preference, get_preference_ranges, to_task_dict
+from src.core.periods import DEFAULT_PERIODS
 
-def minutes_between(start_time, end_time):
-    start_dt = datetime.combine(datetime.today(), start_time)
-    end_dt = datetime.combine(datetime.today(), end_time)
-    return int((end_dt - start_dt).total_seconds() // 60)
+FIRST_FIT = "first_fit"
+BEST_FIT = "best_fit"
+PREFERENCE = "preference"
 
-def fit_tasks_into_schedule(wake_up, sleep, obligations, tasks):
-    total_day_minutes = 24 * 60
-    
-    timeline = adjust_wakeup_and_sleep(wake_up, sleep)
+GREEDY_MODES = [FIRST_FIT, BEST_FIT, PREFERENCE]
+
+def get_preferred_start(gaps, task, periods=DEFAULT_PERIODS):
+    """Earliest start of the task in its preferred period, None if no free slot has room for it there."""
+    for period_start, period_end in get_preference_ranges(task["preference"], periods):
+        start = gaps.first_fit(task["duration"], period_start)
+        if start is not None and start < period_end:
+            return start
+    return None
+
+def find_start(gaps, task, mode, periods=DEFAULT_PERIODS):
+    """Start of the task in the free slots for the given mode, None if it fits nowhere."""
+    if mode == FIRST_FIT:
+        return gaps.first_fit(task["duration"])
+
+    if mode == PREFERENCE and task.get("preference"):
+        start = get_preferred_start(gaps, task, periods)
+        if start is not None:
+            return start
+
+    return gaps.best_fit(task["duration"])
+
+def fit_tasks_into_schedule(wake_up, sleep, obligations, tasks, budget=None, mode=GREEDY_MODE, periods=DEFAULT_PERIODS):
+    """
+    Place the tasks one at a time in the free slots of the day, without going back on a placement.
+
+    The free slots are kept in a GapIndex, each placement is a lookup in it and carves the task out.
+
+    Args:
+        budget: Unused, one pass over the tasks has no search to stop
+        mode: "first_fit" places a task at the start of the earliest free slot it fits in, "best_fit"
+            at the start of the shortest one, keeping the long slots for the long tasks. "preference"
+            places the tasks with a preference first, at their earliest start in their preferred
+            period, and every other task by best fit
+        periods: PeriodTable of the preference periods of the request
+
+    Returns:
+        dict: A dictionary containing:
+            - 'tasks': List of scheduled tasks with start and end times, in the order of the request
+            - 'preference_respected': Boolean indicating if every task with a preference starts in its period
+            - 'found_schedule': Boolean indicating if every task was placed
+            - 'dropped_tasks': Names of the tasks that did not fit
+    """
+    if mode not in GREEDY_MODES:
+        raise ValueError(f"Invalid greedy mode: {mode}")
 
-    timeline = get_available_slots(timeline)
     # If there are no task then just add them transparently
     if len(tasks) == 0:
-        return {"tasks": [], "preference_respected": True, "found_schedule": True}
-    
-    # Process obligations
-    for obligation in sorted(obligations, key=lambda x: (x["start"].hour * 60 + x["start"].minute)):
-        start_minutes = obligation["start"].hour * 60 + obligation["start"].minute
-        end_minutes = obligation["end"].hour * 60 + obligation["end"].minute
-        
-        # Handle obligations that cross midnight
-        if start_minutes > end_minutes:
-            # Split into two intervals
-            midnight = datetime.strptime("00:00", "%H:%M").time()
-            next_midnight = datetime.strptime("23:59", "%H:%M").time()
-            
-            # Process first interval (start to midnight)
-            new_timeline = []
-            for slot in timeline:
-                slot_start_min = slot["start"].hour * 60 + slot["start"].minute
-                slot_end_min = slot["end"].hour * 60 + slot["end"].minute
-                
-                if slot_start_min < start_minutes < slot_end_min:
-                    new_timeline.append({"start": slot["start"], "end": obligation["start"]})
-                if slot_start_min < total_day_minutes < slot_end_min:
-                    new_timeline.append({"start": obligation["end"], "end": slot["end"]})
-                if start_minutes >= slot_end_min or total_day_minutes <= slot_start_min:
-                    new_timeline.append(slot)
-            
-            # Process second interval (midnight to end)
-            final_timeline = []
-            for slot in new_timeline:
-                slot_start_min = slot["start"].hour * 60 + slot["start"].minute
-                slot_end_min = slot["end"].hour * 60 + slot["end"].minute
-                
-                if slot_start_min < end_minutes < slot_end_min:
-                    final_timeline.append({"start": slot["start"], "end": obligation["end"]})
-                if slot_start_min < 0 < slot_end_min:
-                    final_timeline.append({"start": obligation["end"], "end": slot["end"]})
-                if end_minutes >= slot_end_min or 0 <= slot_start_min:
-                    final_timeline.append(slot)
-            
-            timeline = final_timeline
-        else:
-            # Handle normal obligations
-            new_timeline = []
-            for slot in timeline:
-                if slot["start"] < obligation["start"] < slot["end"]:
-                    new_timeline.append({"start": slot["start"], "end": obligation["start"]})
-                if slot["start"] < obligation["end"] < slot["end"]:
-                    new_timeline.append({"start": obligation["end"], "end": slot["end"]})
-                if obligation["end"] <= slot["start"] or obligation["start"] >= slot["end"]:
-                    new_timeline.append(slot)
-            timeline = new_timeline
+        return {"tasks": [], "preference_respected": True, "found_schedule": True, "dropped_tasks": []}
+
+    # Free slots of the day in minutes, obligations crossing midnight are split in two
+    gaps = GapIndex([(slot.start, slot.end) for slot in get_free_slots(wake_up, sleep, obligations)])
+
+    order = list(range(len(tasks)))
+    if mode == PREFERENCE:
+        # Tasks with a preference claim their period before the others fill the day
+        order.sort(key=lambda position: not tasks[position].get("preference"))
 
     # Schedule tasks
+    starts = {}
+    for position in order:
+        task = tasks[position]
+        start = find_start(gaps, task, mode, periods)
+        if start is not None:
+            gaps.carve(start, start + task["duration"])
+            starts[position] = start
+
     scheduled_tasks = []
-    for task in tasks:
-        duration_needed = task["duration"]
-        task_scheduled = False
-        
-        for slot in timeline:
-            slot_start_min = slot["start"].hour * 60 + slot["start"].minute
-            slot_end_min = slot["end"].hour * 60 + slot["end"].minute
-            
-            # Adjust for slots that cross midnight
-            if slot_end_min < slot_start_min:
-                slot_end_min += total_day_minutes
-                
-            available_minutes = slot_end_min - slot_start_min
-            
-            if available_minutes >= duration_needed:
-                task_start = slot["start"]
-                task_end_minutes = (slot_start_min + duration_needed) % total_day_minutes
-                task_end = datetime.strptime(f"{task_end_minutes // 60:02d}:{task_end_minutes % 60:02d}", "%H:%M").time()
-                
-                scheduled_tasks.append({
-                    "task": task["task"],
-                    "start": task_start,
-                    "end": task_end
-                })
-                
-                # Update timeline
-                new_start = task_end
-                timeline = [{"start": new_start, "end": slot["end"]}] + [
-                    s for s in timeline if s != slot
-                ]
-                task_scheduled = True
-                break
-                
-        if not task_scheduled:
-            print(f"Warning: Could not schedule task '{task['task']}'")
+    dropped_tasks = []
+    preference_respected = True
+
+    for position, task in enumerate(tasks):
+        if position not in starts:
+            dropped_tasks.append(task["task"])
+            continue
+
+        start = starts[position]
+        scheduled_tasks.append(to_task_dict(task["task"], start, start + task["duration"]))
+        if task.get("preference") and get_minute_preference(start, periods) != task["preference"].lower():
+            preference_respected = False
 
     return {
         "tasks": scheduled_tasks,
-        "preference_respected": True,
-        "found_schedule": True
-    }
\ No newline at end of file
+        "preference_respected": preference_respected,
+        "found_schedule": not dropped_tasks,
+        "dropped_tasks": dropped_tasks
+    }
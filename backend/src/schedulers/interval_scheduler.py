@@ -1,6 +1,18 @@
-from datetime import datetime, timedelta
-from src.validators.scheduler import minutes_between
-from src.core.helpers import get_time_to_preference, adjust_wakeup_and_sleep, get_available_slots
+from datetime import datetime
+from src.core.feasibility import get_infeasible_tasks
+from src.core.free_slots import get_free_slots
+from src.core.minutes import get_minute_preference, to_task_dict
+from src.core.periods import DEFAULT_PERIODS
+
+class Interval:
+    """A fixed-size piece of a free slot, in minutes."""
+    __slots__ = ("start", "end", "duration", "assigned")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.duration = end - start
+        self.assigned = False
 
 def get_smallest_duration(tasks):
     """Get the smallest task duration from the list of tasks."""
@@ -9,110 +21,132 @@ def get_smallest_duration(tasks):
 def create_intervals(timeline, interval_size):
     """Create fixed-size intervals from the available timeline."""
     intervals = []
-    today = datetime.today().date()  # Get today's date as base
-    
+
     for slot in timeline:
-        current_datetime = datetime.combine(today, slot["start"])
-        slot_end_datetime = datetime.combine(today, slot["end"])
-        
-        # Adjust end datetime if the slot crosses midnight
-        if slot["start"] > slot["end"]:
-            slot_end_datetime += timedelta(days=1)
-            
-        while current_datetime < slot_end_datetime:
-            end_datetime = current_datetime + timedelta(minutes=interval_size)
-            
-            # If this interval would extend beyond the slot, cap it
-            if end_datetime > slot_end_datetime:
-                end_datetime = slot_end_datetime
-            
-            if current_datetime < end_datetime:  # Only add if there's actual time in the interval
-                intervals.append({
-                    "start": current_datetime.time(),
-                    "end": end_datetime.time(),
-                    "duration": (end_datetime - current_datetime).total_seconds() / 60,
-                    "assigned": False
-                })
-            
-            current_datetime = end_datetime
+        # The last interval of a slot is capped at the end of the slot
+        for start in range(slot.start, slot.end, interval_size):
+            intervals.append(Interval(start, min(start + interval_size, slot.end)))
+
     return intervals
 
-def get_intervals_by_preference(intervals, preference):
-    """Filter intervals based on time preference."""
-    if not preference:
-        return intervals
-    
-    return [interval for interval in intervals 
-            if get_time_to_preference(interval["start"]) == preference.lower()]
+class IntervalTimeline:
+    """
+    Intervals of the free slots with the free time that follows each of them.
 
-def can_schedule_task(intervals, task_duration, start_idx):
-    """Check if a task can be scheduled starting from a given interval."""
-    remaining_duration = task_duration
-    idx = start_idx
-    
-    while remaining_duration > 0 and idx < len(intervals):
-        if not intervals[idx]["assigned"]:
-            remaining_duration -= intervals[idx]["duration"]
+    free_run[i] is the total duration of the unassigned intervals from i up to the next assigned one,
+    a task of d minutes can start at interval i if free_run[i] >= d. Assigning intervals only shortens
+    the runs of the unassigned intervals right before them, so the array is updated in place instead
+    of scanning forward from every candidate.
+    """
+    __slots__ = ("intervals", "free_run", "period_index")
+
+    def __init__(self, intervals, periods=DEFAULT_PERIODS):
+        self.intervals = intervals
+
+        self.free_run = [0] * (len(intervals) + 1)
+        for index in range(len(intervals) - 1, -1, -1):
+            self.free_run[index] = intervals[index].duration + self.free_run[index + 1]
+
+        # Indices of the intervals starting in every period of the day
+        self.period_index = {}
+        for index, interval in enumerate(intervals):
+            self.period_index.setdefault(get_minute_preference(interval.start, periods), []).append(index)
+
+    def first_fit(self, duration, preference=None):
+        """Index of the first interval a task can start at, in the preferred period if one is given, None if there is none."""
+        if preference:
+            candidates = self.period_index.get(preference.lower(), [])
         else:
-            return False
-        idx += 1
-    
-    return remaining_duration <= 0
+            candidates = range(len(self.intervals))
+
+        free_run = self.free_run
+        return next((index for index in candidates if free_run[index] >= duration), None)
+
+    def assign(self, task, start_index):
+        """Schedule a task across intervals starting from a given index, returns the scheduled parts."""
+        intervals, free_run = self.intervals, self.free_run
+        run = free_run[start_index]
+
+        remaining_duration = task["duration"]
+        scheduled_parts = []
+        index = start_index
 
-def schedule_task_in_intervals(intervals, task, start_idx):
-    """Schedule a task across intervals starting from a given index."""
-    remaining_duration = task["duration"]
-    scheduled_parts = []
-    idx = start_idx
+        while remaining_duration > 0:
+            interval = intervals[index]
+            duration_to_use = min(remaining_duration, interval.duration)
+
+            scheduled_part = to_task_dict(task["task"], interval.start, interval.start + duration_to_use)
+            scheduled_part["duration"] = duration_to_use
+            scheduled_parts.append(scheduled_part)
+
+            interval.assigned = True
+            free_run[index] = 0
+            remaining_duration -= duration_to_use
+            index += 1
+
+        # The runs of the free intervals right before now stop at start_index
+        index = start_index - 1
+        while index >= 0 and not intervals[index].assigned:
+            free_run[index] -= run
+            index -= 1
+
+        return scheduled_parts
+
+def place_tasks(intervals, sorted_tasks, use_preferences=True, periods=DEFAULT_PERIODS):
+    """
+    Place the tasks one after the other in the first intervals they fit in, in their preferred
+    period first if use_preferences is set.
+
+    Returns:
+        The scheduled parts, None if a task cannot be placed, and whether every task starts in its
+        preferred period
+    """
+    interval_timeline = IntervalTimeline(intervals, periods)
+    scheduled_tasks = []
+    all_preferences_respected = True
     
-    while remaining_duration > 0 and idx < len(intervals):
-        interval = intervals[idx]
-        if interval["assigned"]:
-            break
-            
-        duration_to_use = min(remaining_duration, interval["duration"])
-        end_time = (datetime.combine(datetime.today(), interval["start"]) + 
-                   timedelta(minutes=duration_to_use)).time()
+    # Try to schedule each task
+    for task in sorted_tasks:
+        task_scheduled = False
+        preference = task.get("preference")
         
-        scheduled_parts.append({
-            "task": task["task"],
-            "start": interval["start"],
-            "end": end_time,
-            "duration": duration_to_use
-        })
+        # First try to schedule in preferred time slots
+        if preference and use_preferences:
+            start_index = interval_timeline.first_fit(task["duration"], preference)
+            if start_index is not None:
+                scheduled_tasks.extend(interval_timeline.assign(task, start_index))
+                task_scheduled = True
+            else:
+                all_preferences_respected = False
         
-        interval["assigned"] = True
-        remaining_duration -= duration_to_use
-        idx += 1
+        # If task couldn't be scheduled in preferred slots (or has no preference),
+        # try any available slots
+        if not task_scheduled:
+            start_index = interval_timeline.first_fit(task["duration"])
+            if start_index is not None:
+                scheduled_tasks.extend(interval_timeline.assign(task, start_index))
+                task_scheduled = True
+        
+        if not task_scheduled:
+            return None, all_preferences_respected
     
-    return scheduled_parts
+    return scheduled_tasks, all_preferences_respected
 
-def interval_schedule(wake_up, sleep, obligations, tasks):
+def interval_schedule(wake_up, sleep, obligations, tasks, periods=DEFAULT_PERIODS):
     """
     Schedule tasks using interval-based algorithm with preference support.
     Tasks can be split across intervals if needed.
+
+    Args:
+        periods: PeriodTable of the preference periods of the request
     
     Returns:
         dict: A dictionary containing:
             - 'tasks': List of scheduled tasks with start and end times
             - 'preference_respected': Boolean indicating if preferences were respected
     """
-    # Create initial timeline
-    timeline = adjust_wakeup_and_sleep(wake_up, sleep)
-
-    timeline = get_available_slots(timeline)
-    
-    # Process obligations
-    for obligation in sorted(obligations, key=lambda x: x["start"]):
-        new_timeline = []
-        for slot in timeline:
-            if slot["start"] < obligation["start"] < slot["end"]:
-                new_timeline.append({"start": slot["start"], "end": obligation["start"]})
-            if slot["start"] < obligation["end"] < slot["end"]:
-                new_timeline.append({"start": obligation["end"], "end": slot["end"]})
-            if obligation["end"] <= slot["start"] or obligation["start"] >= slot["end"]:
-                new_timeline.append(slot)
-        timeline = new_timeline
+    # Free slots of the day in minutes, split around the obligations
+    timeline = get_free_slots(wake_up, sleep, obligations)
     
     # If there are no task then just add them transparently
     if len(tasks) == 0:
@@ -122,6 +156,16 @@ def interval_schedule(wake_up, sleep, obligations, tasks):
             "found_schedule": True
         }
     
+    # Tasks can be split across intervals, so only the total free time bounds them
+    infeasible_tasks = get_infeasible_tasks(timeline, tasks, allow_split=True)
+    if infeasible_tasks:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "infeasible_tasks": infeasible_tasks
+        }
+
     # Get smallest duration for interval size
     try:
         interval_size = get_smallest_duration(tasks)
@@ -132,56 +176,27 @@ def interval_schedule(wake_up, sleep, obligations, tasks):
             "found_schedule": False
         }
     
-    # Create fixed-size intervals
-    intervals = create_intervals(timeline, interval_size)
-
-    
     # Sort tasks by preference order (morning -> afternoon -> evening -> night -> no preference)
     preference_order = {"morning": 0, "afternoon": 1, "evening": 2, "night": 3, "none": 4}
     
-    # To handle the case where the preference is not defined
+    # To handle the case where the preference is not defined, periods of the request come with it
     sorted_tasks = sorted(tasks, 
-                        key=lambda x: (preference_order.get(x.get("preference") or "none"), -x["duration"]))
+                        key=lambda x: (preference_order.get(x.get("preference") or "none", preference_order["none"]), -x["duration"]))
     
-    scheduled_tasks = []
-    all_preferences_respected = True
-    
-    # Try to schedule each task
-    for task in sorted_tasks:
-        task_scheduled = False
-        preference = task.get("preference")
-        
-        # First try to schedule in preferred time slots
-        if preference:
-            preferred_intervals = get_intervals_by_preference(intervals, preference)
-            
-            # Try each possible starting interval
-            for i in range(len(preferred_intervals)):
-                if can_schedule_task(intervals, task["duration"], i):
-                    scheduled_parts = schedule_task_in_intervals(intervals, task, i)
-                    scheduled_tasks.extend(scheduled_parts)
-                    task_scheduled = True
-                    break
-            
-            if not task_scheduled:
-                all_preferences_respected = False
-        
-        # If task couldn't be scheduled in preferred slots (or has no preference),
-        # try any available slots
-        if not task_scheduled:
-            for i in range(len(intervals)):
-                if can_schedule_task(intervals, task["duration"], i):
-                    scheduled_parts = schedule_task_in_intervals(intervals, task, i)
-                    scheduled_tasks.extend(scheduled_parts)
-                    task_scheduled = True
-                    break
-        
-        if not task_scheduled:
-            return {
-                "tasks": [],
-                "preference_respected": all_preferences_respected,
-                "found_schedule": False
-            }
+    scheduled_tasks, all_preferences_respected = place_tasks(create_intervals(timeline, interval_size), sorted_tasks, periods=periods)
+
+    # Tasks placed in their preferred period can cut the free time so that a later task no longer
+    # fits, every task is then placed again in the first free intervals
+    if scheduled_tasks is None and any(task.get("preference") for task in tasks):
+        scheduled_tasks, _ = place_tasks(create_intervals(timeline, interval_size), sorted_tasks, use_preferences=False, periods=periods)
+        all_preferences_respected = False
+
+    if scheduled_tasks is None:
+        return {
+            "tasks": [],
+            "preference_respected": all_preferences_respected,
+            "found_schedule": False
+        }
     
     return {
         "tasks": scheduled_tasks,
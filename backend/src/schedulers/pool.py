@@ -0,0 +1,166 @@
+from typing import Any, Callable, Optional, Tuple
+
+import multiprocessing
+import queue
+import threading
+import time
+
+# Seconds a new solver process may take to start and import the solvers
+WORKER_START_TIMEOUT = 60.0
+
+class SolverTimeout(Exception):
+    """The solver did not finish within its time budget."""
+
+
+class SolverCrashed(Exception):
+    """The solver process died or its pipe broke before the result came back."""
+
+
+def solver_worker_main(conn) -> None:
+    """Loop of a solver process: receive (function, args), send back ("ok", result) or ("error", exception)."""
+    # Tell the pool the process has started, its start-up is not part of any time budget
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+
+        try:
+            message = ("ok", func(*args))
+        except Exception as e:
+            message = ("error", e)
+
+        try:
+            conn.send(message)
+        except Exception as e:
+            # The result or the exception could not be pickled
+            conn.send(("error", RuntimeError(f"Solver result could not be sent: {e}")))
+
+
+class SolverWorker:
+    """A solver process and the pipe used to talk to it."""
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=solver_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self) -> None:
+        """Wait for the process to finish starting, a no-op once it has."""
+        if self.ready:
+            return
+
+        try:
+            if not self.conn.poll(WORKER_START_TIMEOUT):
+                raise SolverCrashed(f"Solver process did not start within {WORKER_START_TIMEOUT} seconds")
+            self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise SolverCrashed("Solver process terminated while starting") from e
+
+        self.ready = True
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SolverPool:
+    """
+    Bounded pool of solver processes that can stop a solver in the middle of its search.
+
+    A ProcessPoolExecutor cannot cancel a task that is already running, so each worker is a plain
+    process that gets killed and replaced when its solver runs out of time.
+    """
+    def __init__(self, max_workers: int = 2):
+        """
+        Args:
+            max_workers: Maximum number of solvers running at the same time
+        """
+        self.max_workers = max_workers
+        self.context = multiprocessing.get_context("spawn")
+
+        # Workers start in the background right away and are kept for the next requests, a killed
+        # worker is replaced on the next use
+        self.idle_workers: "queue.LifoQueue[SolverWorker]" = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_workers)
+
+        for _ in range(max_workers):
+            self.idle_workers.put(SolverWorker(self.context))
+
+    def acquire_worker(self, timeout: Optional[float]) -> SolverWorker:
+        if not self.slots.acquire(timeout=timeout):
+            raise SolverTimeout("No solver process became free within the time budget")
+
+        try:
+            return self.idle_workers.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            return SolverWorker(self.context)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release_worker(self, worker: SolverWorker, healthy: bool) -> None:
+        if healthy:
+            self.idle_workers.put(worker)
+        else:
+            worker.kill()
+        self.slots.release()
+
+    def run(self, func: Callable, args: Tuple = (), time_budget: Optional[float] = None) -> Any:
+        """
+        Run func(*args) in a solver process.
+
+        Args:
+            func: Module level function, it is sent to the process by reference
+            args: Picklable arguments
+            time_budget: Seconds the call may take including the wait for a free process, None waits forever.
+                The start-up of a new solver process is not counted
+
+        Raises:
+            SolverTimeout: The time budget ran out, the solver process is killed
+            SolverCrashed: The solver process died, it is replaced on the next call
+            Exception: Any exception raised by func is raised again here
+        """
+        started = time.monotonic()
+
+        worker = self.acquire_worker(time_budget)
+        healthy = False
+
+        try:
+            waited = time.monotonic() - started
+            worker.wait_ready()
+            deadline = time.monotonic() + time_budget - waited if time_budget is not None else None
+
+            try:
+                worker.conn.send((func, args))
+
+                remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+
+                if not worker.conn.poll(remaining):
+                    raise SolverTimeout(f"Solver did not finish within {time_budget} seconds")
+
+                status, value = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                raise SolverCrashed("Solver process terminated unexpectedly") from e
+            healthy = True
+        finally:
+            self.release_worker(worker, healthy)
+
+        if status == "error":
+            raise value
+
+        return value
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                self.idle_workers.get_nowait().kill()
+            except queue.Empty:
+                return
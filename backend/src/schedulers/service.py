@@ -0,0 +1,260 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import logging
+import multiprocessing
+import os
+import threading
+
+from src.schedulers.ac3 import ac3_schedule
+from src.schedulers.forward_checking import forward_checking_schedule
+from src.schedulers.backtracking import backtracking_slot_placement
+from src.schedulers.binpack import binpack_schedule
+from src.schedulers.greedy_scheduler import fit_tasks_into_schedule
+from src.schedulers.subset_dp import subset_dp_schedule
+from src.schedulers.interval_scheduler import interval_schedule
+from src.schedulers.pool import SolverCrashed, SolverPool, SolverTimeout
+from src.core.budget import SearchBudget
+from src.core.minutes import to_minutes
+from src.core.periods import compile_periods
+from src.core.timeline import split_cross_midnight_obligations, combine_split_obligations
+
+logger = logging.getLogger(__name__)
+
+# Algorithms available on /schedule/<algo>
+SCHEDULERS = {
+    'ac3': ac3_schedule,
+    'forward_check': forward_checking_schedule,
+    'backtrack': backtracking_slot_placement,
+    'greedy': fit_tasks_into_schedule,
+    'binpack': binpack_schedule,
+    'subset_dp': subset_dp_schedule
+}
+
+solver_pool = None
+solver_pool_lock = threading.Lock()
+
+def get_solver_pool(max_workers: int = 2) -> SolverPool:
+    """Return the shared pool of solver processes used by single requests, creating it on first use."""
+    global solver_pool
+
+    with solver_pool_lock:
+        if solver_pool is None:
+            solver_pool = SolverPool(max_workers=max_workers)
+
+        return solver_pool
+
+def shutdown_solver_pool() -> None:
+    global solver_pool
+
+    with solver_pool_lock:
+        if solver_pool is not None:
+            solver_pool.shutdown()
+            solver_pool = None
+
+def solve_schedule(algo: str, data: Dict[str, Any], time_budget: Optional[float] = None, solver_workers: int = 2,
+                   node_budget: Optional[int] = None, search_time: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Solve one scheduling request, falling back to the interval scheduler if the algorithm finds no schedule.
+
+    A search stopped by its node or search time budget returns its largest partial schedule, which is
+    kept unless the interval scheduler places at least as many tasks. A request that fails the feasibility
+    bounds lists the tasks that cannot fit in 'infeasible_tasks'.
+
+    Args:
+        algo: Name of the algorithm in SCHEDULERS
+        data: Request payload with wake_up_time, sleep_time, obligations and regular_tasks, and optionally
+            preference_periods, a list of {name, start, end} periods laid over the default ones in order
+        time_budget: Seconds the algorithm may run in a solver process before it is stopped and the
+            interval scheduler is used instead, which is also used if the process crashes. None runs it
+            in the calling thread without a limit
+        solver_workers: Size of the solver pool, only used when the pool is created
+        node_budget: Search nodes the algorithm may explore, None for no limit
+        search_time: Seconds the algorithm may search, None for no limit
+
+    Returns:
+        The response of /schedule/<algo> with the times formatted as HH:MM
+
+    Raises:
+        KeyError: A required field is missing
+        ValueError: The algorithm does not exist or a time is not formatted as HH:MM
+    """
+    if algo not in SCHEDULERS:
+        raise ValueError(f"Invalid algorithm: {algo}")
+
+    # Convert string times to datetime.time objects
+    wake_up = datetime.strptime(data['wake_up_time'], "%H:%M").time()
+    sleep = datetime.strptime(data['sleep_time'], "%H:%M").time()
+
+    # Convert obligation times
+    obligations = []
+    for obligation in data['obligations']:
+        obligations.append({
+            'task': obligation['task'],
+            'start': datetime.strptime(obligation['start'], "%H:%M").time(),
+            'end': datetime.strptime(obligation['end'], "%H:%M").time()
+        })
+
+    # Split obligations that cross midnight
+    split_obligations = split_cross_midnight_obligations(obligations)
+
+    # Tasks are already in correct format
+    tasks = data['regular_tasks']
+
+    # Preference periods of the request, compiled once into the table every scheduler looks up
+    periods = compile_periods([
+        (
+            period['name'],
+            to_minutes(datetime.strptime(period['start'], "%H:%M").time()),
+            to_minutes(datetime.strptime(period['end'], "%H:%M").time())
+        )
+        for period in data.get('preference_periods', [])
+    ])
+
+    solver_timed_out = False
+    budget = SearchBudget(max_nodes=node_budget, time_limit=search_time)
+
+    if time_budget is None:
+        result = SCHEDULERS[algo](wake_up, sleep, split_obligations, tasks, budget=budget, periods=periods)
+    else:
+        try:
+            result = get_solver_pool(solver_workers).run(
+                partial(SCHEDULERS[algo], budget=budget, periods=periods),
+                (wake_up, sleep, split_obligations, tasks),
+                time_budget=time_budget
+            )
+        except SolverTimeout:
+            logger.warning(f"{algo} solver ran out of its {time_budget} second budget")
+            result = {'tasks': [], 'preference_respected': False, 'found_schedule': False}
+            solver_timed_out = True
+        except SolverCrashed:
+            logger.exception(f"{algo} solver process crashed")
+            result = {'tasks': [], 'preference_respected': False, 'found_schedule': False}
+
+    interval_scheduler_used = False
+    budget_exhausted = result.get('budget_exhausted', False)
+    # Tasks the algorithm found could never fit, before the interval scheduler replaces its result
+    infeasible_tasks = result.get('infeasible_tasks', [])
+
+    if result['found_schedule'] is False:
+        # If we couldn't find a schedule, try to use interval scheduler
+        interval_result = interval_schedule(wake_up, sleep, split_obligations, tasks, periods=periods)
+
+        # The partial schedule of a stopped search is kept if it has more tasks
+        if not budget_exhausted or len(interval_result['tasks']) >= len(result['tasks']):
+            result = interval_result
+            interval_scheduler_used = True
+
+    if result['found_schedule'] is False and interval_scheduler_used:
+        if len(result['tasks']) != len(tasks):
+            result = interval_schedule(wake_up, sleep, split_obligations, tasks, periods=periods)
+            interval_scheduler_used = True
+
+    # Combine split obligations back together
+    combined_result = combine_split_obligations(result['tasks'])
+
+    # Convert datetime.time objects to string format in response
+    formatted_result = []
+
+    for task in combined_result:
+        formatted_result.append({
+            'task': task['task'],
+            'start': task['start'].strftime("%H:%M"),
+            'end': task['end'].strftime("%H:%M")
+        })
+
+    return {
+        'schedule': formatted_result,
+        'obligations': [{
+            'task': obl['task'],
+            'start': obl['start'].strftime("%H:%M"),
+            'end': obl['end'].strftime("%H:%M")
+        } for obl in obligations],  # Use original obligations here, not split ones
+        'found_schedule': result['found_schedule'],
+        'preference_respected': result['preference_respected'],
+        'alternative_scheduler_used': interval_scheduler_used,
+        'solver_timed_out': solver_timed_out,
+        'budget_exhausted': budget_exhausted,
+        'infeasible_tasks': [] if result['found_schedule'] else infeasible_tasks
+    }
+
+def get_error_message(error: Exception) -> str:
+    """Error message of a failed scheduling request, the same ones /schedule/<algo> returns."""
+    if isinstance(error, KeyError):
+        return f"Missing required field: {str(error)}"
+    if isinstance(error, ValueError):
+        return f"Invalid data format: {str(error)}"
+    return f"Server error: {str(error)}"
+
+def solve_schedule_item(algo: str, data: Dict[str, Any], node_budget: Optional[int] = None,
+                        search_time: Optional[float] = None) -> Dict[str, Any]:
+    """Solve one item of a batch, an error is returned instead of raised so it only fails that item."""
+    try:
+        return solve_schedule(algo, data, node_budget=node_budget, search_time=search_time)
+    except Exception as e:
+        return {'error': get_error_message(e)}
+
+process_pool = None
+process_pool_workers = 0
+process_pool_lock = threading.Lock()
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Return the shared pool of solver processes, creating it on first use."""
+    global process_pool, process_pool_workers
+
+    with process_pool_lock:
+        if process_pool is None:
+            process_pool_workers = max_workers or os.cpu_count() or 1
+
+            # Spawn fresh interpreters, forking the server would copy the model and its threads
+            process_pool = ProcessPoolExecutor(
+                max_workers=process_pool_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+        return process_pool
+
+def shutdown_process_pool() -> None:
+    global process_pool
+
+    with process_pool_lock:
+        if process_pool is not None:
+            process_pool.shutdown(cancel_futures=True)
+            process_pool = None
+
+def solve_schedule_batch(items: List[Dict[str, Any]], default_algo: Optional[str] = None, max_workers: Optional[int] = None,
+                         node_budget: Optional[int] = None, search_time: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Solve many scheduling requests across the pool of solver processes.
+
+    Args:
+        items: Request payloads, each can name its own algorithm with an "algo" field
+        default_algo: Algorithm of the items without an "algo" field
+        max_workers: Number of solver processes, only used when the pool is created
+        node_budget: Search nodes each item may explore, None for no limit
+        search_time: Seconds each item may search, None for no limit
+
+    Returns:
+        One response per item in input order, failed items are {"error": message}
+    """
+    if not items:
+        return []
+
+    algos = [item.get('algo', default_algo) if isinstance(item, dict) else default_algo for item in items]
+
+    pool = get_process_pool(max_workers)
+
+    # Send the items in chunks so small requests do not pay one round trip to a worker each
+    chunksize = max(1, len(items) // (process_pool_workers * 4))
+
+    try:
+        solve_item = partial(solve_schedule_item, node_budget=node_budget, search_time=search_time)
+        return list(pool.map(solve_item, algos, items, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died, start a new pool for the next batch
+        logger.exception("Solver process pool broke")
+        shutdown_process_pool()
+        return [{'error': "Server error: solver process terminated unexpectedly"} for _ in items]
@@ -0,0 +1,204 @@
+"""
+Exact scheduling of a few tasks with a dynamic program over the subsets of scheduled tasks.
+
+The tasks of a schedule follow each other through the day, so every schedule is built by adding tasks
+one at a time to a subset already placed, each one starting after the end of the previous one. For a
+subset, only the earliest end for every number of tasks starting in their preferred period is worth
+keeping. This Pareto front makes the program exact for both questions at once: whether every task
+fits, and how many of them can start in their preferred period. A task either starts as early as
+possible or at its earliest start in its preferred period, any other start ends later without
+respecting more preferences. Starts are exact to the minute.
+
+Tasks with the same duration and preference are interchangeable, so a subset is the number of tasks of
+every kind it holds, numbered in mixed radix. Adding a task always increases the number of the subset,
+so the subsets are reached in increasing order.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from src.config import SUBSET_DP_MAX_TASKS
+from src.core.feasibility import get_infeasible_tasks
+from src.core.free_slots import get_free_slots
+from src.core.minutes import MINUTES_PER_DAY, Slot, get_preference_ranges, to_task_dict
+from src.core.periods import DEFAULT_PERIODS, PeriodTable
+from src.schedulers.binpack import binpack_schedule
+
+# Start of a task that cannot be placed after a given minute
+NO_START = MINUTES_PER_DAY
+
+def get_start_table(slots: List[Slot], duration: int, preference: Optional[str] = None,
+                    periods: PeriodTable = DEFAULT_PERIODS) -> List[int]:
+    """
+    Earliest start at or after every minute of the day of a task of the given duration, in the
+    preferred period if one is given, NO_START if there is none.
+    """
+    ranges = get_preference_ranges(preference, periods) if preference else [(0, MINUTES_PER_DAY)]
+
+    valid = [False] * (MINUTES_PER_DAY + 1)
+    for slot in slots:
+        for range_start, range_end in ranges:
+            start = max(slot.start, range_start)
+            end = min(slot.end - duration + 1, range_end)
+            if start < end:
+                valid[start:end] = [True] * (end - start)
+
+    starts = [NO_START] * (MINUTES_PER_DAY + 1)
+    for minute in range(MINUTES_PER_DAY - 1, -1, -1):
+        starts[minute] = minute if valid[minute] else starts[minute + 1]
+    return starts
+
+def run_subset_dp(slots: List[Slot], tasks: List[Dict],
+                  periods: PeriodTable = DEFAULT_PERIODS) -> Optional[Tuple[List[Tuple[Dict, int]], bool]]:
+    """
+    Place every task in the free slots with as many tasks as possible in their preferred period.
+
+    Returns:
+        The (task, start) placements in the order of the day and whether every task that can start in
+        its preferred period does, None if the tasks cannot all be placed
+    """
+    kinds = {}
+    for task in tasks:
+        preference = task.get("preference")
+        kinds.setdefault((task["duration"], preference.lower() if preference else None), []).append(task)
+
+    durations = [duration for duration, _ in kinds]
+    counts = [len(kind_tasks) for kind_tasks in kinds.values()]
+    any_starts = [get_start_table(slots, duration) for duration in durations]
+    preferred_starts = []
+    for duration, preference in kinds:
+        table = get_start_table(slots, duration, preference, periods) if preference else None
+        # A task whose period is in no slot keeps any start, like in the CSP solvers
+        preferred_starts.append(table if table is not None and table[0] != NO_START else None)
+
+    # Number of a subset in mixed radix, adding a task of a kind adds the radix of the kind
+    radices = []
+    total = 1
+    for count in counts:
+        radices.append(total)
+        total *= count + 1
+    full = total - 1
+
+    # Entries (end, preferred tasks, previous subset, position in its front, kind, start). The entries of
+    # a subset are gathered from the smaller subsets, keeping the earliest end for every number of
+    # preferred tasks, and reduced to their Pareto front when the subset is reached
+    fronts = [{} for _ in range(total)]
+    fronts[0][0] = (0, 0, -1, -1, -1, -1)
+
+    for subset in range(total):
+        entries = fronts[subset]
+        if not entries:
+            continue
+
+        # Most preferred tasks first, an entry is kept if it ends before every entry kept before it
+        front = []
+        for preferred_count in sorted(entries, reverse=True):
+            entry = entries[preferred_count]
+            if not front or entry[0] < front[-1][0]:
+                front.append(entry)
+        fronts[subset] = front
+
+        if subset == full:
+            break
+
+        for kind, radix in enumerate(radices):
+            if subset // radix % (counts[kind] + 1) == counts[kind]:
+                continue
+
+            duration = durations[kind]
+            starts = any_starts[kind]
+            preferred = preferred_starts[kind]
+            next_entries = fronts[subset + radix]
+
+            for position, (end, preferred_count, _, _, _, _) in enumerate(front):
+                start = starts[end]
+                if start == NO_START:
+                    continue
+
+                if preferred is not None:
+                    preferred_start = preferred[end]
+                    if preferred_start != NO_START:
+                        current = next_entries.get(preferred_count + 1)
+                        if current is None or preferred_start + duration < current[0]:
+                            next_entries[preferred_count + 1] = (preferred_start + duration, preferred_count + 1, subset, position, kind, preferred_start)
+                    if preferred_start == start:
+                        continue
+
+                current = next_entries.get(preferred_count)
+                if current is None or start + duration < current[0]:
+                    next_entries[preferred_count] = (start + duration, preferred_count, subset, position, kind, start)
+
+    if not fronts[full]:
+        return None
+
+    # The first entry of the front respects the most preferences
+    placements = []
+    subset, position = full, 0
+    while subset > 0:
+        _, _, previous, previous_position, kind, start = fronts[subset][position]
+        placements.append((kind, start))
+        subset, position = previous, previous_position
+    placements.reverse()
+
+    kind_tasks = [list(reversed(kind_tasks)) for kind_tasks in kinds.values()]
+    preferable = sum(count for count, table in zip(counts, preferred_starts) if table is not None)
+    return [(kind_tasks[kind].pop(), start) for kind, start in placements], fronts[full][0][1] == preferable
+
+def subset_dp_schedule(wake_up, sleep, obligations, tasks, budget=None, periods=DEFAULT_PERIODS):
+    """
+    Schedule tasks exactly with a dynamic program over the subsets of scheduled tasks.
+
+    The program takes a bounded time whatever the tasks, requests with more than SUBSET_DP_MAX_TASKS
+    tasks are packed by the binpack scheduler instead.
+
+    Args:
+        budget: SearchBudget of the binpack scheduler, the dynamic program does not search
+        periods: PeriodTable of the preference periods of the request
+
+    Returns:
+        dict: A dictionary containing:
+            - 'tasks': List of scheduled tasks with start and end times
+            - 'preference_respected': Boolean indicating if preferences were respected
+            - 'infeasible_tasks': Names of the tasks that cannot fit, only when the request fails
+              the feasibility bounds
+    """
+    if len(tasks) > SUBSET_DP_MAX_TASKS:
+        return binpack_schedule(wake_up, sleep, obligations, tasks, budget=budget, periods=periods)
+
+    # If there are no task then just add them transparently
+    if len(tasks) == 0:
+        return {
+            "tasks": [],
+            "preference_respected": True,
+            "found_schedule": True,
+            "budget_exhausted": False
+        }
+
+    # Free slots of the day in minutes, split around the obligations
+    timeline = get_free_slots(wake_up, sleep, obligations)
+
+    # Give up before the program if the tasks obviously cannot fit
+    infeasible_tasks = get_infeasible_tasks(timeline, tasks)
+    if infeasible_tasks:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "budget_exhausted": False,
+            "infeasible_tasks": infeasible_tasks
+        }
+
+    result = run_subset_dp(timeline, tasks, periods)
+    if result is None:
+        return {
+            "tasks": [],
+            "preference_respected": False,
+            "found_schedule": False,
+            "budget_exhausted": False
+        }
+
+    placements, preference_respected = result
+    return {
+        "tasks": [to_task_dict(task["task"], start, start + task["duration"]) for task, start in placements],
+        "preference_respected": preference_respected,
+        "found_schedule": True,
+        "budget_exhausted": False
+    }
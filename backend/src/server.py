@@ -1,15 +1,21 @@
 from flask import Flask, request, jsonify
-from src.schedulers.ac3 import ac3_schedule
-from src.schedulers.forward_checking import forward_checking_schedule
-from src.schedulers.backtracking import backtracking_slot_placement
-from src.schedulers.greedy_scheduler import fit_tasks_into_schedule
-from src.schedulers.interval_scheduler import interval_schedule
-from datetime import datetime, timedelta
-from config import DEV
-from src.hmms.inference.infer import infer
+from src.schedulers.service import SCHEDULERS, solve_schedule, solve_schedule_batch
+from config import (
+    DEV,
+    WARM_UP_ON_STARTUP,
+    MODEL_WATCH_INTERVAL,
+    INFER_BATCH_MAX_SIZE,
+    SCHEDULE_BATCH_WORKERS,
+    SCHEDULE_BATCH_MAX_SIZE,
+    SOLVER_WORKERS,
+    SOLVER_TIME_BUDGET,
+    SOLVER_NODE_BUDGET,
+    SOLVER_SEARCH_TIME
+)
+from src.hmms.inference.infer import infer, infer_batch, is_ready, get_warm_up_error, start_warm_up, start_model_watcher, get_cache_stats
 from flask_cors import CORS
-from src.core.helpers import split_cross_midnight_obligations, combine_split_obligations
 import logging
+import os
 import traceback
 
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +32,40 @@ CORS(app)
 def index():
     return "Hello, World!"
 
+@app.route('/ready', methods=['GET'])
+def ready():
+    # Only ready once the model is loaded and a dummy decode has run
+    if is_ready():
+        return jsonify({'ready': True})
+
+    return jsonify({'ready': False, 'error': get_warm_up_error()}), 503
+
+def extract_task_info(result):
+    """Extract the task name, duration and time of day from a decoding result."""
+    task_info = {
+        'task_name': '',
+        'duration': '',
+        'time_of_day': '',
+        'duration_unit': ''
+    }
+    
+    # Process the state sequence to extract information
+    current_activity = []
+    for state, word in result['state_sequence_with_words']:
+        if state == 'A':  # Activity name
+            current_activity.append(word)
+        elif state == 'T':  # Time value
+            task_info['duration'] = word
+        elif state == 'D':  # Duration unit
+            task_info['duration_unit'] = word
+        elif state == 'P':  # Time period
+            task_info['time_of_day'] = word
+    
+    # Join activity words to form task name
+    task_info['task_name'] = ' '.join(current_activity).strip()
+
+    return task_info
+
 @app.route('/infer', methods=['POST'])
 def process_natural_language():
     try:
@@ -40,28 +80,7 @@ def process_natural_language():
         # Process using HMM model
         result = infer(text)
         
-        # Extract relevant information
-        task_info = {
-            'task_name': '',
-            'duration': '',
-            'time_of_day': '',
-            'duration_unit': ''
-        }
-        
-        # Process the state sequence to extract information
-        current_activity = []
-        for state, word in result['state_sequence_with_words']:
-            if state == 'A':  # Activity name
-                current_activity.append(word)
-            elif state == 'T':  # Time value
-                task_info['duration'] = word
-            elif state == 'D':  # Duration unit
-                task_info['duration_unit'] = word
-            elif state == 'P':  # Time period
-                task_info['time_of_day'] = word
-        
-        # Join activity words to form task name
-        task_info['task_name'] = ' '.join(current_activity).strip()
+        task_info = extract_task_info(result)
 
         print("DATA")
         
@@ -75,95 +94,94 @@ def process_natural_language():
             raise e
         return jsonify({'error': str(e)}), 500
 
-@app.route('/schedule/<algo>', methods=['POST'])
-def schedule(algo):
+@app.route('/infer/batch', methods=['POST'])
+def process_natural_language_batch():
     try:
         data = request.json
+        if 'texts' not in data:
+            return jsonify({'error': 'Missing texts field'}), 400
 
-        print(data, "is the data")
-        # Convert string times to datetime.time objects
-        wake_up = datetime.strptime(data['wake_up_time'], "%H:%M").time()
-        sleep = datetime.strptime(data['sleep_time'], "%H:%M").time()
+        texts = data['texts']
 
-        print(data['obligations'], "is the obligations")
-        
-        # Convert obligation times
-        obligations = []
-        for obligation in data['obligations']:
-            obligations.append({
-                'task': obligation['task'],
-                'start': datetime.strptime(obligation['start'], "%H:%M").time(),
-                'end': datetime.strptime(obligation['end'], "%H:%M").time()
-            })
-        
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'texts must be a list of strings'}), 400
 
-        # Split obligations that cross midnight
-        split_obligations = split_cross_midnight_obligations(obligations)
-        
-        # Tasks are already in correct format
-        tasks = data['regular_tasks']
-        
-        # Call appropriate scheduler based on algo parameter
-        if algo == 'ac3':
-            result = ac3_schedule(wake_up, sleep, split_obligations, tasks)
-        elif algo == 'forward_check':
-            result = forward_checking_schedule(wake_up, sleep, split_obligations, tasks)
-        elif algo == 'backtrack':
-            result = backtracking_slot_placement(wake_up, sleep, split_obligations, tasks)
-        elif algo == 'greedy':
-            result = fit_tasks_into_schedule(wake_up, sleep, split_obligations, tasks)
-        else:
-            if DEV:
-                raise ValueError(f"Invalid algorithm: {algo}")
-            else:
-                return jsonify({'error': f'Invalid algorithm: {algo}'}), 400
+        if len(texts) > INFER_BATCH_MAX_SIZE:
+            return jsonify({'error': f'At most {INFER_BATCH_MAX_SIZE} texts can be sent at once'}), 400
 
+        # All the texts are decoded together in one batched Viterbi pass
+        results = infer_batch(texts) if texts else []
 
-        interval_scheduler_used = False
-            
-        if result['found_schedule'] is False:
-            # If we couldn't find a schedule, try to use interval scheduler
-            result = interval_schedule(wake_up, sleep, split_obligations, tasks)
-            interval_scheduler_used = True
-        
-        if result['found_schedule'] is False:
-            if len(result['tasks']) != len(tasks):
-                result = interval_schedule(wake_up, sleep, split_obligations, tasks)
-                interval_scheduler_used = True
+        return jsonify({
+            'results': [{
+                'parsed_info': extract_task_info(result),
+                'raw_inference': result
+            } for result in results]
+        })
 
-        print(result, "is the result")
+    except Exception as e:
+        if DEV:
+            raise e
+        return jsonify({'error': str(e)}), 500
 
-        print(result['tasks'], "is the tasks")
-                    
-        # Combine split obligations back together
-        combined_result = combine_split_obligations(result['tasks'])
+@app.route('/infer/cache', methods=['GET'])
+def inference_cache_stats():
+    return jsonify(get_cache_stats())
 
-        print(combined_result, "is the combined result")
-            
-        # Convert datetime.time objects to string format in response
-        formatted_result = []
+@app.route('/schedule/batch', methods=['POST'])
+def schedule_batch():
+    try:
+        data = request.json
+        if 'payloads' not in data:
+            return jsonify({'error': 'Missing payloads field'}), 400
 
-        for task in combined_result:
-            formatted_result.append({
-                'task': task['task'],
-                'start': task['start'].strftime("%H:%M"),
-                'end': task['end'].strftime("%H:%M")
-            })
+        payloads = data['payloads']
 
-        print(formatted_result, "is the formatted result")
+        if not isinstance(payloads, list):
+            return jsonify({'error': 'payloads must be a list'}), 400
 
-            
-        return jsonify({
-            'schedule': formatted_result,
-            'obligations': [{
-                'task': obl['task'],
-                'start': obl['start'].strftime("%H:%M"),
-                'end': obl['end'].strftime("%H:%M")
-            } for obl in obligations],  # Use original obligations here, not split ones
-            'found_schedule': result['found_schedule'],
-            'preference_respected': result['preference_respected'],
-            'alternative_scheduler_used': interval_scheduler_used
-        })
+        if len(payloads) > SCHEDULE_BATCH_MAX_SIZE:
+            return jsonify({'error': f'At most {SCHEDULE_BATCH_MAX_SIZE} payloads can be sent at once'}), 400
+
+        # Payloads are solved in parallel by the solver processes, a failing payload only fails its own item
+        results = solve_schedule_batch(
+            payloads,
+            default_algo=data.get('algo'),
+            max_workers=SCHEDULE_BATCH_WORKERS,
+            node_budget=SOLVER_NODE_BUDGET or None,
+            search_time=SOLVER_SEARCH_TIME or None
+        )
+
+        return jsonify({'results': results})
+
+    except Exception as e:
+        if DEV:
+            raise ValueError(f"Server error: {str(e)}")
+        else:
+            return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/schedule/<algo>', methods=['POST'])
+def schedule(algo):
+    try:
+        data = request.json
+
+        print(data, "is the data")
+
+        if algo not in SCHEDULERS:
+            if DEV:
+                raise ValueError(f"Invalid algorithm: {algo}")
+            else:
+                return jsonify({'error': f'Invalid algorithm: {algo}'}), 400
+
+        # The solver runs in a separate process so a hard instance cannot hold this thread and the GIL
+        return jsonify(solve_schedule(
+            algo,
+            data,
+            time_budget=SOLVER_TIME_BUDGET or None,
+            solver_workers=SOLVER_WORKERS,
+            node_budget=SOLVER_NODE_BUDGET or None,
+            search_time=SOLVER_SEARCH_TIME or None
+        ))
         
     except KeyError as e:
         if DEV:
@@ -181,5 +199,27 @@ def schedule(algo):
         else:
             return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+def start_background_tasks():
+    """Warm up the model and watch MODEL_DIR for new runs in background threads."""
+    if WARM_UP_ON_STARTUP:
+        start_warm_up()
+
+    if MODEL_WATCH_INTERVAL > 0:
+        start_model_watcher()
+
+def is_serving_process():
+    """
+    Whether this process serves the app. Solver processes spawned by the pools import this module again
+    as __mp_main__, and with the debug reloader of app.run the parent process only watches the files.
+    """
+    if __name__ == '__mp_main__':
+        return False
+
+    return os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not (DEV and __name__ == '__main__')
+
+# Started when the app is set up so that gunicorn and flask run get them too
+if is_serving_process():
+    start_background_tasks()
+
 if __name__ == '__main__':
     app.run(debug=DEV)
\ No newline at end of file
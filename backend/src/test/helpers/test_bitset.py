@@ -0,0 +1,30 @@
+from src.core.bitset import (
+    placement_mask,
+    get_placement_masks,
+    to_array,
+    to_values,
+    prune_array
+)
+
+def test_masks():
+    assert placement_mask(2, 5) == 0b11100
+    assert placement_mask(0, 1) | placement_mask(3, 4) == 0b1001
+
+    # Touching placements do not overlap
+    assert not placement_mask(480, 540) & placement_mask(540, 600)
+    assert placement_mask(480, 541) & placement_mask(540, 600)
+
+def test_pruning_representations_agree():
+    domain = [(start, start + 60) for start in range(480, 1200, 30)]
+    masks = get_placement_masks({"Task": domain})
+
+    # The bitset solvers keep the placements whose mask does not overlap the occupied minutes
+    occupied = placement_mask(600, 690)
+    pruned = [value for value in domain if not masks[value] & occupied]
+    pruned_array = prune_array(to_array(domain), 600, 690)
+
+    assert pruned == to_values(pruned_array)
+    assert all(end <= 600 or start >= 690 for start, end in pruned)
+    assert (540, 600) in pruned and (570, 630) not in pruned
+
+    assert to_values(prune_array(to_array([]), 0, 10)) == []
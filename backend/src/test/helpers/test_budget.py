@@ -0,0 +1,47 @@
+import pytest
+
+from datetime import time
+
+from src.core.budget import BudgetExhausted, SearchBudget
+from src.core.minutes import to_minutes
+from src.schedulers.ac3 import ac3_schedule
+from src.schedulers.forward_checking import forward_checking_schedule
+
+def test_node_budget():
+    budget = SearchBudget(max_nodes=3)
+    for _ in range(3):
+        budget.spend()
+
+    with pytest.raises(BudgetExhausted):
+        budget.spend()
+    assert budget.exhausted
+
+    # An exhausted budget stays exhausted
+    with pytest.raises(BudgetExhausted):
+        budget.spend()
+
+    budget.keep_best([{"task": "A"}, {"task": "B"}])
+    budget.keep_best([{"task": "C"}])
+    assert [task["task"] for task in budget.best] == ["A", "B"]
+
+def test_time_budget():
+    budget = SearchBudget(time_limit=0)
+    with pytest.raises(BudgetExhausted):
+        while True:
+            budget.spend()
+    assert budget.nodes <= 32
+
+@pytest.mark.parametrize("schedule", [ac3_schedule, forward_checking_schedule])
+def test_solvers_return_partial_schedule(schedule):
+    # The tasks fill both free slots exactly but cannot be packed in them
+    obligations = [{"task": "Break", "start": time(10), "end": time(10, 30)}]
+    tasks = [{"task": "Long", "duration": 90}] + [{"task": f"Task {i}", "duration": 50} for i in range(3)]
+
+    result = schedule(time(8), time(12, 30), obligations, tasks, budget=SearchBudget(max_nodes=5))
+
+    assert result["budget_exhausted"] is True
+    assert result["found_schedule"] is False
+    assert result["tasks"]
+
+    slots = sorted((to_minutes(task["start"]), to_minutes(task["end"])) for task in result["tasks"])
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(slots, slots[1:]))
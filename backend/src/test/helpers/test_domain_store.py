@@ -0,0 +1,35 @@
+from src.core.domain_store import DomainStore
+
+def test_remove_overlapping_and_restore():
+    domain = [(start, start + 60) for start in range(480, 720, 30)]
+    store = DomainStore({"Task": domain, "Other": [(600, 630)]})
+
+    checkpoint = store.checkpoint()
+    assert store.remove_overlapping("Task", 600, 630)
+    assert store.get_values("Task") == [(480, 540), (510, 570), (540, 600), (630, 690), (660, 720), (690, 750)]
+
+    # Nothing left to remove in the same range
+    assert not store.remove_overlapping("Task", 600, 630)
+
+    store.assign("Other", (600, 630))
+    store.remove_range("Task", 0, 2)
+    assert store.get_values("Task") == [(540, 600), (630, 690), (660, 720), (690, 750)]
+
+    store.restore(checkpoint)
+    assert store.get_values("Task") == domain
+    assert store.get_values("Other") == [(600, 630)]
+    assert store.checkpoint() == checkpoint
+
+def test_domains_are_sorted_and_never_modified_in_place():
+    domain = [(600, 660), (480, 540)]
+    store = DomainStore({"Task": domain})
+
+    assert store.get_values("Task") == [(480, 540), (600, 660)]
+    store.remove_overlapping("Task", 500, 510)
+    assert store.size("Task") == 1
+    assert domain == [(600, 660), (480, 540)]
+
+    assert not store.remove_overlapping("Task", 660, 700)
+    store.remove_overlapping("Task", 0, 1439)
+    assert store.size("Task") == 0
+    assert not store.remove_overlapping("Task", 0, 1439)
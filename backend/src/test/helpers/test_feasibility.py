@@ -0,0 +1,50 @@
+import pytest
+
+from datetime import time
+
+from src.core.feasibility import bounds_hold, get_infeasible_tasks
+from src.core.minutes import Slot
+from src.schedulers.ac3 import ac3_schedule
+from src.schedulers.backtracking import backtracking_slot_placement
+from src.schedulers.forward_checking import forward_checking_schedule
+
+def test_capacity_bound():
+    assert bounds_hold([120, 60], [90, 60])
+    assert not bounds_hold([120, 60], [90, 60, 60])
+    assert not bounds_hold([120, 60], [90, 60, 60], allow_split=True)
+
+def test_packing_bound():
+    # Three one hour tasks fit in 180 free minutes but only two of them in two 90 minute slots
+    assert not bounds_hold([90, 90], [60, 60, 60])
+    assert bounds_hold([90, 90], [60, 60, 60], allow_split=True)
+    assert bounds_hold([120, 90], [60, 60, 60])
+
+def test_infeasible_tasks_longer_than_every_slot():
+    slots = [Slot(480, 540), Slot(600, 660)]
+    tasks = [{"task": "Short", "duration": 30}, {"task": "Long", "duration": 90}]
+
+    assert get_infeasible_tasks(slots, tasks) == ["Long"]
+    assert get_infeasible_tasks(slots, tasks, allow_split=True) == []
+
+def test_infeasible_tasks_keep_request_order():
+    slots = [Slot(480, 570)]
+    tasks = [
+        {"task": "A", "duration": 30},
+        {"task": "B", "duration": 60},
+        {"task": "C", "duration": 45},
+        {"task": "D", "duration": 30}
+    ]
+
+    # The longest tasks are dropped until the rest fits
+    assert get_infeasible_tasks(slots, tasks) == ["B", "C"]
+    assert get_infeasible_tasks(slots, tasks[:1]) == []
+
+@pytest.mark.parametrize("schedule", [ac3_schedule, forward_checking_schedule, backtracking_slot_placement])
+def test_solvers_report_infeasible_tasks(schedule):
+    obligations = [{"task": "Lunch", "start": time(10, 30), "end": time(11)}]
+    tasks = [{"task": f"Task {i}", "duration": 60} for i in range(3)]
+
+    result = schedule(time(9), time(12), obligations, tasks)
+
+    assert result["found_schedule"] is False
+    assert result["infeasible_tasks"] == ["Task 0"]
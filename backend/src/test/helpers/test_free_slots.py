@@ -0,0 +1,101 @@
+import random
+
+from src.core.free_slots import FreeSlotIndex, GapIndex
+
+def carve_naive(slots, start, end):
+    free = set()
+    for slot_start, slot_end in slots:
+        free.update(range(slot_start, slot_end))
+    free.difference_update(range(start, end))
+
+    # Rebuild the slots from the free minutes
+    result = []
+    for minute in sorted(free):
+        if result and result[-1][1] == minute:
+            result[-1][1] = minute + 1
+        else:
+            result.append([minute, minute + 1])
+    return [tuple(slot) for slot in result]
+
+def test_carve():
+    index = FreeSlotIndex.from_day(8 * 60, 22 * 60)
+    assert list(index) == [(480, 1320)]
+
+    index.carve(600, 660)
+    index.carve(720, 780)
+    assert list(index) == [(480, 600), (660, 720), (780, 1320)]
+
+    # Busy intervals touching or covering several slots
+    index.carve(700, 800)
+    assert list(index) == [(480, 600), (660, 700), (800, 1320)]
+
+    index.carve(400, 480)
+    index.carve(1320, 1400)
+    index.carve(500, 500)
+    assert list(index) == [(480, 600), (660, 700), (800, 1320)]
+
+def test_carve_matches_naive():
+    rng = random.Random(0)
+
+    for _ in range(200):
+        index = FreeSlotIndex([(0, 1439)])
+        expected = [(0, 1439)]
+
+        for _ in range(rng.randint(1, 30)):
+            start = rng.randrange(0, 1439)
+            end = start + rng.randint(1, 120)
+            index.carve(start, end)
+            expected = carve_naive(expected, start, end)
+
+        assert list(index) == expected
+
+def test_queries():
+    index = FreeSlotIndex([(480, 600), (660, 700), (800, 1320)])
+
+    assert index.first_fit(60) == 480
+    assert index.first_fit(60, after=560) == 800
+    assert index.first_fit(30, after=560) == 560
+    assert index.first_fit(40, after=650) == 660
+    assert index.first_fit(600) is None
+
+    assert index.largest_gap() == (800, 1320)
+    assert index.free_minutes() == 120 + 40 + 520
+    assert FreeSlotIndex().largest_gap() is None
+
+def test_gap_index_queries():
+    index = GapIndex([(480, 600), (660, 700), (800, 1320)])
+
+    assert index.first_fit(60) == 480
+    assert index.first_fit(60, after=560) == 800
+    assert index.first_fit(30, after=560) == 560
+    assert index.first_fit(600) is None
+
+    # The shortest slot the task fits in, the earliest of the shortest
+    assert index.best_fit(40) == 660
+    assert index.best_fit(100) == 480
+    assert index.best_fit(200) == 800
+    assert index.best_fit(600) is None
+
+    assert index.largest_gap() == (800, 1320)
+    assert index.slot_at(690) == (660, 700)
+    assert index.slot_at(750) is None
+
+def test_gap_index_matches_free_slot_index():
+    rng = random.Random(0)
+
+    for _ in range(100):
+        gaps = GapIndex([(0, 1439)])
+        index = FreeSlotIndex([(0, 1439)])
+
+        for _ in range(rng.randint(1, 30)):
+            start = rng.randrange(0, 1439)
+            end = start + rng.randint(1, 120)
+            gaps.carve(start, end)
+            index.carve(start, end)
+
+            assert list(gaps) == list(index)
+            assert gaps.by_size == sorted((end - start, start) for start, end in index)
+
+            duration = rng.randint(1, 200)
+            after = rng.randrange(0, 1440)
+            assert gaps.first_fit(duration, after) == index.first_fit(duration, after)
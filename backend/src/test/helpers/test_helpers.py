@@ -10,6 +10,7 @@ from src.core.helpers import (
     add_indexes_to_training_instance,
     add_indexes_to_training_corpus,
     normalize_matrices,
+    save_matrices,
     find_and_replace_time,
     get_available_slots
 )
@@ -21,7 +22,10 @@ from src.config import STATES
 from src.config import ACTIONS, DURATIONS, PREFERENCES, SENTENCES
 
 from src.hmms.training.templates import TrainingInstance
+from src.core import helpers
+from src.hmms import artifacts
 
+import os
 import torch
 
 def test_get_state_sequence():
@@ -352,6 +356,27 @@ def test_get_available_slots_adjacent_slots():
     
     assert get_available_slots(timeline) == expected
 
+def test_save_matrices_numbers_runs_after_the_highest(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(artifacts, "MODEL_DIR", str(tmp_path))
+
+    # run2 was deleted and a crashed save left its temporary folder behind
+    (tmp_path / "run1").mkdir()
+    (tmp_path / "run3").mkdir()
+    (tmp_path / ".run4.tmp").mkdir()
+    (tmp_path / ".run4.tmp" / "stale.json").write_text("[]")
+
+    run_dir = save_matrices(torch.ones(2, 2), torch.ones(3, 2))
+
+    assert run_dir == str(tmp_path / "run4")
+    assert sorted(os.listdir(run_dir)) == ["emission.bin", "state_priors.bin", "transition.bin"]
+
+    # The indexes are saved with the matrices of the run
+    run_dir = save_matrices(torch.ones(2, 2), torch.ones(3, 2), word_index_dict={"read": 0}, state_index_dict={"O": 0})
+
+    assert run_dir == str(tmp_path / "run5")
+    assert artifacts.load_indexes(5)[:2] == ({"read": 0}, {"O": 0})
+
 
 def run_all_tests():
     # test_get_state_sequence()
@@ -0,0 +1,61 @@
+import pytest
+
+from src.core.domain_store import DomainStore
+from src.core.heuristics import VariableOrder, get_demand, order_values
+from src.schedulers.forward_checking import run_forward_checking
+
+def test_variable_order_follows_domain_changes():
+    tasks = [
+        {"task": "A", "duration": 60},
+        {"task": "B", "duration": 60, "preference": "evening"},
+        {"task": "C", "duration": 60},
+    ]
+    store = DomainStore({
+        "A": [(480, 540), (540, 600)],
+        "B": [(1080, 1140), (1140, 1200), (1200, 1260)],
+        "C": [(600, 660)],
+    })
+    order = VariableOrder(tasks, store)
+
+    # Tasks with a preference come first whatever their domain size
+    assert order.select(set()) == "B"
+    assert order.select({"B"}) == "C"
+
+    checkpoint = store.checkpoint()
+    store.remove_overlapping("A", 480, 540)
+    assert order.select({"B"}) == "A"
+
+    # Ties go to the task listed first
+    store.restore(checkpoint)
+    store.remove_overlapping("A", 480, 540)
+    store.remove_range("C", 0, 1)
+    store.restore(checkpoint)
+    assert order.select({"B"}) == "C"
+    assert order.select({"A", "B", "C"}) is None
+
+def test_order_values():
+    values = [(360, 420), (480, 540), (840, 900), (1080, 1140)]
+
+    assert order_values(values, None) == values
+    assert order_values(values, "Afternoon") == [(840, 900), (360, 420), (480, 540), (1080, 1140)]
+
+    # (480, 540) overlaps both values of the other task, (360, 420) only one
+    demand = get_demand([[(330, 390), (450, 510)]])
+    assert demand[420] - demand[360] == 30
+    assert order_values(values[:2], None, demand) == [(360, 420), (480, 540)]
+
+def test_least_constraining_values():
+    domains = {
+        "A": [(start, start + 60) for start in range(480, 1200, 30)],
+        "B": [(start, start + 120) for start in range(480, 1200, 30)],
+    }
+    tasks = [{"task": "A", "duration": 60}, {"task": "B", "duration": 120}]
+    constraints = {"A": {"B"}, "B": {"A"}}
+
+    result = run_forward_checking(domains, constraints, tasks, value_ordering="lcv")
+    assert len(result) == 2
+    first, second = sorted(result, key=lambda task: task["start"])
+    assert first["end"] <= second["start"]
+
+    with pytest.raises(ValueError):
+        run_forward_checking(domains, constraints, tasks, value_ordering="random")
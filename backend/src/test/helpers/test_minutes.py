@@ -0,0 +1,73 @@
+from datetime import time
+
+from src.core.minutes import (
+    Slot,
+    to_minutes,
+    from_minutes,
+    get_minute_preference,
+    get_sleep_periods,
+    get_slot_domain,
+    generate_domains,
+    filter_by_preference,
+    get_preference_domains
+)
+from src.core.periods import compile_periods
+from src.core.free_slots import get_free_slots
+from src.core.timeline import adjust_wakeup_and_sleep, get_available_slots
+
+def test_minute_conversion():
+    assert to_minutes(time(8, 30)) == 510
+    assert from_minutes(510) == time(8, 30)
+    assert from_minutes(24 * 60 + 15) == time(0, 15)
+    assert get_minute_preference(to_minutes(time(9))) == "morning"
+    assert get_minute_preference(to_minutes(time(23, 30))) == "night"
+
+def test_sleep_periods_match_time_version():
+    for wake_up, sleep in [(8, 22), (22, 8), (0, 22), (8, 0), (7, 7), (0, 0)]:
+        periods = adjust_wakeup_and_sleep(time(wake_up), time(sleep))
+        expected = [(to_minutes(period["start"]), to_minutes(period["end"])) for period in periods]
+        assert get_sleep_periods(wake_up * 60, sleep * 60) == expected
+
+def test_free_slots():
+    obligations = [
+        {"task": "Meeting", "start": time(10), "end": time(11)},
+        {"task": "Lunch", "start": time(12), "end": time(13)}
+    ]
+
+    assert get_free_slots(time(8), time(22), obligations) == [
+        Slot(480, 600), Slot(660, 720), Slot(780, 1320)
+    ]
+
+    # The same slots as the time based helpers
+    timeline = get_available_slots(adjust_wakeup_and_sleep(time(8), time(22)))
+    assert get_free_slots(time(8), time(22), []) == [
+        Slot(to_minutes(slot["start"]), to_minutes(slot["end"])) for slot in timeline
+    ]
+
+    # Obligations crossing midnight are split
+    assert get_free_slots(time(6), time(0), [{"task": "Shift", "start": time(22), "end": time(7)}]) == [
+        Slot(420, 1320)
+    ]
+
+def test_domains():
+    slots = [Slot(480, 600), Slot(660, 720)]
+
+    assert get_slot_domain(slots, 60) == [(480, 540), (510, 570), (540, 600), (660, 720)]
+
+    tasks = [
+        {"task": "Read", "duration": 60, "preference": "afternoon"},
+        {"task": "Run", "duration": 60}
+    ]
+    domains = generate_domains(slots + [Slot(780, 840)], tasks)
+    preference_domains = get_preference_domains(domains, tasks)
+
+    assert preference_domains["Read"] == [(780, 840)]
+    assert preference_domains["Run"] == domains["Run"]
+
+def test_filter_by_preference_periods():
+    domain = get_slot_domain([Slot(300, 720)], 30, step=30)
+    periods = compile_periods([("early morning", 330, 480)])
+
+    assert filter_by_preference(domain, "Early morning", periods) == [(start, start + 30) for start in range(330, 480, 30)]
+    assert filter_by_preference(domain, "morning", periods) == [(300, 330)] + [(start, start + 30) for start in range(480, 720, 30)]
+    assert filter_by_preference(domain, "morning") == domain
@@ -0,0 +1,46 @@
+from src.core.numbers import iter_numbers, match_number
+from src.core.preprocessing import find_and_replace_time, preprocess_inference_sentence
+
+def get_phrases(sentence):
+    words = sentence.split()
+    return [(" ".join(words[start:end]), value) for start, end, value in iter_numbers(words)]
+
+def test_match_number():
+    assert match_number(["five"], 0) == (1, 5)
+    assert match_number(["twenty-nine"], 0) == (1, 29)
+    assert match_number("one hundred twenty five".split(), 0) == (4, 125)
+    assert match_number("two thousand and forty nine".split(), 0) == (5, 2049)
+    assert match_number("nineteen hundred".split(), 0) == (2, 1900)
+    assert match_number(["hours"], 0) == (0, 0)
+
+def test_match_number_without_leading_unit():
+    assert match_number(["hundred"], 0) == (1, 100)
+    assert match_number("a hundred and five".split(), 0) == (4, 105)
+    assert match_number("a thousand".split(), 0) == (2, 1000)
+    assert match_number(["a"], 0) == (0, 0)
+    assert get_phrases("gym for a hundred minutes") == [("gym", None), ("for", None), ("a hundred", 100), ("minutes", None)]
+    assert find_and_replace_time("read for hundred minutes", get_placeholder=False) == "read for 100 minutes"
+
+def test_iter_numbers_splits_phrases():
+    assert get_phrases("Run for Twenty Three minutes") == [
+        ("Run", None), ("for", None), ("Twenty Three", 23), ("minutes", None)
+    ]
+
+    # "seven thirty" is not a single number so it stays two phrases
+    assert get_phrases("wake up at seven thirty") == [
+        ("wake", None), ("up", None), ("at", None), ("seven", 7), ("thirty", 30)
+    ]
+
+    # A trailing "and" is not part of the number
+    assert get_phrases("one hundred and") == [("one hundred", 100), ("and", None)]
+    assert get_phrases("zero five 10") == [("zero", 0), ("five", 5), ("10", 10)]
+    assert get_phrases("a check-in at one-ish") == [("a", None), ("check-in", None), ("at", None), ("one-ish", None)]
+
+    # Digits that are not decimal, like superscripts, are ordinary words
+    assert get_phrases("study for 2² hours") == [("study", None), ("for", None), ("2²", None), ("hours", None)]
+
+def test_find_and_replace_number_phrases():
+    assert find_and_replace_time("read for one hundred twenty five minutes") == "read for <time> minutes"
+    assert find_and_replace_time("read for one hundred twenty five minutes", get_placeholder=False) == "read for 125 minutes"
+    assert find_and_replace_time("sleep at twenty-nine 05", get_placeholder=False) == "sleep at 29 05"
+    assert preprocess_inference_sentence("study for 2² hours") == "study for 2² hours"
@@ -0,0 +1,31 @@
+import pytest
+
+from src.core.periods import DEFAULT_PERIODS, MINUTES_PER_DAY, compile_periods
+
+def test_default_periods():
+    assert len(DEFAULT_PERIODS.by_minute) == MINUTES_PER_DAY
+    assert DEFAULT_PERIODS.by_minute[4 * 60 + 59] == "night"
+    assert DEFAULT_PERIODS.by_minute[5 * 60] == "morning"
+    assert DEFAULT_PERIODS.by_minute[16 * 60 + 59] == "afternoon"
+    assert DEFAULT_PERIODS.by_minute[20 * 60] == "evening"
+
+    assert DEFAULT_PERIODS.get_ranges("Night") == [(0, 300), (1260, 1440)]
+    assert DEFAULT_PERIODS.get_ranges("afternoon") == [(720, 1020)]
+    assert DEFAULT_PERIODS.get_ranges("brunch") == []
+
+def test_compile_periods():
+    assert compile_periods() is DEFAULT_PERIODS
+
+    periods = compile_periods([("Early morning", 330, 480), ("Late", 1410, 30)])
+
+    # The periods of the request are laid over the default ones, a period can wrap around midnight
+    assert periods.get_ranges("early morning") == [(330, 480)]
+    assert periods.get_ranges("morning") == [(300, 330), (480, 720)]
+    assert periods.get_ranges("late") == [(0, 30), (1410, 1440)]
+    assert periods.get_ranges("night") == [(30, 300), (1260, 1410)]
+
+    # Later periods win where they overlap
+    assert compile_periods([("a", 600, 700), ("b", 650, 750)]).get_ranges("a") == [(600, 650)]
+
+    with pytest.raises(ValueError):
+        compile_periods([("Empty", 600, 600)])
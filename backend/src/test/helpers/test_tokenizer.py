@@ -0,0 +1,30 @@
+from src.core.tokenizer import tokenize, join_tokens
+from src.core.preprocessing import preprocess_inference_sentence, remove_special_characters
+
+def test_tokenize_offsets_and_numbers():
+    sentence = "Go to the Gym for Twenty-Nine hours, (five) 05"
+    tokens = tokenize(sentence)
+
+    assert [token.norm for token in tokens] == ["go", "to", "the", "gym", "for", "<time>", "hours", "<time>", "<time>"]
+    assert [token.value for token in tokens][5:] == [29, None, 5, 5]
+    assert [token.number for token in tokens][5:] == ["29", None, "5", "05"]
+
+    # Spans point at the original text without the surrounding punctuation
+    for token in tokens:
+        assert sentence[token.start:token.end] == token.text
+    assert [token.text for token in tokens][5:] == ["Twenty-Nine", "hours", "five", "05"]
+
+def test_tokenize_multi_word_numbers():
+    tokens = tokenize("Read for one hundred twenty five minutes")
+
+    assert join_tokens(tokens) == "read for <time> minutes"
+    assert tokens[2].text == "one hundred twenty five"
+    assert tokens[2].value == 125
+
+def test_tokenize_drops_empty_words():
+    assert join_tokens(tokenize(" - check-in don't ... ")) == "checkin dont"
+    assert tokenize("") == []
+
+def test_preprocess_inference_sentence():
+    assert preprocess_inference_sentence("I want to Go to the GYM for 2 hours!") == "i want to go to the gym for <time> hours"
+    assert remove_special_characters("a-b, c<d>", omitted_characters=["<", ">"]) == "ab c<d>"
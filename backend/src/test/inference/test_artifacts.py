@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.hmms import artifacts
+from src.hmms.artifacts import read_array, write_array, save_matrix_arrays, load_matrix_arrays, save_index_dicts, load_indexes
+
+def create_matrices():
+    rng = np.random.default_rng(0)
+    transition_matrix = rng.random((5, 5), dtype=np.float32)
+    emission_matrix = rng.random((12, 5), dtype=np.float32)
+    state_priors = np.array([0.8, 0.05, 0.05, 0.05, 0.05], dtype=np.float32)
+    return transition_matrix, emission_matrix, state_priors
+
+def test_array_roundtrip(tmp_path):
+    _, emission_matrix, _ = create_matrices()
+    path = str(tmp_path / "emission.bin")
+
+    write_array(path, emission_matrix)
+
+    mapped = read_array(path)
+    assert isinstance(mapped, np.memmap)
+    assert mapped.dtype == np.float32
+    assert np.array_equal(mapped, emission_matrix)
+
+    in_memory = read_array(path, mmap_mode=None)
+    assert not isinstance(in_memory, np.memmap)
+    assert np.array_equal(in_memory, emission_matrix)
+
+def test_array_file_layout(tmp_path):
+    path = str(tmp_path / "priors.bin")
+    write_array(path, np.array([0.5, 0.25, 0.25]))
+
+    assert os.path.getsize(path) == artifacts.ARRAY_HEADER_SIZE + 3 * 4
+
+def test_read_array_rejects_other_files(tmp_path):
+    path = str(tmp_path / "transition.json")
+    with open(path, "w") as f:
+        json.dump([[1.0]], f)
+
+    with pytest.raises(ValueError):
+        read_array(path)
+
+def test_load_binary_and_json_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "MODEL_DIR", str(tmp_path))
+    transition_matrix, emission_matrix, state_priors = create_matrices()
+
+    # A run saved in the binary format with the JSON export enabled
+    binary_run = tmp_path / "run1"
+    binary_run.mkdir()
+    save_matrix_arrays(str(binary_run), transition_matrix, emission_matrix, state_priors, export_json=True)
+    assert (binary_run / "emission.bin").exists()
+    assert (binary_run / "emission.json").exists()
+
+    # A run saved before the binary format existed
+    json_run = tmp_path / "run2"
+    json_run.mkdir()
+    for name, matrix in zip(["transition", "emission", "state_priors"], [transition_matrix, emission_matrix, state_priors]):
+        with open(json_run / f"{name}.json", "w") as f:
+            json.dump(matrix.tolist(), f)
+
+    for run_number in [1, 2]:
+        loaded = load_matrix_arrays(run_number)
+        for expected, actual in zip([transition_matrix, emission_matrix, state_priors], loaded):
+            assert actual.dtype == np.float32
+            assert np.array_equal(actual, expected)
+
+def test_load_indexes_of_a_run(tmp_path, monkeypatch):
+    indexes_dir = tmp_path / "indexes"
+    indexes_dir.mkdir()
+    monkeypatch.setattr(artifacts, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(artifacts, "INDEXES_DIR", str(indexes_dir))
+    transition_matrix, emission_matrix, state_priors = create_matrices()
+
+    # A run saved before the indexes were kept with the matrices, and a run saved with its own indexes
+    for run_number in [1, 2]:
+        run_dir = tmp_path / f"run{run_number}"
+        run_dir.mkdir()
+        save_matrix_arrays(str(run_dir), transition_matrix, emission_matrix, state_priors)
+
+    save_index_dicts(str(indexes_dir), {"old": 0}, {"O": 0})
+    save_index_dicts(str(tmp_path / "run2"), {"new": 0}, {"N": 0})
+
+    assert load_indexes(1) == ({"old": 0}, {"O": 0}, {0: "old"}, {0: "O"})
+    assert load_indexes(2) == ({"new": 0}, {"N": 0}, {0: "new"}, {0: "N"})
+    assert load_indexes() == load_indexes(2)
@@ -0,0 +1,186 @@
+import threading
+
+import pytest
+
+from src.hmms.inference import infer as infer_module
+from src.hmms.inference import manager as manager_module
+from src.hmms.inference.manager import ModelManager
+from src.hmms.inference.cache import LRUCache
+
+class StubModel:
+    def __init__(self):
+        self.decoded = []
+
+    def get_most_likely_state_sequence(self, sentence):
+        self.decoded.append(sentence)
+        words = sentence.split()
+        return {
+            "state_sequence": ["O"] * len(words),
+            "word_indices": [0] * len(words),
+            "state_sequence_with_words": [["O", word] for word in words]
+        }
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    model = StubModel()
+    loads = []
+
+    def load_model():
+        loads.append(1)
+        return model
+
+    monkeypatch.setattr(manager_module, "get_latest_run_number", lambda: 1)
+    monkeypatch.setattr(infer_module, "load_model", lambda run_number=None: load_model())
+    monkeypatch.setattr(infer_module, "model_manager", ModelManager(lambda run_number: infer_module.load_model(run_number)))
+    monkeypatch.setattr(infer_module, "inference_cache", LRUCache(max_size=8))
+    monkeypatch.setattr(infer_module, "model_ready", False)
+    monkeypatch.setattr(infer_module, "warm_up_error", None)
+
+    return model, loads
+
+def test_model_is_loaded_lazily(stub_model):
+    model, loads = stub_model
+
+    assert loads == []
+    assert not infer_module.is_ready()
+
+    infer_module.infer("read a book")
+    infer_module.infer("read a book")
+
+    assert loads == [1]
+
+def test_first_request_sets_ready(stub_model):
+    assert not infer_module.is_ready()
+
+    infer_module.infer("read a book")
+
+    assert infer_module.is_ready()
+
+def test_warm_up_sets_ready(stub_model):
+    model, loads = stub_model
+
+    infer_module.start_warm_up().join()
+
+    assert infer_module.is_ready()
+    assert loads == [1]
+    assert len(model.decoded) == 1
+
+def test_warm_up_failure_is_reported(monkeypatch, stub_model):
+    def load_model():
+        raise ValueError("No model runs found")
+
+    monkeypatch.setattr(infer_module, "load_model", lambda run_number=None: load_model())
+
+    infer_module.start_warm_up().join()
+
+    assert not infer_module.is_ready()
+    assert infer_module.get_warm_up_error() == "No model runs found"
+
+def test_infer_uses_cache_and_fills_numbers(stub_model):
+    model, loads = stub_model
+
+    first = infer_module.infer("Gym for 1 hours in the morning")
+    second = infer_module.infer("gym for 2 hours in the morning!")
+
+    # Both sentences normalize to the same text, so the second one is served from the cache
+    assert model.decoded == ["gym for <time> hours in the morning"]
+    assert first["state_sequence_with_words"][2] == ["O", "1"]
+    assert second["state_sequence_with_words"][2] == ["O", "2"]
+    assert second["original_words"][0] == "gym"
+    assert first["original_words"][0] == "Gym"
+    assert first["word_spans"][2] == [8, 9]
+    assert infer_module.get_cache_stats()["hits"] == 1
+    assert infer_module.get_cache_stats()["misses"] == 1
+
+def test_result_decoded_during_swap_is_not_served_by_new_model(stub_model):
+    model, loads = stub_model
+    new_model = StubModel()
+
+    # The new run is swapped in while the old model decodes
+    decode = model.get_most_likely_state_sequence
+    def decode_and_swap(sentence):
+        infer_module.model_manager.swap(new_model, 2)
+        return decode(sentence)
+    model.get_most_likely_state_sequence = decode_and_swap
+
+    infer_module.infer("read a book")
+    infer_module.infer("read a book")
+
+    assert model.decoded == ["read a book"]
+    assert new_model.decoded == ["read a book"]
+
+def test_cache_eviction_and_ttl(monkeypatch):
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    # b was the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    now = [100.0]
+    monkeypatch.setattr("src.hmms.inference.cache.time.monotonic", lambda: now[0])
+
+    cache = LRUCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+def test_manager_swaps_in_newer_runs(monkeypatch):
+    latest_run = [1]
+    monkeypatch.setattr(manager_module, "get_latest_run_number", lambda: latest_run[0])
+
+    swaps = []
+    manager = ModelManager(lambda run_number: f"model{run_number}")
+    manager.add_swap_listener(lambda model, run_number: swaps.append(run_number))
+
+    assert manager.get_model() == "model1"
+    assert manager.check_for_new_run() is False
+
+    # A request holding the old model keeps it while the new run is swapped in
+    in_flight_model = manager.get_model()
+    latest_run[0] = 2
+
+    assert manager.check_for_new_run() is True
+    assert manager.get_model() == "model2"
+    assert in_flight_model == "model1"
+    assert swaps == [1, 2]
+
+def test_manager_keeps_old_model_when_loading_fails(monkeypatch):
+    latest_run = [1]
+    monkeypatch.setattr(manager_module, "get_latest_run_number", lambda: latest_run[0])
+
+    def loader(run_number):
+        if run_number == 2:
+            raise ValueError("Broken run")
+        return f"model{run_number}"
+
+    manager = ModelManager(loader)
+    manager.get_model()
+
+    latest_run[0] = 2
+    with pytest.raises(ValueError):
+        manager.check_for_new_run()
+
+    assert manager.get_model() == "model1"
+    assert manager.run_number == 1
+
+def test_manager_watcher(monkeypatch):
+    latest_run = [1]
+    monkeypatch.setattr(manager_module, "get_latest_run_number", lambda: latest_run[0])
+
+    swapped = threading.Event()
+    manager = ModelManager(lambda run_number: f"model{run_number}", poll_interval=0.01)
+    manager.get_model()
+    manager.add_swap_listener(lambda model, run_number: swapped.set())
+
+    manager.start_watching()
+    latest_run[0] = 3
+
+    assert swapped.wait(2)
+    manager.stop_watching()
+    assert manager.get_model() == "model3"
@@ -123,6 +123,41 @@ class TestInferenceRoute(unittest.TestCase):
             self.assertIsInstance(state, str)
             self.assertIsInstance(word, str)
 
+    def test_batch_inference_endpoint(self):
+        """Test the /infer/batch endpoint returns one result per text in order"""
+        texts = [test_case["input"] for test_case in self.test_cases]
+
+        response = requests.post(
+            f"{self.base_url}/infer/batch",
+            json={"texts": texts},
+            headers={"Content-Type": "application/json"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), len(texts))
+
+        for text, result in zip(texts, results):
+            with self.subTest(input_text=text):
+                self.assertIn("parsed_info", result)
+                self.assertIn("raw_inference", result)
+
+                # Every item matches the response of the single endpoint
+                single = requests.post(
+                    f"{self.base_url}/infer",
+                    json={"text": text},
+                    headers={"Content-Type": "application/json"}
+                ).json()
+                self.assertEqual(result, single)
+
+        # Test missing texts field
+        response = requests.post(
+            f"{self.base_url}/infer/batch",
+            json={},
+            headers={"Content-Type": "application/json"}
+        )
+        self.assertEqual(response.status_code, 400)
+
 def run_tests():
     unittest.main()
 
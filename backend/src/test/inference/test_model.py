@@ -0,0 +1,143 @@
+import torch
+
+from src.hmms.model import Model
+from src.config import UNKNOWN_WORD
+
+STATE_LABELS = ["O", "A", "D", "P", "T"]
+
+WORDS = ["i", "want", "to", "play", "hockey", "for", "<time>", "hours", "in", "the", "morning", UNKNOWN_WORD]
+
+def create_model(seed=0):
+    """Create a small model with random column normalized matrices."""
+    generator = torch.Generator().manual_seed(seed)
+
+    num_states = len(STATE_LABELS)
+
+    transition_matrix = torch.rand((num_states, num_states), generator=generator)
+    emission_matrix = torch.rand((len(WORDS), num_states), generator=generator)
+
+    transition_matrix = transition_matrix / torch.sum(transition_matrix, dim=0, keepdim=True)
+    emission_matrix = emission_matrix / torch.sum(emission_matrix, dim=0, keepdim=True)
+    state_priors = torch.tensor([0.8, 0.05, 0.05, 0.05, 0.05])
+
+    word_index_dict = {word: index for index, word in enumerate(WORDS)}
+    state_index_dict = {state: index for index, state in enumerate(STATE_LABELS)}
+
+    return Model(
+        transition_matrix,
+        emission_matrix,
+        word_index_dict,
+        state_index_dict,
+        {v: k for k, v in word_index_dict.items()},
+        {v: k for k, v in state_index_dict.items()},
+        state_priors
+    )
+
+def reference_viterbi(model, sentence):
+    """Straightforward per state Viterbi used to check the vectorized implementation."""
+    word_indices = [model.word_index_dict.get(word, model.word_index_dict[UNKNOWN_WORD]) for word in sentence.split()]
+    num_states = len(model.state_index_dict)
+    T = len(word_indices)
+
+    viterbi = torch.zeros((T, num_states))
+    backpointer = torch.zeros((T, num_states), dtype=torch.long)
+    viterbi[0] = torch.log(model.state_priors) + torch.log(model.emission_matrix[word_indices[0]])
+
+    for t in range(1, T):
+        for s in range(num_states):
+            transition_probs = torch.log(model.transition_matrix[s, :]) + viterbi[t - 1]
+            max_prob, prev_state = torch.max(transition_probs, dim=0)
+            viterbi[t][s] = torch.log(model.emission_matrix[word_indices[t]][s]) + max_prob
+            backpointer[t][s] = prev_state
+
+    states = [int(torch.argmax(viterbi[-1]))]
+    for t in range(T - 1, 0, -1):
+        states.insert(0, int(backpointer[t][states[0]]))
+
+    return [model.reverse_state_index[state] for state in states]
+
+def test_viterbi_matches_reference():
+    sentences = [
+        "i want to play hockey for <time> hours in the morning",
+        "hockey",
+        "play unseen words for <time> hours",
+        "in the the the morning morning <time> <time>"
+    ]
+
+    for seed in range(5):
+        model = create_model(seed)
+        for sentence in sentences:
+            result = model.get_most_likely_state_sequence(sentence)
+            assert result["state_sequence"] == reference_viterbi(model, sentence)
+
+def test_viterbi_result_structure():
+    model = create_model()
+    result = model.get_most_likely_state_sequence("play hockey for <time> hours")
+
+    assert len(result["state_sequence"]) == 5
+    assert result["word_indices"] == [3, 4, 5, 6, 7]
+    assert [word for _, word in result["state_sequence_with_words"]] == ["play", "hockey", "for", "<time>", "hours"]
+
+def test_viterbi_unknown_words():
+    model = create_model()
+    result = model.get_most_likely_state_sequence("completely unseen")
+
+    unknown_index = model.word_index_dict[UNKNOWN_WORD]
+    assert result["word_indices"] == [unknown_index, unknown_index]
+
+def test_viterbi_empty_sentence():
+    model = create_model()
+    result = model.get_most_likely_state_sequence("")
+
+    assert result["state_sequence"] == []
+    assert result["state_sequence_with_words"] == []
+
+def test_decode_batch_matches_single_decoding():
+    model = create_model(3)
+    sentences = [
+        "i want to play hockey for <time> hours in the morning",
+        "hockey",
+        "",
+        "play unseen words for <time> hours",
+        "in the morning"
+    ]
+
+    results = model.decode_batch(sentences)
+
+    assert len(results) == len(sentences)
+    for sentence, result in zip(sentences, results):
+        assert result == model.get_most_likely_state_sequence(sentence)
+
+def test_decode_batch_empty():
+    model = create_model()
+
+    assert model.decode_batch([]) == []
+    assert model.decode_batch(["", ""]) == [model.get_most_likely_state_sequence("")] * 2
+
+def test_numpy_model_matches_torch_model():
+    from src.hmms.numpy_model import NumpyModel
+
+    sentences = [
+        "i want to play hockey for <time> hours in the morning",
+        "hockey",
+        "",
+        "play unseen words for <time> hours",
+        "in the the the morning morning <time> <time>"
+    ]
+
+    for seed in range(5):
+        model = create_model(seed)
+        numpy_model = NumpyModel(
+            model.transition_matrix.numpy(),
+            model.emission_matrix.numpy(),
+            model.word_index_dict,
+            model.state_index_dict,
+            model.reverse_word_index,
+            model.reverse_state_index,
+            model.state_priors.numpy()
+        )
+
+        for sentence in sentences:
+            assert numpy_model.get_most_likely_state_sequence(sentence) == model.get_most_likely_state_sequence(sentence)
+
+        assert numpy_model.decode_batch(sentences) == model.decode_batch(sentences)
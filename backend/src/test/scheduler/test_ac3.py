@@ -1,6 +1,8 @@
 import pytest
 from datetime import datetime, time
-from src.schedulers.ac3 import ac3_schedule, filter_domain_by_preference, is_consistent
+from src.schedulers.ac3 import ac3_schedule, filter_domain_by_preference, is_consistent, revise
+from src.core.domain_store import DomainStore
+from src.core.minutes import Slot, get_slot_domain, overlaps
 
 def create_time(hour, minute=0):
     return datetime.strptime(f"{hour:02d}:{minute:02d}", "%H:%M").time()
@@ -214,4 +216,19 @@ class TestAC3Scheduler:
         }
         result = ac3_schedule(**params)
         assert result is not None
-        assert len(result["tasks"]) == 3 
\ No newline at end of file
+        assert len(result["tasks"]) == 3
+
+    def test_revise_matches_pairwise_check(self):
+        """revise keeps exactly the values of x supported by a value of y."""
+        slots = [Slot(480, 720), Slot(780, 1080)]
+        domain_x = get_slot_domain(slots, 90)
+        for domain_y in ([(600, 690)], [(480, 600), (900, 1020)], get_slot_domain(slots, 240), []):
+            store = DomainStore({"x": domain_x, "y": domain_y})
+            expected = [value for value in domain_x if any(not overlaps(value, other) for other in domain_y)]
+
+            assert revise(store, "x", "y") == (expected != domain_x)
+            assert store.get_values("x") == expected
+
+            # The removed values come back on restore
+            store.restore(0)
+            assert store.get_values("x") == domain_x
@@ -0,0 +1,103 @@
+import pytest
+from datetime import datetime
+from src.core.budget import SearchBudget
+from src.core.minutes import to_minutes
+from src.schedulers.binpack import binpack_schedule, branch_and_bound, first_fit_decreasing, get_preferred_start
+
+def create_time(hour, minute=0):
+    return datetime.strptime(f"{hour:02d}:{minute:02d}", "%H:%M").time()
+
+def get_slots(result):
+    return sorted((to_minutes(task["start"]), to_minutes(task["end"])) for task in result["tasks"])
+
+class TestBinPackScheduler:
+    @pytest.fixture
+    def tight_schedule_params(self):
+        # Two 100 minute slots filled exactly, first fit decreasing leaves the 20 minute task out
+        return {
+            'wake_up': create_time(8),
+            'sleep': create_time(11, 40),
+            'obligations': [{"task": "Break", "start": create_time(9, 40), "end": create_time(10)}],
+            'tasks': [
+                {"task": f"Task {i}", "duration": duration}
+                for i, duration in enumerate([50, 40, 30, 30, 30, 20])
+            ]
+        }
+
+    def test_first_fit_decreasing(self):
+        assert first_fit_decreasing([100, 100], [50, 40, 30, 30, 30, 20], [[0, 1]] * 6) == [0, 0, 1, 1, 1, None]
+
+    def test_branch_and_bound(self):
+        packing = branch_and_bound([100, 100], [50, 40, 30, 30, 30, 20], [[0, 1]] * 6, SearchBudget())
+        assert packing is not None
+        assert [sum(duration for duration, slot in zip([50, 40, 30, 30, 30, 20], packing) if slot == index) for index in range(2)] == [100, 100]
+
+        # 90 + 50 does not fit in 120 minutes and only two 50 minute tasks do
+        assert branch_and_bound([120, 120], [90, 50, 50, 50], [[0, 1]] * 4, SearchBudget()) is None
+
+    def test_tight_schedule(self, tight_schedule_params):
+        result = binpack_schedule(**tight_schedule_params)
+        assert result["found_schedule"] is True
+        assert len(result["tasks"]) == 6
+
+        slots = get_slots(result)
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(slots, slots[1:]))
+        assert all(end <= 580 or start >= 600 for start, end in slots)
+
+    def test_impossible_packing(self):
+        """The tasks fill the free time exactly but cannot be packed in the slots."""
+        result = binpack_schedule(
+            create_time(8),
+            create_time(12, 30),
+            [{"task": "Break", "start": create_time(10), "end": create_time(10, 30)}],
+            [{"task": "Long", "duration": 90}] + [{"task": f"Task {i}", "duration": 50} for i in range(3)]
+        )
+        assert result["found_schedule"] is False
+        assert result["budget_exhausted"] is False
+
+    def test_budget_returns_first_fit_packing(self):
+        result = binpack_schedule(
+            create_time(8),
+            create_time(12, 30),
+            [{"task": "Break", "start": create_time(10), "end": create_time(10, 30)}],
+            [{"task": "Long", "duration": 90}] + [{"task": f"Task {i}", "duration": 50} for i in range(3)],
+            budget=SearchBudget(max_nodes=1)
+        )
+        assert result["budget_exhausted"] is True
+        assert [task["task"] for task in result["tasks"]] == ["Long", "Task 0", "Task 1"]
+
+    def test_preferences(self):
+        result = binpack_schedule(create_time(8), create_time(18), [], [
+            {"task": "Evening", "duration": 60, "preference": "evening"},
+            {"task": "Afternoon", "duration": 60, "preference": "afternoon"},
+            {"task": "Any", "duration": 60},
+            {"task": "Morning", "duration": 60, "preference": "morning"}
+        ])
+        starts = {task["task"]: task["start"].hour for task in result["tasks"]}
+
+        assert result["preference_respected"] is True
+        assert starts["Morning"] < 12
+        assert 12 <= starts["Afternoon"] < 17
+        assert starts["Evening"] == 17
+
+    def test_filler_in_wait_breaks_preference(self):
+        """The evening task is packed at night and placed in the wait before the morning task."""
+        result = binpack_schedule(create_time(2), create_time(21), [
+            {"task": "A", "start": create_time(13, 45), "end": create_time(14, 15)},
+            {"task": "B", "start": create_time(18, 30), "end": create_time(20, 30)},
+            {"task": "C", "start": create_time(20, 15), "end": create_time(21, 15)}
+        ], [
+            {"task": "t0", "duration": 90, "preference": "evening"},
+            {"task": "t1", "duration": 30, "preference": "evening"},
+            {"task": "t2", "duration": 90, "preference": "morning"},
+            {"task": "t3", "duration": 180, "preference": "afternoon"}
+        ])
+        starts = {task["task"]: task["start"].hour for task in result["tasks"]}
+
+        assert starts["t0"] < 5
+        assert result["preference_respected"] is False
+
+    def test_preferred_start(self):
+        assert get_preferred_start(480, 1000, "afternoon") == 720
+        assert get_preferred_start(480, 700, "afternoon") is None
+        assert get_preferred_start(480, 1000, None) is None
@@ -0,0 +1,60 @@
+import pytest
+from datetime import datetime
+from src.core.minutes import to_minutes
+from src.schedulers.greedy_scheduler import fit_tasks_into_schedule
+
+def create_time(hour, minute=0):
+    return datetime.strptime(f"{hour:02d}:{minute:02d}", "%H:%M").time()
+
+def get_starts(result):
+    return {task["task"]: to_minutes(task["start"]) for task in result["tasks"]}
+
+class TestGreedyScheduler:
+    @pytest.fixture
+    def slots_params(self):
+        # Free slots of 60 minutes from 8:00 and of 30 minutes from 10:00
+        return {
+            'wake_up': create_time(8),
+            'sleep': create_time(10, 30),
+            'obligations': [{"task": "Meeting", "start": create_time(9), "end": create_time(10)}],
+            'tasks': [
+                {"task": "Short", "duration": 30},
+                {"task": "Long", "duration": 60}
+            ]
+        }
+
+    def test_first_fit(self, slots_params):
+        result = fit_tasks_into_schedule(**slots_params, mode="first_fit")
+
+        assert result["found_schedule"] is False
+        assert result["dropped_tasks"] == ["Long"]
+        assert get_starts(result) == {"Short": 480}
+
+    def test_best_fit(self, slots_params):
+        result = fit_tasks_into_schedule(**slots_params, mode="best_fit")
+
+        assert result["found_schedule"] is True
+        assert result["dropped_tasks"] == []
+        assert get_starts(result) == {"Short": 600, "Long": 480}
+
+    def test_preference(self):
+        tasks = [
+            {"task": "Any", "duration": 240},
+            {"task": "Evening", "duration": 60, "preference": "evening"},
+            {"task": "Afternoon", "duration": 60, "preference": "afternoon"}
+        ]
+        result = fit_tasks_into_schedule(create_time(8), create_time(22), [], tasks, mode="preference")
+        starts = get_starts(result)
+
+        assert result["found_schedule"] is True
+        assert result["preference_respected"] is True
+        assert [task["task"] for task in result["tasks"]] == ["Any", "Evening", "Afternoon"]
+        assert starts["Evening"] == 1020
+        assert starts["Afternoon"] == 720
+
+        result = fit_tasks_into_schedule(create_time(8), create_time(22), [], tasks, mode="first_fit")
+        assert result["preference_respected"] is False
+
+    def test_invalid_mode(self, slots_params):
+        with pytest.raises(ValueError):
+            fit_tasks_into_schedule(**slots_params, mode="worst_fit")
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from src.schedulers.interval_scheduler import interval_schedule
+from src.schedulers.interval_scheduler import Interval, IntervalTimeline, interval_schedule
 
 def create_time(hour, minute=0):
     return datetime.strptime(f"{hour:02d}:{minute:02d}", "%H:%M").time()
@@ -187,6 +187,41 @@ def test_interval_scheduler_with_minimal_intervals():
     assert task_durations["Task 2"] == 60
     assert task_durations["Task 3"] == 90
 
+def test_interval_timeline_free_runs():
+    """Test the free time after every interval is updated when intervals are assigned."""
+    # Two slots, 8:00 - 9:30 and 10:00 - 11:00, in 30 minute intervals
+    intervals = [Interval(start, start + 30) for start in (480, 510, 540, 600, 630)]
+    timeline = IntervalTimeline(intervals)
+
+    assert timeline.free_run[:5] == [150, 120, 90, 60, 30]
+    assert timeline.first_fit(60, "morning") == 0
+
+    parts = timeline.assign({"task": "Task", "duration": 45}, 1)
+    assert [part["duration"] for part in parts] == [30, 15]
+    assert timeline.free_run[:5] == [30, 0, 0, 60, 30]
+    assert timeline.first_fit(60) == 3
+    assert timeline.first_fit(60, "afternoon") is None
+
+def test_interval_scheduler_uses_preferred_intervals():
+    """Test tasks start in their preferred period when it has room."""
+    wake_up = create_time(8)
+    sleep = create_time(22)
+
+    tasks = [
+        {"task": "Evening Reading", "duration": 60, "preference": "evening"},
+        {"task": "Afternoon Study", "duration": 90, "preference": "afternoon"},
+        {"task": "Chores", "duration": 30}
+    ]
+
+    result = interval_schedule(wake_up, sleep, [], tasks)
+    assert result["preference_respected"] is True
+
+    starts = {}
+    for part in result["tasks"]:
+        starts.setdefault(part["task"], part["start"])
+    assert 17 <= starts["Evening Reading"].hour < 21
+    assert 12 <= starts["Afternoon Study"].hour < 17
+
 if __name__ == "__main__":
     test_interval_scheduler_with_preferences()
     test_interval_scheduler_with_tight_schedule()
@@ -0,0 +1,52 @@
+import os
+import time
+
+import pytest
+
+from src.schedulers.pool import SolverCrashed, SolverPool, SolverTimeout
+
+@pytest.fixture
+def pool():
+    pool = SolverPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+def test_run_returns_result_and_raises_errors(pool):
+    assert pool.run(divmod, (7, 2)) == (3, 1)
+
+    with pytest.raises(ValueError):
+        pool.run(int, ("not a number",))
+
+    # The worker survives an exception and is reused
+    assert pool.idle_workers.qsize() == 1
+    assert pool.run(max, (1, 5)) == 5
+
+def test_run_kills_solver_over_budget(pool):
+    pool.run(abs, (-1,))
+    worker = pool.idle_workers.queue[0]
+
+    start = time.monotonic()
+    with pytest.raises(SolverTimeout):
+        pool.run(time.sleep, (30,), time_budget=0.5)
+
+    assert time.monotonic() - start < 5
+    assert not worker.process.is_alive()
+
+    # A new worker replaces the killed one
+    assert pool.run(abs, (-3,), time_budget=30) == 3
+
+def test_run_raises_solver_crashed(pool):
+    # The process exits in the middle of the call
+    with pytest.raises(SolverCrashed):
+        pool.run(os._exit, (1,), time_budget=30)
+
+    # An idle process that died is only noticed when it is used
+    pool.run(abs, (-1,))
+    worker = pool.idle_workers.queue[0]
+    worker.process.kill()
+    worker.process.join()
+
+    with pytest.raises(SolverCrashed):
+        pool.run(abs, (-2,), time_budget=30)
+
+    assert pool.run(abs, (-3,), time_budget=30) == 3
@@ -0,0 +1,130 @@
+import pytest
+
+from src.schedulers import service
+from src.schedulers.service import solve_schedule, solve_schedule_batch
+
+def create_payload(wake_up_time="08:00"):
+    return {
+        "wake_up_time": wake_up_time,
+        "sleep_time": "22:00",
+        "obligations": [
+            {"task": "Meeting", "start": "10:00", "end": "11:00"}
+        ],
+        "regular_tasks": [
+            {"task": "Study", "duration": 120},
+            {"task": "Exercise", "duration": 60}
+        ]
+    }
+
+@pytest.fixture
+def process_pool():
+    yield
+    service.shutdown_process_pool()
+
+@pytest.fixture
+def solver_pool():
+    yield
+    service.shutdown_solver_pool()
+
+def test_solve_schedule():
+    result = solve_schedule("greedy", create_payload())
+
+    assert result["found_schedule"] is True
+    assert result["obligations"] == [{"task": "Meeting", "start": "10:00", "end": "11:00"}]
+    assert {task["task"] for task in result["schedule"]} >= {"Study", "Exercise"}
+
+    with pytest.raises(ValueError):
+        solve_schedule("unknown", create_payload())
+
+    with pytest.raises(KeyError):
+        solve_schedule("greedy", {"wake_up_time": "08:00"})
+
+def test_solve_schedule_preference_periods():
+    payload = create_payload()
+    payload["regular_tasks"] = [{"task": "Run", "duration": 30, "preference": "early"}]
+    payload["preference_periods"] = [{"name": "Early", "start": "08:30", "end": "09:30"}]
+
+    result = solve_schedule("binpack", payload)
+    assert result["preference_respected"] is True
+    assert result["schedule"] == [{"task": "Run", "start": "08:30", "end": "09:00"}]
+
+    payload["preference_periods"] = [{"name": "Early", "start": "08:30", "end": "08:30"}]
+    with pytest.raises(ValueError):
+        solve_schedule("binpack", payload)
+
+def test_solve_schedule_batch(process_pool):
+    payloads = [
+        create_payload(),
+        dict(create_payload(), algo="backtrack"),
+        create_payload(wake_up_time="8 o'clock"),
+        {"sleep_time": "22:00"},
+        create_payload(wake_up_time="07:00")
+    ]
+
+    results = solve_schedule_batch(payloads, default_algo="greedy", max_workers=2)
+
+    # Results come back in input order, failed payloads only fail their own item
+    assert results[0] == solve_schedule("greedy", create_payload())
+    assert results[1] == solve_schedule("backtrack", create_payload())
+    assert results[2]["error"].startswith("Invalid data format")
+    assert results[3]["error"].startswith("Missing required field")
+    assert results[4] == solve_schedule("greedy", create_payload(wake_up_time="07:00"))
+
+    assert solve_schedule_batch([]) == []
+
+def test_solve_schedule_in_solver_pool(solver_pool):
+    result = solve_schedule("ac3", create_payload(), time_budget=30, solver_workers=1)
+
+    assert result == solve_schedule("ac3", create_payload())
+    assert result["solver_timed_out"] is False
+
+def test_solve_schedule_falls_back_when_budget_runs_out(solver_pool):
+    # The solver cannot even receive the request within the budget
+    result = solve_schedule("backtrack", create_payload(), time_budget=0.000001, solver_workers=1)
+
+    assert result["solver_timed_out"] is True
+    assert result["alternative_scheduler_used"] is True
+    assert result["found_schedule"] is True
+
+def test_solve_schedule_falls_back_when_solver_crashes(solver_pool):
+    worker = service.get_solver_pool(1).idle_workers.queue[0]
+    worker.process.kill()
+    worker.process.join()
+
+    result = solve_schedule("backtrack", create_payload(), time_budget=30, solver_workers=1)
+
+    assert result["solver_timed_out"] is False
+    assert result["alternative_scheduler_used"] is True
+    assert result["found_schedule"] is True
+
+def test_solve_schedule_keeps_partial_schedule_when_search_budget_runs_out():
+    # The tasks fill both two hour slots exactly but cannot be packed in them, the search
+    # cannot prove it within 20 nodes
+    payload = dict(
+        create_payload(),
+        wake_up_time="08:00",
+        sleep_time="12:30",
+        obligations=[{"task": "Break", "start": "10:00", "end": "10:30"}],
+        regular_tasks=[{"task": "Long", "duration": 90}] + [{"task": f"Task {i}", "duration": 50} for i in range(3)]
+    )
+
+    result = solve_schedule("backtrack", payload, node_budget=20)
+
+    assert result["budget_exhausted"] is True
+    assert result["found_schedule"] is False
+    assert len(result["schedule"]) == 3
+    assert solve_schedule("backtrack", payload)["budget_exhausted"] is False
+
+def test_solve_schedule_lists_infeasible_tasks():
+    payload = dict(
+        create_payload(),
+        wake_up_time="08:00",
+        sleep_time="10:00",
+        obligations=[],
+        regular_tasks=[{"task": "Short", "duration": 30}, {"task": "Long", "duration": 180}]
+    )
+
+    result = solve_schedule("ac3", payload)
+
+    assert result["infeasible_tasks"] == ["Long"]
+    assert solve_schedule("ac3", create_payload())["infeasible_tasks"] == []
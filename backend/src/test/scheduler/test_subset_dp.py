@@ -0,0 +1,80 @@
+import pytest
+from datetime import datetime
+from src.core.minutes import Slot, to_minutes
+from src.schedulers import subset_dp
+from src.schedulers.subset_dp import NO_START, get_start_table, subset_dp_schedule
+
+def create_time(hour, minute=0):
+    return datetime.strptime(f"{hour:02d}:{minute:02d}", "%H:%M").time()
+
+class TestSubsetDPScheduler:
+    @pytest.fixture
+    def basic_schedule_params(self):
+        return {
+            'wake_up': create_time(8),
+            'sleep': create_time(22),
+            'obligations': [{"task": "Meeting", "start": create_time(10), "end": create_time(11)}],
+            'tasks': [
+                {"task": "Task 1", "duration": 60},
+                {"task": "Task 2", "duration": 120},
+                {"task": "Task 3", "duration": 60}
+            ]
+        }
+
+    def test_start_table(self):
+        starts = get_start_table([Slot(480, 600), Slot(660, 1320)], 90)
+        assert starts[0] == 480
+        assert starts[500] == 500
+        assert starts[520] == 660
+        assert starts[1231] == NO_START
+
+        assert get_start_table([Slot(480, 600), Slot(660, 1320)], 90, "afternoon")[0] == 720
+
+    def test_basic_scheduling(self, basic_schedule_params):
+        result = subset_dp_schedule(**basic_schedule_params)
+        assert result["found_schedule"] is True
+        assert result["preference_respected"] is True
+        assert len(result["tasks"]) == 3
+
+        slots = sorted((to_minutes(task["start"]), to_minutes(task["end"])) for task in result["tasks"])
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(slots, slots[1:]))
+        assert all(end <= 600 or start >= 660 for start, end in slots)
+
+    def test_impossible_packing(self):
+        """The tasks fill the free time exactly but cannot be packed in the slots."""
+        result = subset_dp_schedule(
+            create_time(8),
+            create_time(12, 30),
+            [{"task": "Break", "start": create_time(10), "end": create_time(10, 30)}],
+            [{"task": "Long", "duration": 90}] + [{"task": f"Task {i}", "duration": 50} for i in range(3)]
+        )
+        assert result["found_schedule"] is False
+        assert result["tasks"] == []
+
+    def test_preferences_are_optimized_together(self):
+        """Only one of the two evening tasks fits in the evening, the morning task still gets its period."""
+        result = subset_dp_schedule(create_time(8), create_time(20), [], [
+            {"task": "Long evening", "duration": 180, "preference": "evening"},
+            {"task": "Short evening", "duration": 90, "preference": "evening"},
+            {"task": "Morning", "duration": 60, "preference": "morning"}
+        ])
+        starts = {task["task"]: to_minutes(task["start"]) for task in result["tasks"]}
+
+        assert result["found_schedule"] is True
+        assert result["preference_respected"] is False
+        assert starts["Morning"] < 720
+        assert starts["Long evening"] == 1020 or 1020 <= starts["Short evening"] <= 1110
+
+    def test_identical_tasks(self):
+        tasks = [{"task": f"Task {i}", "duration": 30, "preference": "morning"} for i in range(6)]
+        result = subset_dp_schedule(create_time(9), create_time(12), [], tasks)
+
+        assert result["preference_respected"] is True
+        assert sorted(task["task"] for task in result["tasks"]) == [task["task"] for task in tasks]
+
+    def test_large_requests_use_binpack(self, basic_schedule_params, monkeypatch):
+        monkeypatch.setattr(subset_dp, "SUBSET_DP_MAX_TASKS", 2)
+        result = subset_dp_schedule(**basic_schedule_params)
+
+        assert result["found_schedule"] is True
+        assert len(result["tasks"]) == 3
@@ -1,6 +1,4 @@
-from datetime import timedelta, datetime
+from src.core.minutes import to_minutes
 
 def minutes_between(start_time, end_time):
-    start_dt = datetime.combine(datetime.today(), start_time)
-    end_dt = datetime.combine(datetime.today(), end_time)
-    return int((end_dt - start_dt).total_seconds() // 60)
\ No newline at end of file
+    return to_minutes(end_time) - to_minutes(start_time)
@@ -122,6 +122,8 @@ export default function TimetablePage() {
               <SelectItem value="forward_check">Forward Check</SelectItem>
               <SelectItem value="backtrack">Backtrack</SelectItem>
               <SelectItem value="greedy">Greedy</SelectItem>
+              <SelectItem value="binpack">Bin Packing</SelectItem>
+              <SelectItem value="subset_dp">Exact (Subset DP)</SelectItem>
             </SelectContent>
           </Select>
           <Button 
@@ -157,6 +159,8 @@ export default function TimetablePage() {
               <SelectItem value="forward_check">Forward Check</SelectItem>
               <SelectItem value="backtrack">Backtrack</SelectItem>
               <SelectItem value="greedy">Greedy</SelectItem>
+              <SelectItem value="binpack">Bin Packing</SelectItem>
+              <SelectItem value="subset_dp">Exact (Subset DP)</SelectItem>
             </SelectContent>
           </Select>
           <Button 
@@ -218,6 +218,8 @@ export function TaskInput({
                 <SelectItem value="forward_check">Forward Check</SelectItem>
                 <SelectItem value="backtrack">Backtrack</SelectItem>
                 <SelectItem value="greedy">Greedy</SelectItem>
+                <SelectItem value="binpack">Bin Packing</SelectItem>
+                <SelectItem value="subset_dp">Exact (Subset DP)</SelectItem>
               </SelectContent>
             </Select>
             <Button 